@@ -12,13 +12,20 @@
 
 import sys
 import os
-from utils import *
-from dataclasses import dataclass
-from PyQt5.QtGui import QFont
+import time
+try: #Installed, the utils folder is the vectorial_ui package (see setup.py)
+    from vectorial_ui import *
+except ImportError: #Run from the repository folder
+    from utils import *
+from dataclasses import dataclass, replace
+from PyQt5.QtGui import QFont, QKeySequence, QColor
+from PyQt5.QtCore import QThread, pyqtSignal, Qt, QAbstractTableModel, QTimer
 from PyQt5.QtWidgets import QMainWindow, QApplication, QWidget, QPushButton, QListWidget, QTabWidget
-from PyQt5.QtWidgets import QLineEdit, QMessageBox, QLabel, QCheckBox, QFileDialog, QVBoxLayout, QRadioButton
+from PyQt5.QtWidgets import QLineEdit, QMessageBox, QLabel, QCheckBox, QFileDialog, QVBoxLayout, QRadioButton, QHBoxLayout
+from PyQt5.QtWidgets import QTableView, QAbstractItemView, QTableWidget, QTableWidgetItem, QListWidgetItem
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg, NavigationToolbar2QT
 from matplotlib.figure import Figure
+from matplotlib.colors import to_hex
 
 #Creates a data class to manage the UI data throughout all programs in the interface.
 @dataclass
@@ -51,9 +58,14 @@ class UIInputData:
     RadialPoints: int
     RadialSubsteps: int
     PyvComaPickle: str
-    ApertureChecks: str
+    Profile: object
+    ComaKey: str
     YamlFile: str
     PickleInputs: bool
+    UseJobServer: bool
+
+WarmUpImports = True #Imports pyvectorial, sbpy, astropy and scipy on a background thread once the window is shown (see LazyImports.py)
+UseJobServer = False #Checks *Use Job Server* when the window opens, runs, batches and sweeps are then sent to the shared job server (see JobServer.py)
 
 #Creates a global UI data manager to be modified by the UI window and passed to all the programs in the interface.
 CurrentUIRun = UIInputData(BaseQ = None, TimeVariationType = None, SinAmp = None, SinPer = None, SinDelta = None,
@@ -61,19 +73,68 @@ CurrentUIRun = UIInputData(BaseQ = None, TimeVariationType = None, SinAmp = None
                         SquareT_Start = None, ParentName = None, VOutflow = None, TauD = None, Sigma = None,
                         TtoDRatio = None, FragmentName = None, VPhoto = None, TauT = None, CometName = None, Rh = None,
                         CometDelta = None, TransformMethod = None, ApplyTransforMethod = False, AngularPoints = None, RadialPoints = None,
-                        RadialSubsteps = None, PyvComaPickle = None, ApertureChecks = None, YamlFile = None, PickleInputs = False)
+                        RadialSubsteps = None, PyvComaPickle = None, Profile = None, ComaKey = None, YamlFile = None, PickleInputs = False,
+                        UseJobServer = False)
+
+#Model run worker
+#Runs one of the FileRunner.py programs on a background thread so the UI does not freeze during pyv.run_vmodel().
+#Progress lines are sent back to App() through signals, the results window is only opened on completed.
+class RunWorker(QThread):
+    progress = pyqtSignal(str) #Emitted for every progress line printed by pyvectorial
+    completed = pyqtSignal(object) #Emitted with the result of the program when the run is finished
+    cancelled = pyqtSignal() #Emitted when the run was stopped by the cancel button
+    failed = pyqtSignal(str) #Emitted with the error message when the program raised an error
+
+    #Intial Config
+    def __init__(self, program, args, parent=None):
+        super().__init__(parent)
+        self.program = program #FileRunner.py method to run (runManualProgram, runFileYamlProgram, runFilePickleProgram or runBatchProgram)
+        self.args = args
+
+    #Runs the program on the worker thread
+    def run(self):
+        try:
+            result = self.program(*self.args, progressCallback=self.reportProgress)
+        except RunCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as error: #An error escaping run() would abort the whole program
+            self.failed.emit(f'{type(error).__name__}: {error}')
+            return
+        if(self.isInterruptionRequested()): #Cancel was pressed after the last progress line
+            self.cancelled.emit()
+            return
+        self.completed.emit(result)
+
+    #Sends a progress line to the UI, stopping the run if the cancel button was pressed
+    def reportProgress(self, line):
+        if(self.isInterruptionRequested()):
+            raise RunCancelled()
+        self.progress.emit(line)
+
+#Method def for testing if a window has to be kept alive: it is shown, one of its RunWorker() is still running
+#(Qt aborts if a running QThread is destroyed with its window) or a window it opened has to be kept
+def windowKept(window):
+    return (window.isVisible() or any(worker.isRunning() for worker in window.findChildren(RunWorker))
+            or any(windowKept(win) for win in getattr(window, 'resultWindows', [])))
+
+#Method def for keeping a new window alive in windows, the windows that no longer have to be kept are released
+def keepWindow(windows, window):
+    windows[:] = [win for win in windows if windowKept(win)]
+    windows.append(window)
 
 #Plot the graphs
 #Creates a MatPlotLib graph widget for ResultsWindow() based on the graphType input.
 class PlotGraphs(FigureCanvasQTAgg):
     #Intial UI Config
-    def __init__(self, vmc, vmr, graphType, parent=None, width=10, height=10, dpi=100):
+    def __init__(self, vmc, vmr, graphType, parent=None, width=10, height=10, dpi=100, surface=None):
         plot = Figure(figsize=(width, height), dpi=dpi) #Creates the figure
         self.axes = plot.add_subplot(111) #Creates the initial (x,y) axis
         FigureCanvasQTAgg.__init__(self, plot)
         self.vmc = vmc
         self.vmr = vmr
         self.graphType = graphType
+        self.surface = surface #Column density surface shared by both 3d graphs
         self.setParent(parent)
         self.graph()
 
@@ -86,51 +147,304 @@ class PlotGraphs(FigureCanvasQTAgg):
         if(self.graphType == "column dens"):
             self.figure = getColumnDensity(self.vmc, self.vmr)
         if(self.graphType == "3d column dens"):
-            self.figure = get3DColumnDensity(self.vmc, self.vmr)
+            self.figure = get3DColumnDensity(self.vmc, self.vmr, self.surface)
         if(self.graphType == "3d column dens cent"):
-            self.figure = get3DColumnDensityCentered(self.vmc, self.vmr)
+            self.figure = get3DColumnDensityCentered(self.vmc, self.vmr, self.surface)
+        if(self.graphType == "growth"):
+            self.figure = getCurveOfGrowth(self.vmc, self.vmr)
+        if(self.graphType in ["radial", "column dens", "growth"]): #Profiles on the radial grid, only a decimated copy is drawn
+            self.decimated = decimateFigure(self.figure)
         self.draw() #Draws the figure
 
+#Density table model
+#Table model backed by the NumPy arrays of a density table, rows are only formatted when the view shows them.
+class DensityTableModel(QAbstractTableModel):
+    #Intial Config
+    def __init__(self, columns, headers, formats, parent=None):
+        super().__init__(parent)
+        self.columns = columns #List of NumPy arrays, one per column
+        self.headers = headers #Header text of each column
+        self.formats = formats #Format spec of each column
+        self.order = None #Row order after sorting, None keeps the grid order
+
+    def rowCount(self, parent=None):
+        return len(self.columns[0])
+
+    def columnCount(self, parent=None):
+        return len(self.columns)
+
+    #Formats a single cell when the view asks for it
+    def data(self, index, role=Qt.DisplayRole):
+        if(role != Qt.DisplayRole or index.isValid() == False):
+            return None
+        row = index.row() if self.order is None else self.order[index.row()]
+        return format(float(self.columns[index.column()][row]), self.formats[index.column()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if(role == Qt.DisplayRole and orientation == Qt.Horizontal):
+            return self.headers[section]
+        return None
+
+    #Sorts the rows by a column, only the row order is changed, not the arrays
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.order = self.columns[column].argsort(kind='stable')
+        if(order == Qt.DescendingOrder):
+            self.order = self.order[::-1]
+        self.layoutChanged.emit()
+
+#Density table view
+#Table view for a DensityTableModel() that copies the selected cells (tab separated) with the copy shortcut.
+class DensityTableView(QTableView):
+    #Intial UI Config
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setSortingEnabled(True)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.verticalHeader().setDefaultSectionSize(22) #Fixed row height so only the visible rows are measured
+        self.horizontalHeader().setStretchLastSection(True)
+
+    #Copies the selected cells to the clipboard
+    def keyPressEvent(self, event):
+        if(event.matches(QKeySequence.Copy)):
+            indexes = sorted(self.selectedIndexes(), key=lambda index: (index.row(), index.column()))
+            rows = {}
+            for index in indexes:
+                rows.setdefault(index.row(), []).append(self.model().data(index))
+            QApplication.clipboard().setText('\n'.join('\t'.join(row) for row in rows.values()))
+            return
+        super().keyPressEvent(event)
+
 #Extra results
 #Creates a QWidget for radial/column densities and agreement/aperture checks for ResultsWindow()
+#The aperture checks run on a RunWorker() after the window is shown and fill in when they finish (see ApertureChecks.py),
+#extra apertures can be added and are checked in parallel.
 class ExtraResults(QWidget):
+    checksFinished = pyqtSignal() #Emitted when the aperture checks are done and their stages are in the profile
+
     #Intial UI Config
-    def __init__(self, vmr, parent=None):
+    def __init__(self, vmr, profile=None, comaKey=None, parent=None):
         super().__init__(parent)
         self.vmr = vmr
+        self.profile = profile #RunProfile the aperture check stages are added to
+        self.comaKey = comaKey #Key of the run in the session coma store (see ComaStore.py), None for pickles and result stores
+        self.checkWorker = None
         self.initUI()
     
     #Defines the UI Interface
     def initUI(self):
-        global CurrentUIRun
-        self.radDensityBox = QListWidget(self)
-        self.radDensityBox.addItem(getPrintRadialDensity(self.vmr))
-        self.radDensityBox.setGeometry(2000,400,400,2000)
-        self.radDensityBox.move(10,10)
-        self.columnDesityBox = QListWidget(self)
-        self.columnDesityBox.addItem(getPrintColumnDensity(self.vmr))
-        self.columnDesityBox.setGeometry(2000,400,400,2000)
-        self.columnDesityBox.move(425,10)
-
-        #Test to see if pickle input was used to only add the agreement to the output
-        if (CurrentUIRun.PickleInputs):
-            self.agreementCheckBox = QListWidget(self)
-            self.agreementCheckBox.addItem(getAgreementCheck(self.vmr))
-            self.agreementCheckBox.setGeometry(110,600,600,110)
-            self.agreementCheckBox.move(850,10)
-        else:
-            self.agreementCheckBox = QListWidget(self)
-            self.agreementCheckBox.addItem(getAgreementCheck(self.vmr))
-            self.agreementCheckBox.addItem(CurrentUIRun.ApertureChecks)
-            self.agreementCheckBox.setGeometry(200,600,600,200)
-            self.agreementCheckBox.move(850,10)
-        
+        self.radDensityModel = DensityTableModel(getRadialDensityTable(self.vmr), ["Radius (km)", "Fragment density (1/cm3)"], ['.1f', '.4f'])
+        self.radDensityBox = DensityTableView(self.radDensityModel, self)
+        self.radDensityBox.setGeometry(10,10,400,1250)
+        self.columnDesityModel = DensityTableModel(getColumnDensityTable(self.vmr), ["Radius (km)", "Column density (1/cm2)"], ['.0f', '.3e'])
+        self.columnDesityBox = DensityTableView(self.columnDesityModel, self)
+        self.columnDesityBox.setGeometry(425,10,400,1250)
+
+        #Agreement check, followed by the aperture checks once they finish
+        self.agreementCheckBox = QListWidget(self)
+        self.agreementCheckBox.addItem(getAgreementCheck(self.vmr))
+        self.agreementCheckBox.addItem("\nAperture checks running...")
+        self.agreementCheckBox.setGeometry(850,10,600,300)
+
+        #Extra apertures
+        self.apertureText = QLabel("Extra apertures (km): circular r; annular r_inner r_outer; rectangular width height; gaussian sigma", self)
+        self.apertureText.setGeometry(850,320,600,25)
+        self.apertureBox = QLineEdit(self)
+        self.apertureBox.setPlaceholderText("circular 100000; annular 50000 200000")
+        self.apertureBox.setGeometry(850,350,600,25)
+        self.apertureButton = QPushButton("Check Apertures", self)
+        self.apertureButton.setGeometry(850,385,150,30)
+        self.apertureButton.clicked.connect(self.checkApertures)
+
+        #Column density at any radii
+        self.sampleText = QLabel("Column density at radii (km), separated by commas:", self)
+        self.sampleText.setGeometry(850,430,600,25)
+        self.sampleBox = QLineEdit(self)
+        self.sampleBox.setPlaceholderText("1000, 25000, 150000")
+        self.sampleBox.setGeometry(850,460,600,25)
+        self.sampleButton = QPushButton("Sample Column Density", self)
+        self.sampleButton.setGeometry(850,495,200,30)
+        self.sampleButton.clicked.connect(self.sampleColumnDensity)
+        self.sampleList = QListWidget(self)
+        self.sampleList.setGeometry(850,535,600,200)
+        self.startChecks([])
+
+    #Check Apertures button, checks the default apertures and the extra apertures
+    def checkApertures(self):
+        apertures = parseApertures(self.apertureBox.text())
+        if(apertures == None):
+            self.agreementCheckBox.item(1).setText("\nIncorrect extra apertures, the sizes must be > 0 km (and r_inner < r_outer).")
+            return
+        self.startChecks(apertures)
+
+    #Starts the aperture checks on a RunWorker()
+    def startChecks(self, apertures):
+        self.apertureButton.setEnabled(False)
+        self.agreementCheckBox.item(1).setText("\nAperture checks running...")
+        self.checkWorker = RunWorker(self.runChecks, (apertures,), self)
+        self.checkWorker.completed.connect(self.showChecks)
+        self.checkWorker.failed.connect(self.checksFailed)
+        self.checkWorker.finished.connect(self.checkWorker.deleteLater)
+        self.checkWorker.start()
+
+    #Integrates the column density over every aperture, runs on the check worker
+    #Returns the aperture check text and its profile stages
+    #The apertures are integrated by the coma if it is still kept, otherwise from the vmr
+    def runChecks(self, apertures, progressCallback=None):
+        profile = RunProfile()
+        coma = self.liveComa()
+        with profile.stage('aperture checks' if coma == None else 'aperture checks (kept coma)'):
+            text = apertureCheckText(self.vmr, apertures) if coma == None else comaApertureText(coma, apertures)
+        return text, profile.stages
+
+    #Gets the coma of the run if it is still in the session coma store, None otherwise
+    def liveComa(self):
+        return None if self.comaKey == None else getComa(self.comaKey)
+
+    #Sample Column Density button, lists the column density at every radius in the sample box
+    def sampleColumnDensity(self):
+        try:
+            radii = [float(val) for val in self.sampleBox.text().split(',') if val.strip() != '']
+        except ValueError:
+            radii = []
+        self.sampleList.clear()
+        if(len(radii) == 0 or any(radius < 0 for radius in radii)):
+            self.sampleList.addItem("Incorrect radii, the radii must be numbers >= 0 km.")
+            return
+        coma = self.liveComa()
+        densities = columnDensityAt(self.vmr, radii, coma)
+        self.sampleList.addItem("From the kept coma of the run:" if coma != None else "From the column density of the results (coma not kept):")
+        for radius, density in zip(radii, densities):
+            self.sampleList.addItem(f"\t{radius:g} km:\t{density.value:.4e} 1/cm2")
+
+    #Called when the aperture checks raised an error
+    def checksFailed(self, message):
+        self.agreementCheckBox.item(1).setText(f"\nAperture checks failed: {message}")
+        self.apertureButton.setEnabled(True)
+
+    #Called when the aperture checks are done
+    def showChecks(self, result):
+        text, stages = result
+        self.agreementCheckBox.item(1).setText(text)
+        self.apertureButton.setEnabled(True)
+        if(self.profile != None):
+            self.profile.addStages(stages)
+            self.checksFinished.emit()
+
+#Performance results
+#Creates a QWidget with the wall time, CPU time and peak memory (traced, or the process peak RSS) of every stage of a run (see RunProfiler.py) for ResultsWindow()
+class PerformanceResults(QWidget):
+    #Intial UI Config
+    def __init__(self, profile, parent=None):
+        super().__init__(parent)
+        self.profile = profile #RunProfile of the run, the plot stages are added as the graph tabs are shown
+        self.initUI()
+
+    #Defines the UI Interface
+    def initUI(self):
+        self.layout = QVBoxLayout()
+        self.stageTable = QTableWidget(0, 4, self)
+        self.stageTable.setHorizontalHeaderLabels(["Stage", "Wall time (s)", "CPU time (s)", "Peak memory (MB)"])
+        self.stageTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stageTable.horizontalHeader().setStretchLastSection(True)
+        self.totalText = QLabel('', self)
+        self.layout.addWidget(self.stageTable)
+        self.layout.addWidget(self.totalText)
+        self.setLayout(self.layout)
+        self.refresh()
+
+    #Shows every stage recorded in the profile so far
+    def refresh(self):
+        self.stageTable.setRowCount(len(self.profile.stages))
+        for row, stage in enumerate(self.profile.stages):
+            memory = ''
+            if(stage['peak_memory_mb'] != None and stage['memory'] == 'traced'):
+                memory = f"{stage['peak_memory_mb']:.1f} (traced)"
+            elif(stage['peak_memory_mb'] != None): #The process peak so far, not the stage's own peak
+                memory = f"{stage['peak_memory_mb']:.1f} (process peak RSS, +{stage.get('peak_growth_mb') or 0.0:.1f} in stage)"
+            for column, text in enumerate([stage['stage'], f"{stage['wall_seconds']:.3f}", f"{stage['cpu_seconds']:.3f}", memory]):
+                self.stageTable.setItem(row, column, QTableWidgetItem(text))
+        self.stageTable.resizeColumnToContents(0)
+        self.totalText.setText(f"Total wall time: {self.profile.toDict()['total_wall_seconds']:.3f} s")
+
+#Export bar
+#Creates a QWidget with an "Export All" button and format check boxes for ResultsWindow() and BatchResultsWindow().
+#The plots are rendered in parallel by exportResults() in PlotExporter.py and the result arrays are saved by exportData()
+#in ResultExporter.py, both on a RunWorker() so the window stays responsive.
+#The window of the bar is kept alive by keepWindow() until the export is done.
+class ExportBar(QWidget):
+    #Intial UI Config
+    def __init__(self, runs, parent=None):
+        super().__init__(parent)
+        self.runs = runs #List of (vmc, vmr, folder name) to export
+        self.exportWorker = None
+        self.initUI()
+
+    #Defines the UI Interface
+    def initUI(self):
+        self.layout = QHBoxLayout()
+        self.exportButton = QPushButton('Export All', self)
+        self.exportButton.clicked.connect(self.exportAll)
+        self.layout.addWidget(self.exportButton)
+        self.formatBoxes = {} #Check box of each plot export format
+        for format in ExportFormats:
+            self.formatBoxes[format] = QCheckBox(format.upper(), self)
+            self.formatBoxes[format].setChecked(format == 'png')
+            self.layout.addWidget(self.formatBoxes[format])
+        self.dataFormatBoxes = {} #Check box of each data export format
+        self.layout.addWidget(QLabel('Data:', self))
+        for format in ResultFormats:
+            self.dataFormatBoxes[format] = QCheckBox(format.upper(), self)
+            self.layout.addWidget(self.dataFormatBoxes[format])
+        self.exportText = QLabel('', self) #Shows the export progress
+        self.layout.addWidget(self.exportText)
+        self.layout.addStretch()
+        self.setLayout(self.layout)
+
+    #Export All button, asks for a folder and exports every plot and the data of every run to it
+    def exportAll(self):
+        formats = [format for format in ExportFormats if self.formatBoxes[format].isChecked()]
+        dataFormats = [format for format in ResultFormats if self.dataFormatBoxes[format].isChecked()]
+        if(len(formats) == 0 and len(dataFormats) == 0):
+            return
+        missing = missingFormats(dataFormats)
+        if(len(missing) > 0): #Tested before asking for a folder, the export would stop at the first run
+            self.exportText.setText(', '.join(f'{format.upper()} needs {package} (pip install {package})' for format, package in missing.items()))
+            return
+        outputDir = QFileDialog.getExistingDirectory(self, 'Export folder')
+        if(outputDir == ''): #No folder was selected
+            return
+        self.exportButton.setEnabled(False)
+        self.exportWorker = RunWorker(self.exportFiles, (outputDir, formats, dataFormats), self)
+        self.exportWorker.progress.connect(self.exportText.setText)
+        self.exportWorker.completed.connect(self.exportCompleted)
+        self.exportWorker.failed.connect(self.exportFailed)
+        self.exportWorker.finished.connect(self.exportWorker.deleteLater)
+        self.exportWorker.start()
+
+    #Saves the plots and the data of every run, runs on the export worker
+    def exportFiles(self, outputDir, formats, dataFormats, progressCallback=None):
+        paths = exportData(self.runs, outputDir, dataFormats, progressCallback)
+        if(len(formats) > 0):
+            paths += exportResults(self.runs, outputDir, formats, progressCallback=progressCallback)
+        return paths
+
+    #Called when every file has been saved
+    def exportCompleted(self, paths):
+        self.exportText.setText(f'{len(paths)} files exported.')
+        self.exportButton.setEnabled(True)
+
+    #Called when the export raised an error, the files saved before the error are kept
+    def exportFailed(self, message):
+        self.exportText.setText(f'Export failed: {message}')
+        self.exportButton.setEnabled(True)
 
 #Results window
 #Class to give a pop up window with the results from FileRunner.py using PlotGraphs().
 class ResultsWindow(QWidget):
     #Intial UI Config
-    def __init__(self, vmc, vmr, parent=None):
+    def __init__(self, vmc, vmr, profile=None, comaKey=None, parent=None):
         super().__init__(parent)
         self.title = 'Results'
         self.left = 10
@@ -139,6 +453,8 @@ class ResultsWindow(QWidget):
         self.height = 1400
         self.vmc = vmc
         self.vmr = vmr
+        self.profile = RunProfile() if profile == None else profile #Stages of the run, pickle input only has the plot stages
+        self.comaKey = comaKey #Key of the run in the session coma store, None for pickle input
         self.initUI()
 
     #Defines the UI Interface
@@ -157,64 +473,306 @@ class ResultsWindow(QWidget):
         """)
 
         self.layout = QVBoxLayout() #Defines the full window layout
+        self.layout.addWidget(ExportBar([(self.vmc, self.vmr, '')], self)) #Creates the export bar above the tabs
         self.tabs = QTabWidget() #Creates a widget containing the tabs
 
-        #Creates a bunch of empty widgets used in each tab
-        self.fragSput = QWidget() 
-        self.radial = QWidget()
-        self.columD = QWidget()
-        self.columD3 = QWidget()
-        self.columD3C = QWidget()
-
-        #Plots and displays the fragment sputter graph
-        self.tabs.addTab(self.fragSput, "Fragment Sputter") #Creates the tab named "Fragment Sputter"
-        self.fragSput.layout = QVBoxLayout(self) #Defines the tab layout as "QVBoxLayout"
-        self.fragSputGraph = PlotGraphs(self.vmc, self.vmr, "frag sput", width=5, height=4, dpi=100) #Creates the graph
-        self.fragSputToolbar = NavigationToolbar2QT(self.fragSputGraph, self) #Creates the toolbar for the graph
-        self.fragSput.layout.addWidget(self.fragSputGraph) #Adds the graph to the QVBoxLayout
-        self.fragSput.layout.addWidget(self.fragSputToolbar) #Adds the toolbar to the QVBoxLayout
-        self.fragSput.setLayout(self.fragSput.layout) #Finalizes the tab layout
-        
-        #Plots and displays the radial plot graph
-        self.tabs.addTab(self.radial, "Radial")
-        self.radial.layout = QVBoxLayout(self)
-        self.radialGraph = PlotGraphs(self.vmc, self.vmr, "radial", width=5, height=4, dpi=100)
-        self.radialToolbar = NavigationToolbar2QT(self.radialGraph, self)
-        self.radial.layout.addWidget(self.radialGraph)
-        self.radial.layout.addWidget(self.radialToolbar)
-        self.radial.setLayout(self.radial.layout)
-        
-        #Plots and displays the column density graph
-        self.tabs.addTab(self.columD, "Column Density")
-        self.columD.layout = QVBoxLayout(self)
-        self.columDGraph = PlotGraphs(self.vmc, self.vmr, "column dens", width=5, height=4, dpi=100)
-        self.columDToolbar = NavigationToolbar2QT(self.columDGraph, self)
-        self.columD.layout.addWidget(self.columDGraph)
-        self.columD.layout.addWidget(self.columDToolbar)
-        self.columD.setLayout(self.columD.layout)
-        
-        #Plots and displays the column density graph (off centered)
-        self.tabs.addTab(self.columD3, "Column Density (3D Off Centered)")
-        self.columD3.layout = QVBoxLayout(self)
-        self.columD3Graph = PlotGraphs(self.vmc, self.vmr, "3d column dens", width=5, height=4, dpi=100)
-        self.columD3Toolbar = NavigationToolbar2QT(self.columD3Graph, self)
-        self.columD3.layout.addWidget(self.columD3Graph)
-        self.columD3.layout.addWidget(self.columD3Toolbar)
-        self.columD3.setLayout(self.columD3.layout)
-        
-        #Plots and displays the column density graph (centered)
-        self.tabs.addTab(self.columD3C, "Column Density (3D Centered)")
-        self.columD3C.layout = QVBoxLayout(self)
-        self.columD3CGraph = PlotGraphs(self.vmc, self.vmr, "3d column dens cent", width=5, height=4, dpi=100)
-        self.columD3CToolbar = NavigationToolbar2QT(self.columD3CGraph, self)
-        self.columD3C.layout.addWidget(self.columD3CGraph)
-        self.columD3C.layout.addWidget(self.columD3CToolbar)
-        self.columD3C.setLayout(self.columD3C.layout)
-    
-        self.tabs.addTab(ExtraResults(self.vmr), "Extra") #Creates the extra tab by referencing ExtraResults()
+        #Defines the graph tabs as (graphType, tab name), a graph is only plotted the first time its tab is selected
+        self.graphTabs = [("frag sput", "Fragment Sputter"), ("radial", "Radial"), ("column dens", "Column Density"),
+                          ("3d column dens", "Column Density (3D Off Centered)"), ("3d column dens cent", "Column Density (3D Centered)"),
+                          ("growth", "Curve of Growth")]
+        self.graphs = {} #Graphs that have already been plotted, by tab index
+        self.surface = None #Column density surface, computed once for both 3d tabs
+
+        #Creates an empty widget for each graph tab
+        for graphType, tabName in self.graphTabs:
+            tab = QWidget()
+            tab.layout = QVBoxLayout() #Defines the tab layout as "QVBoxLayout"
+            tab.setLayout(tab.layout)
+            self.tabs.addTab(tab, tabName) #Creates the tab named tabName
+
+        self.extra = ExtraResults(self.vmr, self.profile, self.comaKey)
+        self.tabs.addTab(self.extra, "Extra") #Creates the extra tab by referencing ExtraResults()
+        self.performance = PerformanceResults(self.profile)
+        self.tabs.addTab(self.performance, "Performance") #Creates the performance tab by referencing PerformanceResults()
+        self.extra.checksFinished.connect(self.performance.refresh)
         self.layout.addWidget(self.tabs) #Adds all tabs to the Results window
         self.setLayout(self.layout) #Finalizes the whole window layout
+        self.tabs.currentChanged.connect(self.showTab) #Plots the graph of a tab when it is selected
+        self.showTab(0) #Plots the fragment sputter graph as it is the first tab shown
+
+    #Plots the graph of the tab at index the first time it is selected, later selections keep the plotted graph
+    def showTab(self, index):
+        if(index >= len(self.graphTabs) or index in self.graphs): #Extra/performance tab or an already plotted graph
+            return
+        graphType, tabName = self.graphTabs[index]
+        tab = self.tabs.widget(index)
+        if(graphType.startswith("3d") and self.surface == None): #The first 3d tab shown computes the surface for both
+            with self.profile.stage('column density surface'):
+                self.surface = getColumnDensitySurface(self.vmr)
+        with self.profile.stage(f'plot {tabName}'):
+            graph = PlotGraphs(self.vmc, self.vmr, graphType, width=5, height=4, dpi=100, surface=self.surface) #Creates the graph
+        self.performance.refresh()
+        toolbar = NavigationToolbar2QT(graph, self) #Creates the toolbar for the graph
+        tab.layout.addWidget(graph) #Adds the graph to the QVBoxLayout
+        tab.layout.addWidget(toolbar) #Adds the toolbar to the QVBoxLayout
+        self.graphs[index] = graph
         
+#Batch results window
+#Class to give a pop up window listing every run of a batch, double clicking a run opens its ResultsWindow().
+class BatchResultsWindow(QWidget):
+    #Intial UI Config
+    def __init__(self, results, parent=None):
+        super().__init__(parent)
+        self.title = 'Batch Results'
+        self.left = 10
+        self.top = 10
+        self.width = 900
+        self.height = 600
+        self.results = results #List of (vmc, vmr) from runBatchProgram() or runSweepProgram()
+        self.resultWindows = [] #Keeps the opened ResultsWindow() and ComparisonWindow() alive (see keepWindow())
+        self.initUI()
+
+    #Defines the UI Interface
+    def initUI(self):
+        self.setWindowTitle(self.title)
+        self.setGeometry(self.left, self.top, self.width, self.height)
+        self.layout = QVBoxLayout()
+        self.headingLabel = QLabel(f"{len(self.results)} runs, double click a run to show its results", self)
+        self.runList = QListWidget(self)
+        for i, (vmc, vmr) in enumerate(self.results):
+            self.runList.addItem(self.runText(i, vmc, vmr))
+        self.runList.itemDoubleClicked.connect(self.openRun)
+        runs = [(vmc, vmr, f'run_{i + 1}') for i, (vmc, vmr) in enumerate(self.results) if vmr is not False]
+        self.layout.addWidget(ExportBar(runs, self)) #Exports the plots of every run, each to its own folder
+        self.compareButton = QPushButton('Compare Runs', self)
+        self.compareButton.setEnabled(len(runs) > 0)
+        self.compareButton.clicked.connect(self.compareRuns)
+        self.layout.addWidget(self.headingLabel)
+        self.layout.addWidget(self.runList)
+        self.layout.addWidget(self.compareButton)
+        self.setLayout(self.layout)
+
+    #Creates the text describing a single run in the list
+    def runText(self, i, vmc, vmr):
+        if(vmc is False): #The config could not be created
+            return f"Run {i + 1}: (failed)"
+        text = (f"Run {i + 1}: base_q = {vmc.production.base_q}, tau_d = {vmc.parent.tau_d}, "
+                f"grid = {vmc.grid.radial_points} x {vmc.grid.angular_points} x {vmc.grid.radial_substeps}")
+        if(vmr is False):
+            text += " (failed)"
+        return text
+
+    #Opens the ResultsWindow() of the double clicked run
+    def openRun(self, item):
+        vmc, vmr = self.results[self.runList.row(item)]
+        if(vmr is False): #The config could not be run
+            return
+        resultWindow = ResultsWindow(vmc, vmr)
+        resultWindow.show()
+        keepWindow(self.resultWindows, resultWindow)
+
+    #Compare Runs button, overlays the profiles of every run that did not fail
+    def compareRuns(self):
+        runs = [(vmr, self.runText(i, vmc, vmr)) for i, (vmc, vmr) in enumerate(self.results) if vmc is not False and vmr is not False]
+        resultWindow = ComparisonWindow([vmr for vmr, label in runs], [label for vmr, label in runs])
+        resultWindow.show()
+        keepWindow(self.resultWindows, resultWindow)
+
+#Comparison window
+#Class to give a pop up window overlaying the radial and column density profiles of many runs on shared axes.
+#The profiles are converted to the same units once and plotted as animated lines, toggling a run only blits the lines
+#over a saved background of the axes instead of redrawing the whole figure.
+class ComparisonWindow(QWidget):
+    #Intial UI Config
+    def __init__(self, vmrs, labels, parent=None):
+        super().__init__(parent)
+        self.title = 'Compare Runs'
+        self.left = 10
+        self.top = 10
+        self.width = 1800
+        self.height = 1200
+        self.profiles = [getComparisonProfiles(vmr) for vmr in vmrs] #Unit converted arrays of every run
+        self.labels = labels
+        self.background = None #Figure without the lines, saved after every full draw
+        self.initUI()
+
+    #Defines the UI Interface
+    def initUI(self):
+        self.setWindowTitle(self.title)
+        self.setGeometry(self.left, self.top, self.width, self.height)
+        self.layout = QHBoxLayout()
+        figure, self.lines = getComparisonPlot(self.profiles, self.labels)
+        for runLines in self.lines:
+            for line in runLines:
+                line.set_animated(True) #Only drawn by drawLines(), never by a full draw
+        self.decimated = decimateFigure(figure) #Keeps the lines of fine grids fast to blit
+        self.canvas = FigureCanvasQTAgg(figure)
+        self.canvas.mpl_connect('draw_event', self.saveBackground) #Pan, zoom and resizes redraw the background
+        plotLayout = QVBoxLayout()
+        plotLayout.addWidget(self.canvas)
+        plotLayout.addWidget(NavigationToolbar2QT(self.canvas, self))
+
+        #Run list, checking a run shows its lines, the text color is the color of its lines
+        self.runList = QListWidget(self)
+        for label, (radialLine, columnLine) in zip(self.labels, self.lines):
+            item = QListWidgetItem(label)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            item.setForeground(QColor(to_hex(radialLine.get_color())))
+            self.runList.addItem(item)
+        self.runList.itemChanged.connect(self.toggleRun)
+        self.showAllButton = QPushButton('Show All', self)
+        self.showAllButton.clicked.connect(lambda: self.setAllRuns(True))
+        self.hideAllButton = QPushButton('Hide All', self)
+        self.hideAllButton.clicked.connect(lambda: self.setAllRuns(False))
+        listLayout = QVBoxLayout()
+        listLayout.addWidget(self.runList)
+        listLayout.addWidget(self.showAllButton)
+        listLayout.addWidget(self.hideAllButton)
+        self.layout.addLayout(plotLayout, 3)
+        self.layout.addLayout(listLayout, 1)
+        self.setLayout(self.layout)
+
+    #Saves the background after a full draw of the figure, then draws the lines over it
+    def saveBackground(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.drawLines()
+
+    #Draws the visible lines over the saved background and blits the figure
+    def drawLines(self):
+        if(self.background == None): #The figure was never drawn
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        for runLines in self.lines:
+            for line in runLines:
+                if(line.get_visible()):
+                    line.axes.draw_artist(line)
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    #Shows or hides the lines of a run when its item is checked or unchecked
+    def toggleRun(self, item):
+        for line in self.lines[self.runList.row(item)]:
+            line.set_visible(item.checkState() == Qt.Checked)
+        self.drawLines()
+
+    #Show All and Hide All buttons, the lines are blitted once for every run
+    def setAllRuns(self, visible):
+        self.runList.blockSignals(True)
+        for i, runLines in enumerate(self.lines):
+            self.runList.item(i).setCheckState(Qt.Checked if visible else Qt.Unchecked)
+            for line in runLines:
+                line.set_visible(visible)
+        self.runList.blockSignals(False)
+        self.drawLines()
+
+#Sweep window
+#Class to give a pop up window with a live job table of a parameter sweep, the jobs are run in parallel by runSweepProgram().
+class SweepWindow(QWidget):
+    jobChanged = pyqtSignal(int, str, float) #Emitted from the sweep worker with the job index, state and runtime
+
+    #Intial UI Config
+    def __init__(self, sweepId, workers=None, useServer=False, parent=None):
+        super().__init__(parent)
+        self.title = 'Parameter Sweep'
+        self.left = 10
+        self.top = 10
+        self.width = 900
+        self.height = 600
+        self.sweepId = sweepId #Id of the sweep in the job queue (see JobQueue.py)
+        self.labels = [job['label'] for job in sweepJobs(sweepId)] #Sweep parameters of every job
+        self.workers = workers
+        self.useServer = useServer #Sends the jobs to the job server if one is running
+        self.jobStarts = {} #Time each running job was seen starting, by job index
+        self.results = None
+        self.resultWindows = [] #Keeps the opened BatchResultsWindow() alive (see keepWindow())
+        self.initUI()
+
+    #Defines the UI Interface
+    def initUI(self):
+        self.setWindowTitle(self.title)
+        self.setGeometry(self.left, self.top, self.width, self.height)
+        self.layout = QVBoxLayout()
+        self.statusText = QLabel(f"{len(self.labels)} jobs", self)
+        self.jobTable = QTableWidget(len(self.labels), 4, self) #Job, parameters, state and runtime of every job
+        self.jobTable.setHorizontalHeaderLabels(["Job", "Parameters", "State", "Runtime (s)"])
+        self.jobTable.horizontalHeader().setStretchLastSection(True)
+        for i, label in enumerate(self.labels):
+            self.jobTable.setItem(i, 0, QTableWidgetItem(str(i + 1)))
+            self.jobTable.setItem(i, 1, QTableWidgetItem(label))
+            self.jobTable.setItem(i, 2, QTableWidgetItem('queued'))
+            self.jobTable.setItem(i, 3, QTableWidgetItem(''))
+        self.jobTable.resizeColumnToContents(1)
+        self.cancelButton = QPushButton('Cancel Sweep', self)
+        self.cancelButton.clicked.connect(self.cancelSweep)
+        self.resultsButton = QPushButton('Show Results', self)
+        self.resultsButton.setEnabled(False) #Enabled when every job is finished
+        self.resultsButton.clicked.connect(self.showResults)
+        self.layout.addWidget(self.statusText)
+        self.layout.addWidget(self.jobTable)
+        self.layout.addWidget(self.cancelButton)
+        self.layout.addWidget(self.resultsButton)
+        self.setLayout(self.layout)
+
+        self.timer = QTimer(self) #Updates the runtime of the running jobs every second
+        self.timer.timeout.connect(self.updateRuntimes)
+        self.timer.start(1000)
+        self.jobChanged.connect(self.updateJob)
+        self.sweepWorker = RunWorker(self.runJobs, (), self)
+        self.sweepWorker.progress.connect(self.statusText.setText)
+        self.sweepWorker.completed.connect(self.sweepCompleted)
+        self.sweepWorker.cancelled.connect(self.sweepCancelled)
+        self.sweepWorker.failed.connect(self.sweepFailed)
+        self.sweepWorker.start()
+
+    #Runs the unfinished jobs of the sweep, runs on the sweep worker
+    def runJobs(self, progressCallback=None):
+        return runSweepProgram(self.sweepId, self.workers, self.jobChanged.emit, progressCallback, useServer=self.useServer)
+
+    #Updates the state and runtime of a job in the job table
+    def updateJob(self, index, state, seconds):
+        self.jobTable.item(index, 2).setText(state)
+        if(state == 'running'):
+            self.jobStarts[index] = time.perf_counter()
+        elif(state == 'done' or state == 'failed'):
+            self.jobStarts.pop(index, None)
+            self.jobTable.item(index, 3).setText(f'{seconds:.1f}')
+
+    #Shows the time since each running job started
+    def updateRuntimes(self):
+        for index, start in self.jobStarts.items():
+            self.jobTable.item(index, 3).setText(f'{time.perf_counter() - start:.0f}')
+
+    #Cancel Sweep button, queued jobs are dropped and running jobs are let finish, the unfinished jobs stay in the job queue
+    def cancelSweep(self):
+        self.sweepWorker.requestInterruption()
+        self.cancelButton.setEnabled(False)
+
+    #Called when every job is finished
+    def sweepCompleted(self, results):
+        self.timer.stop()
+        self.results = results
+        removeSweep(self.sweepId) #The results are loaded, the job queue is no longer needed (mapped result stores stay readable)
+        self.cancelButton.setEnabled(False)
+        self.resultsButton.setEnabled(True)
+
+    #Called when the sweep was cancelled
+    def sweepCancelled(self):
+        self.timer.stop()
+        self.statusText.setText('Sweep cancelled, the unfinished jobs can be resumed the next time the program starts.')
+
+    #Called when the sweep raised an error, the unfinished jobs stay in the job queue
+    def sweepFailed(self, message):
+        self.timer.stop()
+        self.cancelButton.setEnabled(False)
+        self.statusText.setText(f'Sweep failed: {message}\nThe unfinished jobs can be resumed the next time the program starts.')
+
+    #Show Results button, opens the results browser of the sweep
+    def showResults(self):
+        resultWindow = BatchResultsWindow(self.results)
+        resultWindow.show()
+        keepWindow(self.resultWindows, resultWindow)
+
 #Time Variation window.
 #Class to give the user the option to add time variation in anthor window.
 class TimeVarWindow(QWidget):
@@ -577,7 +1135,7 @@ class MoreWindow(QWidget):
         self.inputText1.move(40,120)
         self.inputText2 = QLabel("---Delta under \"comet variables\" is optional as it does not influence the results.", self)
         self.inputText2.move(40,155)
-        self.inputText2 = QLabel("---In using a manual input, a .yaml file is created, \"keeping the .yaml file\" will save to your current directory named \"pyvectorial.yaml\".", self)
+        self.inputText2 = QLabel("---In using a manual input, \"keeping the .yaml file\" will save the inputs to your current directory named \"pyvectorial.yaml\".", self)
         self.inputText2.move(40,190)
         self.inputText3 = QLabel("---\"Transformation method\" and \"time variation type\" can only have 1 applied max.", self)
         self.inputText3.move(40,225)
@@ -603,7 +1161,7 @@ class MoreWindow(QWidget):
         self.outputText6.move(400,570)
         self.outputText7 = QLabel ("Fragment Agreement Check", self)
         self.outputText7.move(650,570)
-        self.outputText8 = QLabel ("Fragment Aperture Check (not given for pickle file input)", self)
+        self.outputText8 = QLabel ("Fragment Aperture Check (computed after the results are shown)", self)
         self.outputText8.move(400,590)
         self.show()
 
@@ -618,7 +1176,10 @@ class App(QMainWindow):
         self.left = 10
         self.top = 10
         self.width = 1250 #Defines the size of the UI window
-        self.height = 780 #Defines the size of the UI window
+        self.height = 900 #Defines the size of the UI window
+        self.runWorker = None #Background worker of the current model run, None if no run is going
+        self.resultWindows = [] #Keeps the opened results windows alive (see keepWindow())
+        self.sweepWins = [] #Keeps the sweep windows alive while their sweeps run (see keepWindow())
         self.initUI()
     
     #Defines the UI Interface
@@ -828,6 +1389,24 @@ class App(QMainWindow):
         self.radSubBox.move(600,590)
         self.radSubBox.resize(100,25)
 
+        #Creates manual input UI elements for parameter sweeps
+        self.sweepText = QLabel("*Float inputs as ranges (a:b:n) or lists (a, b) run a sweep", self)
+        self.sweepText.move(450,620)
+        self.sweepText.resize(330,30)
+        self.lhsBox = QCheckBox("", self) #Latin hypercube sampling of the sweep, full grid if unchecked
+        self.lhsBox.setChecked(False)
+        self.lhsBox.move(450,645)
+        self.lhsBox.resize(30,30)
+        self.lhsText = QLabel("Latin Hypercube", self)
+        self.lhsText.move(478,645)
+        self.lhsText.resize(110,30)
+        self.samplesText = QLabel("Samples: ", self)
+        self.samplesText.move(595,645)
+        self.samplesText.resize(65,30)
+        self.samplesBox = QLineEdit(self)
+        self.samplesBox.move(660,648)
+        self.samplesBox.resize(70,25)
+
         #Creates other UI elements such as certain check boxes/text and other UI stuff
         self.keepFile = QCheckBox("", self)
         self.keepFile.setChecked(False)
@@ -838,8 +1417,20 @@ class App(QMainWindow):
         self.keepFileBox.resize(150,40)
         self.runProgramButton = QPushButton('Run Program', self)
         self.runProgramButton.move(815,730)
-        self.runProgramButton.resize(400,30)
+        self.runProgramButton.resize(195,30)
         self.runProgramButton.clicked.connect(self.runProg)
+        self.cancelButton = QPushButton('Cancel Run', self)
+        self.cancelButton.move(1020,730)
+        self.cancelButton.resize(195,30)
+        self.cancelButton.setEnabled(False) #Only enabled while a run is going
+        self.cancelButton.clicked.connect(self.cancelRun)
+        self.progressText = QLabel("Run Progress", self)
+        self.progressText.move(30,780)
+        self.progressText.resize(200,30)
+        self.progressOut = QListWidget(self) #Displays the progress lines of the current run
+        self.progressOut.setStyleSheet("border: 1px solid #fff; padding: 10px; border-style: solid; color: #EEEADE; border-radius: 10px; background: #616161;")
+        self.progressOut.move(15,815)
+        self.progressOut.resize(1200,70)
         self.file = QPushButton('*.yaml File Upload', self)
         self.file.move(815,110)
         self.file.resize(400,30)
@@ -888,8 +1479,33 @@ class App(QMainWindow):
         self.pickleProgramButtonText.move(900,555)
         self.pickleProgramButtonText.setFont((QFont('Arial', 18)))
         self.pickleProgramButtonText.setStyleSheet("color: #EEEADE; background: #616161")
+        self.batchRun = QCheckBox("", self)
+        self.batchRun.setChecked(False)
+        self.batchRun.move(815,620)
+        self.batchRun.resize(40,30)
+        self.batchRunText = QLabel("*Batch Run All .yaml Configs", self)
+        self.batchRunText.move(843,620)
+        self.batchRunText.resize(190,30)
+        self.workersText = QLabel("Workers: ", self)
+        self.workersText.move(1060,620)
+        self.workersText.resize(70,30)
+        self.workersBox = QLineEdit(self) #Number of worker processes for a batch run or sweep, blank uses every core
+        self.workersBox.move(1125,623)
+        self.workersBox.resize(90,25)
+        self.serverBox = QCheckBox("", self) #Sends runs, batches and sweeps to the job server (vectorial-server) if one is running
+        self.serverBox.setChecked(UseJobServer)
+        self.serverBox.move(815,650)
+        self.serverBox.resize(40,30)
+        self.serverBoxText = QLabel("*Use Job Server (vectorial-server)", self)
+        self.serverBoxText.move(843,650)
+        self.serverBoxText.resize(250,30)
 
         self.show() #Shows the window
+        if(WarmUpImports): #The first run does not wait for the heavy imports, the worker pool is only started by the first batch,
+            #sweep, export or aperture check (its workers then start with the heavy modules already imported)
+            self.warmWorker = RunWorker(warmImports, (), self)
+            self.warmWorker.start()
+        self.resumeSweeps()
 
     #Creates pop up windows for successful run or error throws
     def popUpWin(self, type, message=None):
@@ -917,6 +1533,10 @@ class App(QMainWindow):
                 self.message.setText("No input type was selected. \nPlease try again.")
             elif(type == 'incorrect file run'): #User's manual/file input was unable to be calculated properly
                 self.message.setText("The data in the input was unable to converted to results. \nPlease try again.")
+            elif(type == 'run in progress'): #User pressed run while another run was still going
+                self.message.setText("A program run is already in progress. \nPlease wait for it to finish or cancel it.")
+            elif(type == 'run error'): #The program raised an error during the run (missing package, broken worker pool, unreadable file)
+                self.message.setText(f"The run stopped with an error: \n{message} \nPlease try again.")
             else:
                 return
         self.message.show() #Shows the pop up window
@@ -959,63 +1579,210 @@ class App(QMainWindow):
         self.Win = TimeVarWindow()
         self.Win.show()
         
+    #Starts a RunWorker() for the given FileRunner.py program, onCompleted is called with the vmc and vmr
+    def startRun(self, program, args, onCompleted):
+        self.progressOut.clear()
+        self.runWorker = RunWorker(program, args, self)
+        self.runWorker.progress.connect(self.showProgress)
+        self.runWorker.completed.connect(onCompleted)
+        self.runWorker.cancelled.connect(self.runCancelled)
+        self.runWorker.failed.connect(self.runFailed)
+        self.runWorker.finished.connect(self.runFinished)
+        self.runProgramButton.setEnabled(False)
+        self.cancelButton.setEnabled(True)
+        self.runWorker.start()
+
+    #Adds a progress line from the worker to the progressOut widget
+    def showProgress(self, line):
+        self.progressOut.addItem(line)
+        self.progressOut.scrollToBottom()
+
+    #Cancel Run button, asks the worker to stop at the next progress line
+    def cancelRun(self):
+        if(self.runWorker != None):
+            self.runWorker.requestInterruption()
+            self.cancelButton.setEnabled(False)
+
+    #Called when the worker stopped because of the cancel button
+    def runCancelled(self):
+        self.showProgress('Run cancelled.')
+
+    #Called when the program raised an error on the worker
+    def runFailed(self, message):
+        self.showProgress(f'Run failed: {message}')
+        self.popUpWin('run error', message)
+
+    #Called when the worker thread is done (completed, cancelled or failed), resets the run buttons
+    def runFinished(self):
+        self.runWorker.deleteLater()
+        self.runWorker = None
+        self.runProgramButton.setEnabled(True)
+        self.cancelButton.setEnabled(False)
+
+    #Shows the results of a completed run (yaml or pickle)
+    def showResults(self, result):
+        global CurrentUIRun
+        vmc, vmr = result
+        if(vmc is False): #Test to see if the program was able to run properly
+            self.popUpWin('incorrect file run')
+            return
+        self.popUpWin('success') #Opens the successful run pop up window
+        profile = None if CurrentUIRun.PickleInputs else CurrentUIRun.Profile #Pickle input has no run stages
+        comaKey = None if CurrentUIRun.PickleInputs else CurrentUIRun.ComaKey #Pickle input has no coma
+        resultWindow = ResultsWindow(vmc, vmr, profile, comaKey) #Creates the results with the vmc and vmr
+        resultWindow.show() #Shows the results window
+        keepWindow(self.resultWindows, resultWindow) #Kept apart from self.Win so its checks and exports are not destroyed while running
+
+    #Shows the results of a completed pickle run, the pickle is only tested by reading it in runFilePickleProgram()
+    def showPickleResults(self, result):
+        if(result[0] is False): #Test to see if pyvectorial could read the pickle in FileRunner.py
+            self.popUpWin('incorrect pickle')
+            return
+        self.showResults(result)
+
+    #Shows the results browser of a completed batch run
+    def showBatchResults(self, results):
+        if(results is False or len(results) == 0): #Test to see if the file could be expanded into configs
+            self.popUpWin('incorrect file run')
+            return
+        self.popUpWin('success')
+        resultWindow = BatchResultsWindow(results)
+        resultWindow.show()
+        keepWindow(self.resultWindows, resultWindow)
+
+    #Gets the text of a manual input, a sweep input (range or list) gives its first value for the single value checks
+    def manualText(self, box):
+        if(isSweepText(box.text())):
+            values = parseSweep(box.text())
+            if(values != None):
+                return str(values[0])
+        return box.text()
+
+    #Gets the manual float inputs that can be swept as UIInputData field : (input box, name)
+    def sweepFields(self):
+        return {'BaseQ' : (self.baseQBox, 'Base Q'), 'VOutflow' : (self.outVBox, 'Outflow Velocity'),
+                'TauD' : (self.tauDBox, 'Tau_D'), 'Sigma' : (self.sigmaBox, 'Sigma'), 'TtoDRatio' : (self.t_DBox, 'T to D Ratio'),
+                'VPhoto' : (self.vPhotoBox, 'VPhoto'), 'TauT' : (self.tauTFragBox, 'Tau_T'), 'Rh' : (self.rHBox, 'Rh')}
+
+    #Gets the number of worker processes, None uses every core and False means the input was incorrect
+    def readWorkers(self):
+        if(self.workersBox.text() == ''):
+            return None
+        if(valueTest(self.workersBox.text(), 'int') and int(float(self.workersBox.text())) > 0):
+            return int(float(self.workersBox.text()))
+        self.popUpWin('incorrect data', 'Workers')
+        return False
+
+    #Expands the manual inputs into a sweep (full grid or Latin hypercube) and runs it in a SweepWindow()
+    def runSweep(self, sweepValues):
+        global CurrentUIRun
+        if(self.lhsBox.isChecked()):
+            if(valueTest(self.samplesBox.text(), 'int') == False or int(float(self.samplesBox.text())) < 1):
+                self.popUpWin('incorrect data', 'Samples')
+                return
+            points = latinHypercube(sweepValues, int(float(self.samplesBox.text())))
+        else:
+            points = gridSweep(sweepValues)
+        workers = self.readWorkers()
+        if(workers is False):
+            return
+        dicts = [createDictionary(replace(CurrentUIRun, **point)) for point in points] #Every job is the manual inputs with its sweep values
+        sweepId = addSweep(dicts, [sweepLabel(point) for point in points], 'manual sweep') #Kept in the job queue until every job is finished
+        sweepWindow = SweepWindow(sweepId, workers, self.serverBox.isChecked())
+        sweepWindow.show()
+        keepWindow(self.sweepWins, sweepWindow) #A sweep window is kept while its sweep runs, even once another sweep starts
+
+    #Asks to resume every sweep left unfinished in the job queue by a previous session (closed, cancelled or crashed)
+    #Command line sweeps are left for vectorial-cli --resume, sweeps still running in another window or process are not offered
+    def resumeSweeps(self):
+        removeFinishedSweeps() #Finished sweeps whose results were never loaded can not be resumed
+        for sweep in unfinishedSweeps():
+            if(sweep['output'] != None):
+                continue
+            answer = QMessageBox.question(self, "Unfinished Sweep", f"A {sweep['name']} from a previous session has {sweep['finished']}/{sweep['total']} "
+                    "jobs finished.\nResume it? (No keeps it for later, Discard removes it)", QMessageBox.Yes | QMessageBox.No | QMessageBox.Discard)
+            if(answer == QMessageBox.Yes):
+                sweepWindow = SweepWindow(sweep['id'], None, self.serverBox.isChecked())
+                sweepWindow.show()
+                keepWindow(self.sweepWins, sweepWindow)
+            elif(answer == QMessageBox.Discard):
+                try:
+                    claimSweep(sweep['id']) #Another process may have resumed it while the question was open
+                except SweepOwned:
+                    continue
+                removeSweep(sweep['id'])
+
     #Run Program button
     def runProg(self):
         global CurrentUIRun
+        if(self.runWorker != None): #Only one run can go at a time
+            self.popUpWin('run in progress')
+            return
         CurrentUIRun.PickleInputs = False
+        CurrentUIRun.UseJobServer = self.serverBox.isChecked()
 
         #Manual input runner
         #Test proper user input and assigns the results to global variables
         #Throws errors if user input is not correct
         if(self.manProgramButton.isChecked()):
 
+            #Sweep Declarations
+            sweepValues = {} #Values of every manual input given as a range or list
+            for field, (box, name) in self.sweepFields().items():
+                if(isSweepText(box.text())):
+                    values = parseSweep(box.text())
+                    if(values == None or all(valueTest(val, 'float') for val in values) == False):
+                        self.popUpWin('incorrect data', name)
+                        return
+                    sweepValues[field] = values
+
             #Param Declarations
-            if(valueTest(self.baseQBox.text(), 'float')): #Test to see if the manual input is a correct type for all data required
-                CurrentUIRun.BaseQ = float(self.baseQBox.text())
+            if(valueTest(self.manualText(self.baseQBox), 'float')): #Test to see if the manual input is a correct type for all data required
+                CurrentUIRun.BaseQ = float(self.manualText(self.baseQBox))
             else:
                 self.popUpWin('incorrect data', 'Base Q') #Throws an error if any data is an incorrect type and exits the program
                 return
 
             #Parent Declarations
             CurrentUIRun.ParentName = self.parNameBox.text()
-            if(valueTest(self.outVBox.text(), 'float')):
-                CurrentUIRun.VOutflow = float(self.outVBox.text())
+            if(valueTest(self.manualText(self.outVBox), 'float')):
+                CurrentUIRun.VOutflow = float(self.manualText(self.outVBox))
             else:
                 self.popUpWin('incorrect data', 'Outflow Velocity')
                 return
-            if(valueTest(self.tauDBox.text(), 'float')):
-                CurrentUIRun.TauD = float(self.tauDBox.text())
+            if(valueTest(self.manualText(self.tauDBox), 'float')):
+                CurrentUIRun.TauD = float(self.manualText(self.tauDBox))
             else:
                 self.popUpWin('incorrect data', 'Tau_D')
                 return
-            if(valueTest(self.sigmaBox.text(), 'float')):
-                CurrentUIRun.Sigma = float(self.sigmaBox.text())
+            if(valueTest(self.manualText(self.sigmaBox), 'float')):
+                CurrentUIRun.Sigma = float(self.manualText(self.sigmaBox))
             else:
                 self.popUpWin('incorrect data', 'Sigma')
                 return
-            if(valueTest(self.t_DBox.text(), 'float')):
-                CurrentUIRun.TtoDRatio = float(self.t_DBox.text())
+            if(valueTest(self.manualText(self.t_DBox), 'float')):
+                CurrentUIRun.TtoDRatio = float(self.manualText(self.t_DBox))
             else:
                 self.popUpWin('incorrect data', 'T to D Ratio')
                 return
 
             #Fragment Declarations
             CurrentUIRun.FragmentName = self.fragNameBox.text()
-            if(valueTest(self.vPhotoBox.text(), 'float')):
-                CurrentUIRun.VPhoto = float(self.vPhotoBox.text())
+            if(valueTest(self.manualText(self.vPhotoBox), 'float')):
+                CurrentUIRun.VPhoto = float(self.manualText(self.vPhotoBox))
             else:
                 self.popUpWin('incorrect data', 'VPhoto')
                 return
-            if(valueTest(self.tauTFragBox.text(), 'float')):
-                CurrentUIRun.TauT = float(self.tauTFragBox.text())
+            if(valueTest(self.manualText(self.tauTFragBox), 'float')):
+                CurrentUIRun.TauT = float(self.manualText(self.tauTFragBox))
             else:
                 self.popUpWin('incorrect data', 'Tau_T')
                 return
 
             #Comet Declarations
             CurrentUIRun.CometName = self.cometNameBox.text()
-            if(valueTest(self.rHBox.text(), 'float')):
-                CurrentUIRun.Rh = float(self.rHBox.text())
+            if(valueTest(self.manualText(self.rHBox), 'float')):
+                CurrentUIRun.Rh = float(self.manualText(self.rHBox))
             else:
                 self.popUpWin('incorrect data', 'Rh')
                 return
@@ -1062,15 +1829,12 @@ class App(QMainWindow):
                 return
             
             #Runs the program
-            vmc, vmr = runManualProgram(CurrentUIRun) #Runs the manuel program, creating a yaml file, vmc and vmr in FileCreator.py and FileRunner.py
-            if(self.keepFile.isChecked() == False): #Removes the file if the keepFile == False
-                removeFile('pyvectorial.yaml')
-            if(vmc == False): #Test to see if the program was able to run properly
-                self.popUpWin('incorrect file run')
+            if(len(sweepValues) > 0): #Runs a sweep instead of a single run
+                self.runSweep(sweepValues)
                 return
-            self.popUpWin('success') #Opens the successful run pop up window
-            self.Win = ResultsWindow(vmc, vmr) #Creates the results with the vmc and vmr
-            self.Win.show() #Shows the results window
+            if(self.keepFile.isChecked()): #Only writes the yaml file when the user wants to keep it, the run itself does not need it
+                newFileManual(CurrentUIRun)
+            self.startRun(runManualProgram, (CurrentUIRun,), self.showResults) #Runs the manuel program on a worker, creating a vmc and vmr in FileRunner.py
             return
         
         #Yaml input runner
@@ -1080,36 +1844,40 @@ class App(QMainWindow):
             if (os.path.isfile(f"{CurrentUIRun.YamlFile}") == False): #Test to see if the user uploaded a file
                 self.popUpWin('no file')
                 return
+            if(self.batchRun.isChecked()): #Runs every config of the file in parallel
+                errors = validateFile(CurrentUIRun.YamlFile, batch=True) #Tests every document and sweep value before any run starts
+                if(len(errors) > 0):
+                    self.popUpWin('incorrect yaml', ', '.join(errors))
+                    return
+                workers = self.readWorkers()
+                if(workers is False):
+                    return
+                self.startRun(runBatchProgram, (CurrentUIRun.YamlFile, workers, self.serverBox.isChecked()), self.showBatchResults)
+                return
             testResult, message = fileTest(CurrentUIRun.YamlFile, CurrentUIRun) #Gets the bool test result and a message if testResult = False
             if (testResult): #Reads the file to see if it is formatted properly  
                 #Runs the program
-                vmc, vmr = runFileYamlProgram(CurrentUIRun.YamlFile, CurrentUIRun) #Runs the yaml file, creating a vmc and vmr in FileRunner.py
-                if(vmc == False):
-                    self.popUpWin('incorrect file run')
-                    return
-                self.popUpWin('success')
-                self.Win = ResultsWindow(vmc, vmr)
-                self.Win.show()
+                self.startRun(runFileYamlProgram, (CurrentUIRun.YamlFile, CurrentUIRun), self.showResults) #Runs the yaml file on a worker, creating a vmc and vmr in FileRunner.py
             else:
                 self.popUpWin('incorrect yaml', message) #Throws an error meaning that the user's file dict was missing important info
             return
         
         #Pickle input runner
-        #Test to see if the pickle file can be understood and runs the results from that.
+        #Test to see if the pickle file (or result store) can be understood and runs the results from that.
         #Throws an error if the test fails.
         elif(self.pickleProgramButton.isChecked()):
             CurrentUIRun.PickleInputs = True
             if (os.path.exists(f"{CurrentUIRun.PyvComaPickle}") == False): #Test to see if the user uploaded a file
                 self.popUpWin('no file')
                 return
-            if(pickleTest(CurrentUIRun.PyvComaPickle) == False): #Test to see if pyvectorial can read the pickle in FileRunner.py
-                self.popUpWin('incorrect pickle')
+            if(CurrentUIRun.PyvComaPickle.endswith('.vms')): #Result store, only its header is tested
+                if(storeTest(CurrentUIRun.PyvComaPickle) == False):
+                    self.popUpWin('incorrect pickle')
+                    return
+                self.startRun(runFileStoreProgram, (CurrentUIRun.PyvComaPickle,), self.showResults) #Opens the result store on a worker, creating a default vmc and memory mapped vmr in FileRunner.py
                 return
             #Runs the program
-            vmc, vmr = runFilePickleProgram(CurrentUIRun.PyvComaPickle) #Runs the pickle file, creating a default vmc and proper vmr in FileRunner.py
-            self.popUpWin('success')
-            self.Win = ResultsWindow(vmc, vmr) 
-            self.Win.show() 
+            self.startRun(runFilePickleProgram, (CurrentUIRun.PyvComaPickle,), self.showPickleResults) #Runs the pickle file on a worker, creating a default vmc and proper vmr in FileRunner.py
             return
         else:
             self.popUpWin('no input')
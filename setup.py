@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 
-from distutils.core import setup
-from setuptools import find_packages
+from setuptools import setup
 
 setup(name='vectorial_ui',
       version='0.1',
@@ -9,5 +8,10 @@ setup(name='vectorial_ui',
       author='Jacob Duffy',
       author_email='jod0007@auburn.edu',
       url='https://github.com/jduffy0121/VectorialUI',
-      scripts=['UICreator.py']
-     )
\ No newline at end of file
+      packages=['vectorial_ui'],
+      package_dir={'vectorial_ui' : 'utils'}, #The utils folder is installed as vectorial_ui so it can not clash with other utils packages
+      package_data={'vectorial_ui' : ['Test Files/*']}, #Example inputs, the benchmark runs its seed config from them
+      scripts=['UICreator.py'],
+      entry_points={'console_scripts' : ['vectorial-cli = vectorial_ui.CommandLine:main', 'vectorial-benchmark = vectorial_ui.Benchmark:main',
+                                            'vectorial-server = vectorial_ui.JobServer:main']}
+     )
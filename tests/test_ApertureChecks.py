@@ -0,0 +1,38 @@
+#Tests that the curve of growth gives the same number of fragments as integrating each aperture on its own, for apertures
+#inside and outside the first column density grid radius
+#
+#Version: 10/18/2026
+
+import types
+import pytest
+import numpy as np
+
+pytest.importorskip('matplotlib')
+u = pytest.importorskip('astropy.units')
+interpolate = pytest.importorskip('scipy.interpolate')
+
+from utils.ApertureChecks import apertureNumber, apertureCounts
+
+MinRadius = 1000 #First column density grid radius (km)
+MaxRadius = 1000000 #Last column density grid radius (km)
+
+#Method def for getting a vmr with only the column density fields the checks read, the column density falls off as 1/r
+def columnDensityResult():
+    grid = np.geomspace(MinRadius, MaxRadius, 200) * u.km
+    interpolation = interpolate.CubicSpline(grid.to_value(u.m), 1e20 / grid.to_value(u.m))
+    return types.SimpleNamespace(column_density_grid=grid, column_density_interpolation=interpolation)
+
+#Method def for integrating an aperture on its own, the same way the aperture checks do
+def singleNumber(vmr, shape, sizes):
+    grid = vmr.column_density_grid.to_value(u.m)
+    return apertureNumber(shape, sizes, vmr.column_density_interpolation, grid.min(), grid.max())
+
+@pytest.mark.parametrize('radius', [MinRadius / 4, MinRadius / 2, 3 * MinRadius, 50000])
+def test_circular(radius):
+    vmr = columnDensityResult()
+    assert apertureCounts(vmr, radius) == pytest.approx(singleNumber(vmr, 'circular', (radius,)), rel=1e-3)
+
+@pytest.mark.parametrize('inner, outer', [(MinRadius / 4, MinRadius / 2), (MinRadius / 2, 5000), (20000, 400000)])
+def test_annular(inner, outer):
+    vmr = columnDensityResult()
+    assert apertureCounts(vmr, outer, inner) == pytest.approx(singleNumber(vmr, 'annular', (inner, outer)), rel=1e-3)
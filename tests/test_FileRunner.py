@@ -0,0 +1,67 @@
+#Tests that vmcFromDict() builds the same vmc as pyvectorial's own yaml reader, for the seed config and every time variation type
+#
+#Version: 10/18/2026
+
+import yaml
+import pytest
+
+pyv = pytest.importorskip('pyvectorial')
+pytest.importorskip('matplotlib')
+u = pytest.importorskip('astropy.units')
+
+from utils.FileRunner import vmcFromDict
+from utils.Benchmark import SeedFile, BenchmarkVariations, caseConfig
+from utils.ConfigValidator import validateConfig
+
+ModelSections = ['production', 'parent', 'fragment', 'comet', 'grid'] #Sections of the vmc that go into the model
+
+#Method def for testing that a value of the vmc matches the value pyvectorial read, quantities only need to be equal in any unit
+def assertSameValue(value, expected, path):
+    if(isinstance(expected, u.Quantity)):
+        assert isinstance(value, u.Quantity) and u.allclose(value, expected), path
+    elif(isinstance(expected, dict)):
+        assert isinstance(value, dict) and value.keys() == expected.keys(), path
+        for key in expected:
+            assertSameValue(value[key], expected[key], f'{path}.{key}')
+    elif(hasattr(expected, '__dict__')):
+        assertSameValue(vars(value), vars(expected), path)
+    else:
+        assert value == expected, path
+
+#Method def for getting the seed config
+def seedConfig():
+    with open(SeedFile, 'r') as file:
+        return yaml.safe_load(file)
+
+#Method def for getting the vmc pyvectorial reads from a config written to a yaml file
+def pyvConfig(config, tmp_path):
+    path = tmp_path / 'config.yaml'
+    with open(path, 'w') as file:
+        yaml.safe_dump(config, file)
+    return pyv.vm_configs_from_yaml(path)[0]
+
+#Compares every model section, the comet delta is left out as it does not influence the results
+def assertSameConfig(vmc, expected):
+    for section in ModelSections:
+        value, expectedValue = vars(getattr(vmc, section)), vars(getattr(expected, section))
+        if(section == 'comet'):
+            value, expectedValue = dict(value), dict(expectedValue)
+            value.pop('delta', None)
+            expectedValue.pop('delta', None)
+        assertSameValue(value, expectedValue, section)
+
+def test_seed_config(tmp_path):
+    config = seedConfig()
+    assertSameConfig(vmcFromDict(config), pyvConfig(config, tmp_path))
+
+@pytest.mark.parametrize('variationType', BenchmarkVariations)
+def test_time_variation(variationType, tmp_path):
+    config = caseConfig(seedConfig(), '50x30x20', variationType)
+    assertSameConfig(vmcFromDict(config), pyvConfig(config, tmp_path))
+
+def test_unknown_params():
+    config = caseConfig(seedConfig(), '50x30x20', 'sine wave')
+    config['production']['params']['phase'] = 1.0
+    assert '["production"]["params"]["phase"]' in validateConfig(config)
+    with pytest.raises(ValueError):
+        vmcFromDict(config)
@@ -0,0 +1,119 @@
+#Program to check the percent of fragments recovered by integrating the column density of a vmr over apertures.
+#The checks only need the vmr (its column density interpolation), so they run after the results are shown and
+#work the same for new runs, cached runs, pickles and result stores.
+#Apertures are given in km as 'circular r', 'annular r_inner r_outer', 'rectangular width height' or 'gaussian sigma',
+#every aperture is centered on the nucleus and is integrated as its own job of the shared worker pool (see WorkerPool.py).
+#The curve of growth (fragments inside circular apertures of every radius) is integrated once and gives the number of
+#fragments in any array of circular or annular apertures in a single vectorized call.
+#
+#Version: 10/18/2026
+
+import numpy as np
+from .LazyImports import lazyImport
+from .WorkerPool import sharedPool
+
+u = lazyImport('astropy.units')
+integrate = lazyImport('scipy.integrate')
+
+ApertureShapes = {'circular' : 1, 'annular' : 2, 'rectangular' : 2, 'gaussian' : 1} #Number of sizes (km) of each aperture shape
+RadialSamples = 20001 #Points of the radial integrations
+AngularSamples = 2001 #Angles of the rectangular aperture integration
+GrowthRefinement = 10 #Points of the curve of growth between each pair of column density grid points
+
+#Method def for reading a list of apertures separated by ';' or new lines ('circular 100000; annular 50000 200000')
+#Returns a list of (shape, sizes in km, description), or None if any aperture can not be read
+def parseApertures(text):
+    apertures = []
+    for entry in text.replace('\n', ';').split(';'):
+        fields = entry.split()
+        if(len(fields) == 0):
+            continue
+        shape = fields[0].lower()
+        if(shape not in ApertureShapes or len(fields) != ApertureShapes[shape] + 1):
+            return None
+        try:
+            sizes = tuple(float(val) for val in fields[1:])
+        except ValueError:
+            return None
+        if(any(size <= 0 for size in sizes) or (shape == 'annular' and sizes[0] >= sizes[1])):
+            return None
+        apertures.append((shape, sizes, f"{shape.capitalize()} aperture, {' x '.join(f'{size:g}' for size in sizes)} km"))
+    return apertures
+
+#Method def for getting the apertures checked for every run, the same as the pyvectorial aperture checks
+def defaultApertures(vmr):
+    maxRadius = vmr.max_grid_radius.to_value(u.km)
+    return [('circular', (maxRadius,), 'Large circular aperture'),
+            ('annular', ((500000 * u.m).to_value(u.km), maxRadius), 'Annular aperture, inner radius 500000 km, outer radius of entire grid')]
+
+#Method def for integrating the column density over a single aperture, called in a worker process
+#interpolation is the column density interpolation of the vmr (1/m2 at a radius in m) between minRadius and maxRadius (m),
+#inside minRadius the column density is held at its value at minRadius and outside maxRadius it is 0
+#Returns the number of fragments in the aperture
+def apertureNumber(shape, sizes, interpolation, minRadius, maxRadius):
+    sizes = [(size * u.km).to_value(u.m) for size in sizes]
+    def columnDensity(rs):
+        return np.where(rs <= maxRadius, interpolation(np.clip(rs, minRadius, maxRadius)), 0.0)
+    if(shape == 'rectangular'): #Four times the quarter of the rectangle with x, y >= 0, integrated in polar coordinates
+        width, height = sizes[0] / 2, sizes[1] / 2
+        rs = np.linspace(0, np.hypot(width, height), RadialSamples)
+        growth = integrate.cumulative_trapezoid(rs * columnDensity(rs), rs, initial=0) #Integral of r * column density from 0 to each r
+        thetas = np.linspace(0, np.pi / 2, AngularSamples)
+        with np.errstate(divide='ignore'):
+            edges = np.minimum(width / np.cos(thetas), height / np.sin(thetas)) #Distance to the edge of the rectangle at each angle
+        return 4 * integrate.trapezoid(np.interp(edges, rs, growth), thetas)
+    if(shape == 'annular'):
+        rs = np.linspace(sizes[0], min(sizes[1], maxRadius), RadialSamples)
+    else: #Circular or gaussian
+        rs = np.linspace(0, sizes[0] if shape == 'circular' else min(10 * sizes[0], maxRadius), RadialSamples)
+    integrand = 2 * np.pi * rs * columnDensity(rs)
+    if(shape == 'gaussian'):
+        integrand *= np.exp(-rs**2 / (2 * sizes[0]**2))
+    return integrate.trapezoid(integrand, rs)
+
+#Curve of growth methods
+
+#Method def for getting the number of fragments inside circular apertures of every radius (the curve of growth)
+#The column density is integrated once, by a cumulative trapezoid on the column density grid of the vmr refined refinement times
+#Returns the aperture radii (m) and the number of fragments inside each radius
+def curveOfGrowth(vmr, refinement=GrowthRefinement):
+    grid = vmr.column_density_grid.to_value(u.m)
+    rs = np.interp(np.linspace(0, len(grid) - 1, (len(grid) - 1) * refinement + 1), np.arange(len(grid)), grid) #Refined grid
+    density = vmr.column_density_interpolation(rs)
+    counts = integrate.cumulative_trapezoid(2 * np.pi * rs * density, rs, initial=0)
+    counts += np.pi * rs[0]**2 * density[0] #Inside the first grid point the column density is held at its value there
+    return rs, counts
+
+#Method def for getting the number of fragments inside circular apertures of the given radii (m) from the curve of growth
+#Inside the first grid radius the column density is constant, so the number of fragments grows with the area of the aperture
+def growthAt(radii, rs, counts):
+    if(rs[0] <= 0):
+        return np.interp(radii, rs, counts)
+    return np.where(radii < rs[0], counts[0] * (radii / rs[0])**2, np.interp(radii, rs, counts))
+
+#Method def for getting the number of fragments in many circular or annular apertures in one call
+#outerRadii and innerRadii (optional, 0 for circular apertures) are arrays of radii, as astropy quantities or floats in km,
+#that are broadcast against each other (an array of outer radii with a single inner radius, etc.)
+#Returns an array of the number of fragments in each aperture, apertures past the grid only count the fragments on the grid
+def apertureCounts(vmr, outerRadii, innerRadii=0, curve=None):
+    rs, counts = curveOfGrowth(vmr) if curve == None else curve
+    outer = np.asarray(outerRadii.to_value(u.m) if isinstance(outerRadii, u.Quantity) else (np.asarray(outerRadii) * u.km).to_value(u.m))
+    inner = np.asarray(innerRadii.to_value(u.m) if isinstance(innerRadii, u.Quantity) else (np.asarray(innerRadii) * u.km).to_value(u.m))
+    return growthAt(outer, rs, counts) - growthAt(inner, rs, counts)
+
+#Method def for getting the aperture check text of a vmr, the default apertures are followed by the given apertures
+#Every aperture is integrated in parallel on the shared pool (one after another if workers is 1), returns the text in the same format as the pyvectorial aperture checks
+def apertureCheckText(vmr, apertures=(), workers=None):
+    apertures = defaultApertures(vmr) + list(apertures)
+    fragments = float(vmr.num_fragments_theory)
+    grid = vmr.column_density_grid.to_value(u.m)
+    arguments = ([shape for shape, sizes, description in apertures], [sizes for shape, sizes, description in apertures],
+                 [vmr.column_density_interpolation] * len(apertures), [grid.min()] * len(apertures), [grid.max()] * len(apertures))
+    if(workers == 1): #Already in a worker process
+        numbers = list(map(apertureNumber, *arguments))
+    else:
+        numbers = list(sharedPool(workers).map(apertureNumber, *arguments))
+    text = "\nPercent of fragments recovered by integrating column density over\n"
+    for (shape, sizes, description), number in zip(apertures, numbers):
+        text += f"\t{description}:\t{number * 100 / fragments:2.2f}%\n"
+    return text
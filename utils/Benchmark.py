@@ -0,0 +1,227 @@
+#Program to benchmark how the runtime and memory of the FileRunner.py pipeline scale with the grid size and time variation type.
+#Every case is the seed config (utils/Test Files/pyvectorial.yaml) with its grid and time variation replaced,
+#run through fileRun(), the aperture checks and every plot getter in its own process, with an empty result cache so the model always runs.
+#Each case records the stages of its RunProfile (see RunProfiler.py) and the peak resident memory of its process.
+#The startup time (importing utils in a new interpreter, then warming the heavy imports, see LazyImports.py) is recorded first.
+#The report is saved as json and can be compared against the report of a previous release to find regressions.
+#
+#Usage: vectorial-benchmark -o report.json --grids 50x30x20 150x60x50 --variations none gaussian --repeats 3 --compare baseline.json
+#
+#Version: 10/18/2026
+
+import os
+import sys
+import json
+import copy
+import yaml
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+from .FileCreator import newFileInputs
+from .FileRunner import fileRun, getFragSputter, getRadialPlots, getColumnDensity, get3DColumnDensity, get3DColumnDensityCentered
+from .FileRunner import getColumnDensitySurface, getCurveOfGrowth
+from .ResultCache import setCacheDirectory
+from .RunProfiler import peakRss, packageVersion
+from .ApertureChecks import apertureCheckText
+from .LazyImports import warmImports
+
+PackageDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) #Folder holding the package, the startup is timed from it
+SeedFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Test Files', 'pyvectorial.yaml') #Config every case starts from
+BenchmarkGrids = ['50x30x20', '100x40x30', '150x60x50', '200x80x80'] #Default grids as radial_points x angular_points x radial_substeps
+BenchmarkVariations = ['none', 'sine wave', 'gaussian', 'square pulse'] #Default time variation types
+
+#Production params of each time variation type, times are in hours
+VariationParams = {'sine wave' : {'amplitude' : 3.0e+28, 'period' : 20.0, 'delta' : 0.0},
+                   'gaussian' : {'amplitude' : 3.0e+28, 'std_dev' : 20.0, 't_max' : 24.0},
+                   'square pulse' : {'amplitude' : 3.0e+28, 'duration' : 20.0, 't_start' : 24.0}}
+
+#Method def for reading a grid written as radial_points x angular_points x radial_substeps (150x60x50)
+def parseGrid(text):
+    radialPoints, angularPoints, radialSubsteps = [int(val) for val in text.lower().split('x')]
+    return {'radial_points' : radialPoints, 'angular_points' : angularPoints, 'radial_substeps' : radialSubsteps}
+
+#Method def for getting the name of a case, used to match cases between reports
+def caseName(grid, variationType):
+    return f'{grid} {variationType}'
+
+#Method def for creating the yaml style dict of a case from the seed config
+def caseConfig(seed, grid, variationType):
+    config = copy.deepcopy(seed)
+    config['grid'] = parseGrid(grid)
+    if(variationType == 'none'):
+        config['production'] = {'base_q' : config['production']['base_q'], 'time_variation_type' : None}
+    else:
+        config['production'] = {'base_q' : config['production']['base_q'], 'time_variation_type' : variationType,
+                                'params' : VariationParams[variationType]}
+    return config
+
+#Method def for running a single case, called in its own worker process so its peak memory is not shared with other cases
+#Returns the stages of the case and the peak resident memory of the process, failed is True if the model could not run
+def runCase(config):
+    matplotlib.use('Agg') #Plots are only created, never shown
+    import matplotlib.pyplot as plt
+    warmImports() #The heavy imports are timed by startupTime(), not in the first stage that uses them
+    with tempfile.TemporaryDirectory() as tempDir:
+        setCacheDirectory(os.path.join(tempDir, 'cache')) #Empty cache, the model always runs
+        configPath = os.path.join(tempDir, 'benchmark.yaml')
+        newFileInputs(configPath, config)
+        runData = SimpleNamespace(PyvComaPickle=None, Profile=None) #Used in place of the UI's CurrentUIRun
+        vmc, vmr = fileRun(configPath, runData)
+        profile = runData.Profile
+        if(vmc is not False):
+            with profile.stage('aperture checks'):
+                apertureCheckText(vmr, workers=1)
+            with profile.stage('column density surface'):
+                surface = getColumnDensitySurface(vmr)
+            plots = {'fragment_sputter' : lambda: getFragSputter(vmc, vmr), 'radial' : lambda: getRadialPlots(vmc, vmr),
+                     'column_density' : lambda: getColumnDensity(vmc, vmr), 'column_density_3d' : lambda: get3DColumnDensity(vmc, vmr, surface),
+                     'column_density_3d_centered' : lambda: get3DColumnDensityCentered(vmc, vmr, surface),
+                     'curve_of_growth' : lambda: getCurveOfGrowth(vmc, vmr)}
+            for plotName, getPlot in plots.items():
+                with profile.stage(f'plot {plotName}'):
+                    figure = getPlot()
+                plt.close(figure)
+    return {'failed' : vmc is False, 'stages' : profile.stages, 'peak_rss_mb' : peakRss()}
+
+#Code run by a new interpreter to time the startup, prints the seconds to import utils and to warm the heavy imports as json
+#The package name is the first argument (utils in the repository, vectorial_ui once installed)
+StartupCode = '''
+import sys, json, time, importlib
+start = time.perf_counter()
+utils = importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+utils.warmImports()
+print(json.dumps({'import_seconds' : imported - start, 'warm_seconds' : time.perf_counter() - imported}))
+'''
+
+#Method def for timing the startup in new interpreters, the best of repeats is kept
+#Returns a dict with the seconds to import utils (what the UI waits for before its window shows) and to warm the heavy imports
+def startupTime(repeats=1):
+    times = []
+    for repeat in range(repeats):
+        output = subprocess.run([sys.executable, '-c', StartupCode, __package__], cwd=PackageDirectory, capture_output=True, text=True, check=True).stdout
+        times.append(json.loads(output.strip().splitlines()[-1]))
+    return {key : min(timing[key] for timing in times) for key in ['import_seconds', 'warm_seconds']}
+
+#Method def for keeping the best repeat of a case: the least wall and CPU time and the most peak memory of every stage
+def bestRepeat(repeats):
+    stages = {}
+    for repeat in repeats:
+        for stage in repeat['stages']:
+            if(stage['stage'] not in stages):
+                stages[stage['stage']] = dict(stage)
+                continue
+            best = stages[stage['stage']]
+            best['wall_seconds'] = min(best['wall_seconds'], stage['wall_seconds'])
+            best['cpu_seconds'] = min(best['cpu_seconds'], stage['cpu_seconds'])
+            if(stage['peak_memory_mb'] != None):
+                best['peak_memory_mb'] = max(best['peak_memory_mb'] or 0.0, stage['peak_memory_mb'])
+    peaks = [repeat['peak_rss_mb'] for repeat in repeats if repeat['peak_rss_mb'] != None]
+    return {'failed' : any(repeat['failed'] for repeat in repeats), 'stages' : list(stages.values()),
+            'total_wall_seconds' : sum(stage['wall_seconds'] for stage in stages.values()),
+            'peak_rss_mb' : max(peaks) if len(peaks) > 0 else None}
+
+#Method def for running every case (every grid with every time variation type) one after another
+#Returns the report as a dict with the versions needed to compare reports
+def runBenchmark(grids=BenchmarkGrids, variationTypes=BenchmarkVariations, repeats=1, seedFile=SeedFile, progressCallback=None):
+    with open(seedFile, 'r') as file:
+        seed = yaml.safe_load(file)
+    startup = startupTime(repeats)
+    if(progressCallback != None):
+        progressCallback(f"Startup: import {startup['import_seconds']:.3f} s, heavy imports {startup['warm_seconds']:.3f} s")
+    cases = []
+    for grid in grids:
+        for variationType in variationTypes:
+            config = caseConfig(seed, grid, variationType)
+            results = []
+            for repeat in range(repeats):
+                with ProcessPoolExecutor(max_workers=1) as executor: #A new process for every repeat, so the peak memory is its own
+                    results.append(executor.submit(runCase, config).result())
+            case = {'case' : caseName(grid, variationType), 'grid' : config['grid'], 'time_variation_type' : variationType}
+            case.update(bestRepeat(results))
+            cases.append(case)
+            if(progressCallback != None):
+                progressCallback(f"{case['case']}: {case['total_wall_seconds']:.2f} s, peak RSS {case['peak_rss_mb']} MB")
+    return {'pyvectorial_version' : packageVersion('pyvectorial'), 'python_version' : platform.python_version(),
+            'platform' : platform.platform(), 'date' : datetime.now().isoformat(), 'repeats' : repeats, 'startup' : startup, 'cases' : cases}
+
+#Method def for getting the report as a text table, one line per case
+def reportText(report):
+    lines = [f"pyvectorial {report['pyvectorial_version']}, Python {report['python_version']}, {report['platform']}",
+             f"Startup: import utils {report['startup']['import_seconds']:.3f} s, heavy imports {report['startup']['warm_seconds']:.3f} s",
+             f"{'Case':<28}{'run_vmodel (s)':>16}{'Plots (s)':>12}{'Total (s)':>12}{'Peak RSS (MB)':>16}"]
+    for case in report['cases']:
+        if(case['failed']):
+            lines.append(f"{case['case']:<28}{'failed':>16}")
+            continue
+        stages = {stage['stage'] : stage['wall_seconds'] for stage in case['stages']}
+        plots = sum(seconds for stage, seconds in stages.items() if stage.startswith('plot '))
+        peak = '' if case['peak_rss_mb'] == None else f"{case['peak_rss_mb']:.1f}"
+        lines.append(f"{case['case']:<28}{stages.get('run_vmodel', 0.0):>16.3f}{plots:>12.3f}{case['total_wall_seconds']:>12.3f}{peak:>16}")
+    return '\n'.join(lines)
+
+#Method def for comparing a report against a baseline report (of a previous release)
+#A stage (or the peak RSS) of a case found in both reports is a regression if it grew by more than threshold (0.1 is 10%)
+#minSeconds ignores stages that are too short to time reliably
+#Returns a list of the regressions as text, empty if there are none
+def compareReports(baseline, report, threshold=0.1, minSeconds=0.05):
+    baselineCases = {case['case'] : case for case in baseline['cases']}
+    regressions = []
+    if('startup' in baseline): #Reports from before the startup was timed have no startup
+        old, new = baseline['startup']['import_seconds'], report['startup']['import_seconds']
+        if(old >= minSeconds and new > old * (1 + threshold)):
+            regressions.append(f"startup, import utils: {old:.3f} s -> {new:.3f} s")
+    for case in report['cases']:
+        before = baselineCases.get(case['case'])
+        if(before == None or before['failed'] or case['failed']):
+            continue
+        beforeStages = {stage['stage'] : stage['wall_seconds'] for stage in before['stages']}
+        for stage in case['stages']:
+            old = beforeStages.get(stage['stage'])
+            if(old != None and old >= minSeconds and stage['wall_seconds'] > old * (1 + threshold)):
+                regressions.append(f"{case['case']}, {stage['stage']}: {old:.3f} s -> {stage['wall_seconds']:.3f} s")
+        if(before['peak_rss_mb'] != None and case['peak_rss_mb'] != None and case['peak_rss_mb'] > before['peak_rss_mb'] * (1 + threshold)):
+            regressions.append(f"{case['case']}, peak RSS: {before['peak_rss_mb']:.1f} MB -> {case['peak_rss_mb']:.1f} MB")
+    return regressions
+
+#Method def for reading the command line arguments
+def parseArguments(argv):
+    parser = argparse.ArgumentParser(prog='vectorial-benchmark', description='Benchmark the vectorial model runs and plots across grid sizes.')
+    parser.add_argument('-o', '--output', default='benchmark.json', help='json report file (default: benchmark.json)')
+    parser.add_argument('-g', '--grids', nargs='+', default=BenchmarkGrids, help='grids as radial_points x angular_points x radial_substeps (e.g. 150x60x50)')
+    parser.add_argument('-v', '--variations', nargs='+', choices=BenchmarkVariations, default=BenchmarkVariations, help='time variation types')
+    parser.add_argument('-r', '--repeats', type=int, default=1, help='runs of every case, the best is kept (default: 1)')
+    parser.add_argument('-s', '--seed', default=SeedFile, help='yaml config every case starts from')
+    parser.add_argument('-c', '--compare', default=None, help='baseline json report to compare against')
+    parser.add_argument('-t', '--threshold', type=float, default=0.1, help='growth counted as a regression (default: 0.1, 10%%)')
+    arguments = parser.parse_args(argv)
+    for grid in arguments.grids:
+        try:
+            parseGrid(grid)
+        except ValueError:
+            parser.error(f'incorrect grid: {grid}')
+    return arguments
+
+#Runs the benchmark, returns the exit code (1 if a regression was found against the baseline)
+def main(argv=None):
+    arguments = parseArguments(argv)
+    report = runBenchmark(arguments.grids, arguments.variations, arguments.repeats, arguments.seed, progressCallback=print)
+    with open(arguments.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(reportText(report))
+    print(f'Report written to {arguments.output}')
+    if(arguments.compare == None):
+        return 0
+    with open(arguments.compare, 'r') as file:
+        regressions = compareReports(json.load(file), report, arguments.threshold)
+    for regression in regressions:
+        print(f'Regression: {regression}', file=sys.stderr)
+    return 1 if len(regressions) > 0 else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#Program to keep the coma objects of the last runs of a session alive, so follow up questions (other apertures,
+#the column density at other radii) are answered from the coma without rerunning pyv.run_vmodel().
+#Comas are kept by the cache key of their yaml dict (see ResultCache.py), the least recently used coma is dropped first
+#once the store holds more than ComaMaxRuns comas or more than ComaMaxBytes of arrays.
+#The store only lives in the process that ran the model (the UI), runs in worker processes (sweeps, batches, the command line)
+#are not kept.
+#
+#Version: 10/18/2026
+
+import threading
+import numpy as np
+from collections import OrderedDict
+from .ApertureChecks import defaultApertures
+from .LazyImports import lazyImport
+
+u = lazyImport('astropy.units')
+sba = lazyImport('sbpy.activity')
+
+ComaMaxRuns = 5 #Max number of comas kept
+ComaMaxBytes = 1024**3 #Max size of the arrays of the kept comas, 1 GB
+
+ComaStore = OrderedDict() #Cache key : (coma, bytes), least recently used first
+ComaLock = threading.Lock() #Comas are kept and read from RunWorker() threads
+
+#Method def for estimating the memory of a coma from the numpy arrays it holds (the grids and densities of the model)
+def comaBytes(coma):
+    total = 0
+    seen = set()
+    stack = [coma]
+    while(len(stack) > 0):
+        value = stack.pop()
+        if(id(value) in seen):
+            continue
+        seen.add(id(value))
+        if(isinstance(value, np.ndarray)): #Includes astropy quantities
+            total += value.nbytes
+        elif(isinstance(value, dict)):
+            stack += list(value.values())
+        elif(isinstance(value, (list, tuple))):
+            stack += list(value)
+        elif(hasattr(value, '__dict__') and not isinstance(value, type)):
+            stack += list(vars(value).values())
+    return total
+
+#Method def for removing the least recently used comas until the store is under ComaMaxRuns comas and ComaMaxBytes
+def evictComas():
+    with ComaLock:
+        while(len(ComaStore) > 0 and (len(ComaStore) > ComaMaxRuns or sum(size for coma, size in ComaStore.values()) > ComaMaxBytes)):
+            ComaStore.popitem(last=False)
+
+#Method def for keeping the coma of a run under its cache key
+def keepComa(key, coma):
+    size = comaBytes(coma)
+    with ComaLock:
+        ComaStore[key] = (coma, size)
+        ComaStore.move_to_end(key)
+    evictComas()
+
+#Method def for getting a kept coma, returns None if the coma of the key is not kept
+def getComa(key):
+    with ComaLock:
+        if(key not in ComaStore):
+            return None
+        ComaStore.move_to_end(key) #Marks the coma as recently used for the eviction
+        return ComaStore[key][0]
+
+#Method def for changing the bounds of the store for the rest of the session
+def setComaLimits(maxRuns=ComaMaxRuns, maxBytes=ComaMaxBytes):
+    global ComaMaxRuns, ComaMaxBytes
+    ComaMaxRuns, ComaMaxBytes = maxRuns, maxBytes
+    evictComas()
+
+#Method def for removing every kept coma
+def clearComas():
+    with ComaLock:
+        ComaStore.clear()
+
+#Query methods
+
+#Method def for getting the sbpy aperture of an aperture from ApertureChecks.parseApertures()
+def sbpyAperture(shape, sizes):
+    sizes = [size * u.km for size in sizes]
+    if(shape == 'circular'):
+        return sba.CircularAperture(sizes[0])
+    if(shape == 'annular'):
+        return sba.AnnularAperture(u.Quantity(sizes))
+    if(shape == 'rectangular'):
+        return sba.RectangularAperture(u.Quantity(sizes))
+    return sba.GaussianAperture(sigma=sizes[0])
+
+#Method def for getting the aperture check text from a kept coma, in the same format as ApertureChecks.apertureCheckText()
+#The default apertures are followed by the given apertures, every aperture is integrated by coma.total_number()
+def comaApertureText(coma, apertures=()):
+    apertures = defaultApertures(coma.vmr) + list(apertures)
+    fragments = float(coma.vmr.num_fragments_theory)
+    text = "\nPercent of fragments recovered by integrating column density over\n"
+    for shape, sizes, description in apertures:
+        text += f"\t{description}:\t{coma.total_number(sbpyAperture(shape, sizes)) * 100 / fragments:2.2f}%\n"
+    return text
+
+#Method def for getting the column density at any radii (km), not only on the column density grid of the vmr
+#The column density comes from the coma if it is kept, otherwise from the column density interpolation of the vmr
+#(held at its first grid value inside the grid and 0 outside it)
+#Returns the column density (1/cm2) at each radius
+def columnDensityAt(vmr, radii, coma=None):
+    rs = (np.asarray(radii, dtype=float) * u.km).to_value(u.m)
+    if(coma != None):
+        return coma.column_density(rs * u.m).to(1 / u.cm**2)
+    grid = vmr.column_density_grid.to_value(u.m)
+    density = np.where(rs <= grid.max(), vmr.column_density_interpolation(np.clip(rs, grid.min(), grid.max())), 0.0)
+    return (density / u.m**2).to(1 / u.cm**2)
@@ -0,0 +1,236 @@
+#Program to run yaml and pickle files from the command line without the UI (no PyQt5 and no display needed).
+#Yaml inputs are tested with fileTest() and result stores with storeTest(), pickles are tested as they are read, then all inputs are run in parallel through FileRunner.py.
+#The plots (rendered in parallel by PlotExporter.py) and text tables of each input are written to their own folder in the output directory,
+#named after the input file. Inputs that would share a folder (comet.yaml from two directories, or comet.yaml and comet.vmr) are refused.
+#
+#The result arrays can also be saved as columnar data (csv, hdf5, parquet) by ResultExporter.py.
+#
+#The yaml inputs are run as a sweep in the job queue (JobQueue.py), if the program stops before they are all finished
+#vectorial-cli --resume runs only the unfinished ones and writes the outputs of every input.
+#
+#The aperture checks (the default apertures and any given with --apertures, see ApertureChecks.py) are computed by a worker
+#after the results are written, so they do not hold up the other outputs.
+#
+#With --server the yaml inputs (and resumed inputs) are run by the shared job server (JobServer.py) instead of the local workers,
+#the outputs are still written by the local workers.
+#
+#With --profile the wall time, CPU time and peak memory of every stage of each input (RunProfiler.py) is saved as profile.json.
+#
+#Usage: vectorial-cli input1.yaml input2.vmr input3.vms ... -o outputDir -j workers -f png svg pdf -d csv hdf5 parquet
+#       vectorial-cli --resume --profile -j workers -f png svg pdf -d csv hdf5 parquet
+#
+#Version: 10/17/2026
+
+import os
+import sys
+import argparse
+import matplotlib
+matplotlib.use('Agg') #Plots are only saved to files, no display is used
+from types import SimpleNamespace
+from concurrent.futures import as_completed
+from .RunProfiler import RunProfile
+from .FileRunner import fileConfig, runFilePickleProgram, runFileStoreProgram, runSweepProgram, fileTest
+from .JobQueue import addSweep, sweepJobs, unfinishedSweeps, removeSweep, removeFinishedSweeps, SweepOwned
+from .ResultStore import storeTest
+from .FileRunner import getPrintRadialDensity, getPrintColumnDensity, getAgreementCheck
+from .PlotExporter import ExportFormats, submitExport
+from .WorkerPool import sharedPool, setPoolSize, shutdownPool
+from .JobClient import serverAvailable, ServerKeyVariable
+from .ApertureChecks import parseApertures, apertureCheckText
+from .ResultExporter import ResultFormats, exportResult, missingFormats
+
+#Method def for creating the run data used by FileRunner.py in place of the UI's CurrentUIRun
+def newRunData():
+    return SimpleNamespace(PyvComaPickle=None, Profile=None)
+
+#Method def for getting the output folder of an input file
+def outputFolder(inputPath, outputDir):
+    return os.path.join(outputDir, os.path.splitext(os.path.basename(inputPath))[0])
+
+#Method def for getting the input paths written to each output folder, by absolute folder path
+def inputFolders(inputPaths, outputDir):
+    folders = {}
+    for inputPath in inputPaths:
+        folders.setdefault(os.path.normcase(os.path.abspath(outputFolder(inputPath, outputDir))), []).append(inputPath)
+    return folders
+
+#Method def for finding inputs whose outputs would be written to the same folder
+#Returns a dict of the input paths of every folder used by more than one input, by folder
+def folderCollisions(inputPaths, outputDir):
+    return {folder : paths for folder, paths in inputFolders(inputPaths, outputDir).items() if len(paths) > 1}
+
+#Method def for testing if an input is a result store (see ResultStore.py)
+def isStore(inputPath):
+    return inputPath.endswith('.vms')
+
+#Method def for testing if an input is a yaml file (anything else is read as a pickle)
+def isYaml(inputPath):
+    return inputPath.endswith('.yaml') or inputPath.endswith('.yml')
+
+#Method def for testing an input file before any compute is spent on it
+#Returns the bool test result and an error message if the test failed
+def testInput(inputPath):
+    if(os.path.isfile(inputPath) == False):
+        return False, 'file not found'
+    if(isYaml(inputPath)):
+        testResult, message = fileTest(inputPath, newRunData())
+        if(testResult == False):
+            return False, f'missing or incorrect data type assigned to: {message}'
+        return True, None
+    if(isStore(inputPath)):
+        if(storeTest(inputPath) == False):
+            return False, 'the result store could not be understood'
+    return True, None #Pickles are tested when runFilePickleProgram() reads them, so they are only unpickled once
+
+#Method def for writing the text tables of a result to outputDir
+def writeTables(vmr, outputDir):
+    os.makedirs(outputDir, exist_ok=True)
+    tables = {'radial_density' : getPrintRadialDensity(vmr), 'column_density' : getPrintColumnDensity(vmr)}
+    for name, table in tables.items():
+        with open(os.path.join(outputDir, f'{name}.txt'), 'w') as file:
+            file.write(table)
+
+#Method def for writing the agreement and aperture checks of a result to outputDir, called in a worker process
+#Returns the path of the file and its profile stages, the same as the plot render tasks of PlotExporter.py
+def writeChecks(vmr, apertures, outputDir):
+    profile = RunProfile()
+    with profile.stage('aperture checks'):
+        text = getAgreementCheck(vmr) + apertureCheckText(vmr, apertures, workers=1)
+    path = os.path.join(outputDir, 'agreement_check.txt')
+    with open(path, 'w') as file:
+        file.write(text)
+    return [path], profile.stages
+
+#Method def for running a single pickle or result store input, called in a worker process
+#Returns the input path, vmc and vmr, vmc is False if the run failed (or the pickle could not be read)
+def runInput(inputPath):
+    if(isStore(inputPath)):
+        vmc, vmr = runFileStoreProgram(inputPath)
+    else:
+        vmc, vmr = runFilePickleProgram(inputPath)
+    return inputPath, vmc, vmr
+
+#Method def for reading the command line arguments
+def parseArguments(argv):
+    parser = argparse.ArgumentParser(prog='vectorial-cli', description='Run vectorial model yaml or pickle files without the UI.')
+    parser.add_argument('inputs', nargs='*', help='yaml or pickle files to run')
+    parser.add_argument('-o', '--output', default='vectorial_results', help='output directory (default: vectorial_results)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (default: every core)')
+    parser.add_argument('-f', '--formats', nargs='+', choices=ExportFormats, default=['png'], help='formats to save the plots as (default: png)')
+    parser.add_argument('-d', '--data-formats', nargs='+', choices=ResultFormats, default=[], help='formats to save the result arrays as (default: none)')
+    parser.add_argument('-a', '--apertures', nargs='+', default=[], help="extra apertures in km to check, e.g. 'circular 100000' 'annular 50000 200000'")
+    parser.add_argument('-p', '--profile', action='store_true', help='save the time and memory of every stage of each input as profile.json')
+    parser.add_argument('-s', '--server', action='store_true', help='run the yaml inputs on the shared job server (vectorial-server)')
+    parser.add_argument('-r', '--resume', action='store_true', help='run the unfinished yaml inputs of stopped runs, written to their original output directory')
+    arguments = parser.parse_args(argv)
+    missing = missingFormats(arguments.data_formats)
+    if(len(missing) > 0):
+        parser.error(', '.join(f'{format} needs {package} (pip install {package})' for format, package in missing.items()))
+    if(arguments.server and serverAvailable() == False):
+        parser.error(f'no job server is running (start one with vectorial-server, {ServerKeyVariable} must be set to its key)')
+    if(len(arguments.inputs) == 0 and arguments.resume == False):
+        parser.error('no inputs given (or use --resume)')
+    collisions = folderCollisions(arguments.inputs, arguments.output)
+    if(len(collisions) > 0): #The outputs of one input would overwrite the other
+        parser.error('; '.join(f"{', '.join(paths)} would all be written to {folder} (rename them or run them with different -o)"
+                               for folder, paths in collisions.items()))
+    arguments.apertures = parseApertures(';'.join(arguments.apertures))
+    if(arguments.apertures == None):
+        parser.error("incorrect apertures, use 'circular r', 'annular r_inner r_outer', 'rectangular width height' or 'gaussian sigma' (km)")
+    return arguments
+
+#Method def for writing the outputs of a finished input, the aperture checks and plots are submitted to the executor
+#Returns the futures of the submitted tasks and the RunProfile of the input, or None if the input failed
+def writeOutputs(executor, arguments, outputDir, inputPath, vmc, vmr, profile):
+    if(vmc is False):
+        if(isYaml(inputPath) or isStore(inputPath)):
+            print(f'{inputPath}: failed, the data in the input was unable to converted to results', file=sys.stderr)
+        else:
+            print(f'{inputPath}: failed, the pickle file could not be understood', file=sys.stderr)
+        return None
+    if(profile == None): #Pickle and result store inputs, or jobs finished before a resume
+        profile = RunProfile()
+    folder = outputFolder(inputPath, outputDir)
+    with profile.stage('tables'):
+        writeTables(vmr, folder)
+    with profile.stage('data export'):
+        exportResult(vmr, folder, arguments.data_formats)
+    checks = executor.submit(writeChecks, vmr, arguments.apertures, folder)
+    return [checks] + submitExport(executor, vmc, vmr, folder, arguments.formats), profile
+
+#Method def for running the yaml inputs of a sweep in the job queue, the outputs of each input are written as it finishes
+#parseProfiles (optional) are the RunProfiles of the yaml parsing of each input, by input path
+#Returns the task futures and RunProfile of each input (None if the input failed) by (input path, output directory)
+def runQueued(executor, arguments, sweepId, inputPaths, outputDir, parseProfiles=None):
+    exports = {}
+    def finished(i, vmc, vmr, profile):
+        if(profile != None and parseProfiles != None and inputPaths[i] in parseProfiles):
+            profile.stages = parseProfiles[inputPaths[i]].stages + profile.stages
+        exports[(inputPaths[i], outputDir)] = writeOutputs(executor, arguments, outputDir, inputPaths[i], vmc, vmr, profile)
+    runSweepProgram(sweepId, resultCallback=finished, executor=None if arguments.server else executor, useServer=arguments.server)
+    removeSweep(sweepId) #Every output is written and every failed input reported, the job queue is no longer needed
+    return exports
+
+#Runs the command line program, returns the exit code (1 if any input failed)
+def main(argv=None):
+    arguments = parseArguments(argv)
+    failed = False
+    yamlInputs = []
+    inputs = []
+    for inputPath in arguments.inputs: #Tests every input before running any of them
+        testResult, message = testInput(inputPath)
+        if(testResult == False):
+            print(f'{inputPath}: skipped, {message}', file=sys.stderr)
+            failed = True
+        elif(isYaml(inputPath)):
+            yamlInputs.append(inputPath)
+        else:
+            inputs.append(inputPath)
+    setPoolSize(arguments.workers) #The pool of the run has -j workers
+    executor = sharedPool() #Pre-initialized workers, see WorkerPool.py
+    try:
+        futures = [executor.submit(runInput, inputPath) for inputPath in inputs] #Pickle and result store inputs
+        exports = {} #Aperture check and plot render futures and RunProfile of each finished input by (input path, output directory)
+        if(arguments.resume):
+            removeFinishedSweeps() #Finished sweeps can not be resumed
+            usedFolders = set(inputFolders(arguments.inputs, arguments.output)) #Folders of the new inputs
+            for sweep in unfinishedSweeps():
+                if(sweep['output'] != None): #Only command line sweeps have an output directory
+                    labels = [job['label'] for job in sweepJobs(sweep['id'])]
+                    folders = set(inputFolders(labels, sweep['output']))
+                    if(len(folders & usedFolders) > 0): #Left in the job queue for a later --resume
+                        print(f"Skipped resuming the inputs of {sweep['output']}, their output folders are used by other inputs of this run", file=sys.stderr)
+                        continue
+                    usedFolders |= folders
+                    print(f"Resuming {sweep['finished']}/{sweep['total']} finished inputs into {sweep['output']}")
+                    try:
+                        exports.update(runQueued(executor, arguments, sweep['id'], labels, sweep['output']))
+                    except SweepOwned as error: #Resumed by another process since the sweeps were listed
+                        print(f'Skipped, {error}', file=sys.stderr)
+        if(len(yamlInputs) > 0): #Plots of a finished input are rendered while the other inputs still run
+            configs = []
+            parseProfiles = {inputPath : RunProfile() for inputPath in yamlInputs}
+            for inputPath in yamlInputs:
+                with parseProfiles[inputPath].stage('yaml parsing'):
+                    configs.append(fileConfig(inputPath, newRunData()))
+            sweepId = addSweep(configs, yamlInputs, 'vectorial-cli run', arguments.output)
+            exports.update(runQueued(executor, arguments, sweepId, yamlInputs, arguments.output, parseProfiles))
+        for future in as_completed(futures):
+            inputPath, vmc, vmr = future.result()
+            exports[(inputPath, arguments.output)] = writeOutputs(executor, arguments, arguments.output, inputPath, vmc, vmr, None)
+        for (inputPath, outputDir), export in exports.items():
+            if(export == None):
+                failed = True
+                continue
+            exportFutures, profile = export
+            for exportFuture in exportFutures:
+                profile.addStages(exportFuture.result()[1]) #Aperture check and plot stages recorded by the workers
+            if(arguments.profile):
+                profile.save(os.path.join(outputFolder(inputPath, outputDir), 'profile.json'))
+            print(f'{inputPath}: results written to {outputFolder(inputPath, outputDir)}')
+    finally:
+        shutdownPool()
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
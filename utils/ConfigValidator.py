@@ -0,0 +1,128 @@
+#Program to test a yaml dict against a declarative schema of the inputs the vectorial model needs.
+#The schema is compiled once into a flat list of (dict path, test) rules when the module is imported,
+#then a dict is tested in a single pass that reports every incorrect entry at once.
+#Sweep values (lists of values, as used by batch runs) can be allowed, every value in the list is tested.
+#
+#Version: 10/17/2026
+
+import yaml
+
+#Schema of every section, a rule is either a data type ('float' and 'int' must be >= 0) or a list of the allowed values
+ConfigSchema = {
+    'comet' : {'rh' : 'float', 'transform_method' : ['cochran_schleicher_93', 'festou_fortran', None], 'transform_applied' : 'bool'},
+    'fragment' : {'v_photo' : 'float', 'tau_T' : 'float'},
+    'grid' : {'angular_points' : 'int', 'radial_points' : 'int', 'radial_substeps' : 'int'},
+    'parent' : {'T_to_d_ratio' : 'float', 'sigma' : 'float', 'tau_d' : 'float', 'v_outflow' : 'float'},
+    'production' : {'base_q' : 'float', 'time_variation_type' : ['sine wave', 'gaussian', 'square pulse', None]}
+}
+
+#Schema of the production params, only tested for the time variation type they belong to
+ParamsSchema = {
+    'sine wave' : {'amplitude' : 'float', 'delta' : 'float', 'period' : 'float'},
+    'gaussian' : {'amplitude' : 'float', 'std_dev' : 'float', 't_max' : 'float'},
+    'square pulse' : {'amplitude' : 'float', 'duration' : 'float', 't_start' : 'float'}
+}
+
+#Test methods for each data type
+
+#Tests if a value is a float >= 0
+def isFloat(value):
+    try:
+        return float(value) >= 0
+    except (TypeError, ValueError):
+        return False
+
+#Tests if a value is an int >= 0
+def isInt(value):
+    try:
+        val = float(value)
+        return val >= 0 and val.is_integer()
+    except (TypeError, ValueError):
+        return False
+
+#Tests if a value is a bool
+def isBool(value):
+    return value == True or value == False
+
+#Method def for turning a schema rule into its test method
+def compileRule(rule):
+    if(rule == 'float'):
+        return isFloat
+    if(rule == 'int'):
+        return isInt
+    if(rule == 'bool'):
+        return isBool
+    allowed = list(rule) #Allowed values, not a set as None and strings are mixed
+    return lambda value: any(value == val for val in allowed)
+
+#Method def for compiling a schema into a list of (dict path, test) rules
+def compileSchema(schema):
+    return [((section, field), compileRule(rule)) for section, fields in schema.items() for field, rule in fields.items()]
+
+#Compiled rules, created once when the module is imported
+ConfigRules = compileSchema(ConfigSchema)
+ParamsRules = {variationType : [(('production', 'params', field), compileRule(rule)) for field, rule in fields.items()]
+               for variationType, fields in ParamsSchema.items()}
+MissingValue = object() #Marks a dict path that is not in the dict
+
+#Method def for getting the value at a dict path, MissingValue if it is not in the dict
+def pathValue(config, path):
+    value = config
+    for key in path:
+        if(isinstance(value, dict) == False or key not in value):
+            return MissingValue
+        value = value[key]
+    return value
+
+#Method def for formatting a dict path the same way the UI shows it (["parent"]["tau_d"])
+def pathText(path):
+    return ''.join(f'["{key}"]' for key in path)
+
+#Method def for testing a single value, lists are sweeps where every value is tested
+def valueCheck(value, test, allowSweeps):
+    if(isinstance(value, list)):
+        return allowSweeps and len(value) > 0 and all(test(val) for val in value)
+    return test(value)
+
+#Method def for testing a yaml dict against the schema in a single pass
+#Returns a list of the dict paths (as text) that are missing or incorrect, empty if the dict passed
+def validateConfig(config, allowSweeps=False):
+    if(isinstance(config, dict) == False):
+        return ['(the file is not a yaml dictionary)']
+    errors = []
+    for path, test in ConfigRules:
+        value = pathValue(config, path)
+        if(value is MissingValue or valueCheck(value, test, allowSweeps) == False):
+            errors.append(pathText(path))
+    variationTypes = pathValue(config, ('production', 'time_variation_type'))
+    if(isinstance(variationTypes, list) == False):
+        variationTypes = [variationTypes]
+    for variationType in variationTypes: #Params are only tested for the selected time variation types
+        if(isinstance(variationType, str) and variationType in ParamsRules):
+            for path, test in ParamsRules[variationType]:
+                value = pathValue(config, path)
+                if((value is MissingValue or valueCheck(value, test, allowSweeps) == False) and pathText(path) not in errors):
+                    errors.append(pathText(path))
+    params = pathValue(config, ('production', 'params'))
+    if(isinstance(params, dict)): #Params no time variation type uses can not be given units
+        for field in params:
+            if(all(field not in fields for fields in ParamsSchema.values())):
+                errors.append(pathText(('production', 'params', field)))
+    return errors
+
+#Method def for testing every document of a yaml file (only opened for reading)
+#batch allows sweep values and more than one document, as only a batch run expands them
+#Returns a list of the incorrect dict paths, prefixed by the document number if the file has more than one document
+def validateFile(filePath, batch=False):
+    try:
+        with open(f"{filePath}", 'r') as file:
+            documents = [document for document in yaml.safe_load_all(file) if document != None]
+    except yaml.YAMLError:
+        return ['(the file could not be read as yaml)']
+    if(len(documents) == 0):
+        return ['(the file is empty)']
+    if(len(documents) == 1):
+        return validateConfig(documents[0], batch)
+    if(batch == False):
+        return ['(the file has more than one yaml document, use a batch run)']
+    return [f'document {i + 1} {error}' for i, document in enumerate(documents) for error in validateConfig(document, batch)]
@@ -53,7 +53,14 @@ def createDictionary(CurrentUIRun):
     'angular_points' : CurrentUIRun.AngularPoints, 
     'radial_substeps' : CurrentUIRun.RadialSubsteps}
 
-    #Creates the etc dictionary
+    #Creates the final dictionary and returns it
+    dict = {'production' : production, 'parent' : parent, 'comet' : comet,
+    'fragment' : fragment, 'grid' : grid, 'etc' : createEtc(CurrentUIRun)}
+
+    return dict
+
+#Method to create the etc dictionary, used for manual inputs and to override the etc section of a yaml file input
+def createEtc(CurrentUIRun):
     etc = {'print_binned_times' : True, 'print_column_density' : True, 
     'print_progress' : True, 'print_radial_density' : True,
     'pyv_coma_pickle' : CurrentUIRun.PyvComaPickle,
@@ -62,11 +69,7 @@ def createDictionary(CurrentUIRun):
     'show_aperture_checks' : True, 'show_column_density_plots' : True,
     'show_fragment_sputter' : True, 'show_radial_plots' : True}
 
-    #Creates the final dictionary and returns it
-    dict = {'production' : production, 'parent' : parent, 'comet' : comet,
-    'fragment' : fragment, 'grid' : grid, 'etc' : etc}
-
-    return dict
+    return etc
 
 #Creates a new .yaml file called pyvectorial.yaml based on the return val of createDictionary()
 def newFileManual(CurrentUIRun):
@@ -6,50 +6,475 @@
 #Version: 8/29/2022
 
 import io
+import os
+import sys
 import yaml
 import pickle
-import astropy.units as u
-import pyvectorial as pyv
-import sbpy.activity as sba
-from datetime import datetime
-from contextlib import redirect_stdout
-from astropy.visualization import quantity_support
-from .FileCreator import newFileManual, newFileInputs
+import time
+import tempfile
+import threading
+import numpy as np
+from types import SimpleNamespace
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from matplotlib import colormaps
+from matplotlib.figure import Figure
+from .LazyImports import lazyImport
+from .FileCreator import createDictionary, createEtc, newFileInputs
+from .ResultCache import cacheKey, loadResult, saveResult
+from .ConfigValidator import validateFile
+from .ResultStore import loadStore, saveStore, storeTest, linkStore
+from .JobQueue import jobStorePath, markJob, sweepJobs, claimSweep, keepSweep, releaseSweep
+from .RunProfiler import RunProfile, profileStage
+from .ApertureChecks import curveOfGrowth
+from .ComaStore import keepComa
+from .WorkerPool import sharedPool, cancelJobs
+from .JobClient import serverAvailable, serverRun, ServerError
+
+u = lazyImport('astropy.units') #Heavy packages are imported on their first use, see LazyImports.py
+pyv = lazyImport('pyvectorial')
+visualization = lazyImport('astropy.visualization')
+
+ServerConnections = 32 #Max number of configs of a batch or sweep waiting on the job server at once, each on its own connection
+
+#Units of the time variation params of a yaml dict, all times are in hours
+ParamUnits = {'amplitude' : '1 / s', 'period' : 'hour', 'delta' : 'hour', 'std_dev' : 'hour', 't_max' : 'hour', 'duration' : 'hour',
+              't_start' : 'hour'}
+
+#Progress methods
+
+#Exception raised from inside a model run when the user cancels it from the UI
+class RunCancelled(Exception):
+    pass
+
+#Class to send each line pyvectorial prints (print_progress) to a callback instead of throwing it away
+class ProgressWriter(io.StringIO):
+    def __init__(self, progressCallback):
+        super().__init__()
+        self.progressCallback = progressCallback
+
+    #Splits the printed text into lines and sends every non empty line to the callback
+    def write(self, text):
+        for line in text.splitlines():
+            if(line.strip() != ''):
+                self.progressCallback(line.strip()) #The callback may raise RunCancelled to stop the run
+        return super().write(text)
+
+#Class installed once as sys.stdout that sends what each thread prints to the target set for that thread by threadOutput()
+#Threads without a target print to the stdout it replaced, so the progress of a run on a RunWorker() thread and the output
+#captured on the main thread (agreement check, exports) never swap sys.stdout under each other
+class ThreadOutput:
+    #Intial Config
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local() #target of each thread
+
+    #Gets where the calling thread prints
+    def target(self):
+        target = getattr(self.local, 'target', None)
+        return self.default if target == None else target
+
+    def write(self, text):
+        return self.target().write(text)
+
+    def flush(self):
+        self.target().flush()
+
+    #Every other stream attribute (encoding, isatty, fileno...) is the one of the target
+    def __getattr__(self, name):
+        return getattr(self.target(), name)
+
+StdoutLock = threading.Lock() #Guards installing the ThreadOutput()
+
+#Method def for sending what the calling thread prints to target until the with block ends, other threads are not affected
+#The ThreadOutput() is installed as sys.stdout on first use (again only if something else replaced sys.stdout since)
+@contextmanager
+def threadOutput(target):
+    with StdoutLock:
+        if(isinstance(sys.stdout, ThreadOutput) == False):
+            sys.stdout = ThreadOutput(sys.stdout)
+        output = sys.stdout
+    previous = getattr(output.local, 'target', None)
+    output.local.target = target
+    try:
+        yield target
+    finally:
+        output.local.target = previous
 
 #Run methods
 
 #Method def for getting the output results for the vectorial model
-def fileRun(fileName, CurrentUIRun):
+#progressCallback (optional) is called with every progress line printed by pyv.run_vmodel()
+#Results of identical inputs are loaded from the result cache instead of rerunning the model
+#The stages of the run are recorded in CurrentUIRun.Profile (see RunProfiler.py)
+#keepLive keeps the coma of a new run in the session coma store under CurrentUIRun.ComaKey (see ComaStore.py)
+def fileRun(fileName, CurrentUIRun, progressCallback=None, keepLive=False):
+    profile = RunProfile()
+    with profile.stage('yaml parsing'):
+        dict = fileConfig(fileName, CurrentUIRun)
+    return dictRun(dict, CurrentUIRun, progressCallback, profile, keepLive)
+
+#Method def for reading a yaml file into a dict with the etc section set for the UI
+#The file is only opened for reading, the etc override is only applied in memory
+def fileConfig(fileName, CurrentUIRun):
+    with open(f"{fileName}", 'r') as file:
+        dict = yaml.safe_load(file)
+    dict['etc'] = createEtc(CurrentUIRun) #Replaces the etc section of the file, if any is present
+    return dict
+
+#Method def for getting the output results for the vectorial model from a yaml style dict (no file is written or read)
+#profile (optional) is a RunProfile the stages are added to, a new one is created if not given
+def dictRun(dict, CurrentUIRun, progressCallback=None, profile=None, keepLive=False):
+    CurrentUIRun.Profile = RunProfile() if profile == None else profile
+    CurrentUIRun.ComaKey = cacheKey(dict)
     try:
-        quantity_support()
-        vmc = pyv.vm_configs_from_yaml(fileName)[0] #Creates the vmc object
-        coma = pyv.run_vmodel(vmc) #Creates the coma object
+        visualization.quantity_support()
+        with CurrentUIRun.Profile.stage('config'):
+            vmc = vmcFromDict(dict) #Creates the vmc object
+        return cachedRun(vmc, CurrentUIRun.ComaKey, CurrentUIRun, progressCallback, keepLive)
+    except(ZeroDivisionError, ValueError):
+        return False, False
+
+#Method def for running a vmc, loading the result from the result cache if the same inputs were run before
+#keepLive keeps the coma of a new run in the session coma store under key, a cached result keeps the coma already stored (if any)
+def cachedRun(vmc, key, CurrentUIRun, progressCallback=None, keepLive=False):
+    with CurrentUIRun.Profile.stage('cache load'):
+        cached = loadResult(key)
+    if(cached != None):
+        if(progressCallback != None):
+            progressCallback('Loaded the result of a previous identical run from the cache.')
+        return vmc, cached
+    vmr = configRun(vmc, progressCallback, CurrentUIRun.Profile, key if keepLive else None)
+    with CurrentUIRun.Profile.stage('cache save'):
+        saveResult(key, vmr)
+    return vmc, vmr
+
+#Method def for creating a vmc directly from a yaml style dict, giving every value the units pyvectorial uses for yaml inputs
+#Raises ValueError for production params that no time variation type uses
+def vmcFromDict(dict):
+    params = dict['production'].get('params')
+    if(params != None):
+        unknown = [key for key in params if key not in ParamUnits]
+        if(len(unknown) > 0): #Raised as ValueError so dictRun() reports the config as not runnable
+            raise ValueError(f"unknown production params: {', '.join(str(key) for key in unknown)}")
+        params = {key : float(val) * u.Unit(ParamUnits[key]) for key, val in params.items()}
+    production = pyv.Production(base_q=float(dict['production']['base_q'])/u.s,
+            time_variation_type=dict['production']['time_variation_type'], params=params)
+
+    tauD = float(dict['parent']['tau_d']) * u.s
+    parent = pyv.Parent(name=dict['parent'].get('name'), v_outflow=float(dict['parent']['v_outflow']) * u.km/u.s,
+            tau_d=tauD, tau_T=tauD * float(dict['parent']['T_to_d_ratio']), sigma=float(dict['parent']['sigma']) * u.cm**2,
+            T_to_d_ratio=float(dict['parent']['T_to_d_ratio']))
+
+    fragment = pyv.Fragment(name=dict['fragment'].get('name'), v_photo=float(dict['fragment']['v_photo']) * u.km/u.s,
+            tau_T=float(dict['fragment']['tau_T']) * u.s)
+
+    delta = dict['comet'].get('delta') #Optional, does not influence the results
+    comet = pyv.Comet(name=dict['comet'].get('name'), rh=float(dict['comet']['rh']) * u.AU,
+            delta=float(delta) * u.AU if (delta != None and valueTest(delta, 'float')) else None,
+            transform_method=dict['comet']['transform_method'], transform_applied=dict['comet']['transform_applied'])
+
+    grid = pyv.Grid(radial_points=int(dict['grid']['radial_points']), angular_points=int(dict['grid']['angular_points']),
+            radial_substeps=int(dict['grid']['radial_substeps']))
+
+    return pyv.VectorialModelConfig(production=production, parent=parent, fragment=fragment,
+            comet=comet, grid=grid, etc=dict.get('etc'))
+
+#Method def for creating a yaml style dict from a vmc in the units of yaml inputs, the reverse of vmcFromDict()
+#Used to send the configs pyvectorial expanded from a batch file to the job server
+def dictFromVmc(vmc):
+    def value(quantity, unit): #Plain float in the unit of the yaml input
+        return None if quantity is None else float(u.Quantity(quantity).to_value(unit))
+    production = {'base_q' : value(vmc.production.base_q, 1/u.s), 'time_variation_type' : vmc.production.time_variation_type}
+    if(vmc.production.params):
+        production['params'] = {key : value(val, ParamUnits[key]) for key, val in vmc.production.params.items()}
+    return {'production' : production,
+            'parent' : {'name' : vmc.parent.name, 'v_outflow' : value(vmc.parent.v_outflow, u.km/u.s), 'tau_d' : value(vmc.parent.tau_d, u.s),
+                        'T_to_d_ratio' : float(vmc.parent.T_to_d_ratio), 'sigma' : value(vmc.parent.sigma, u.cm**2)},
+            'fragment' : {'name' : vmc.fragment.name, 'v_photo' : value(vmc.fragment.v_photo, u.km/u.s), 'tau_T' : value(vmc.fragment.tau_T, u.s)},
+            'comet' : {'name' : vmc.comet.name, 'rh' : value(vmc.comet.rh, u.AU), 'delta' : value(vmc.comet.delta, u.AU),
+                       'transform_method' : vmc.comet.transform_method, 'transform_applied' : vmc.comet.transform_applied},
+            'grid' : {'radial_points' : int(vmc.grid.radial_points), 'angular_points' : int(vmc.grid.angular_points),
+                      'radial_substeps' : int(vmc.grid.radial_substeps)},
+            'etc' : vmc.etc}
+
+#Method def for running the model on a single vmc
+#The aperture checks are not part of the run, they are computed from the vmr afterwards (see ApertureChecks.py)
+#profile (optional) is a RunProfile the stages are added to
+#Returns the vmr
+def configRun(vmc, progressCallback=None, profile=None, comaKey=None):
+    with profileStage(profile, 'run_vmodel'):
+        if(progressCallback == None):
+            coma = pyv.run_vmodel(vmc) #Creates the coma object
+        else:
+            with ProgressWriter(progressCallback) as buf, threadOutput(buf): #Streams the progress output to the caller
+                coma = pyv.run_vmodel(vmc)
+    with profileStage(profile, 'get_result_from_coma'):
         vmr = pyv.get_result_from_coma(coma) #Creates the vmr object
-        with io.StringIO() as buf, redirect_stdout(buf): #Gets all the print() from show_aperture_checks()
-            ApertureCheck(coma)
-            CurrentUIRun.ApertureChecks = buf.getvalue()
+    if(comaKey != None):
+        keepComa(comaKey, coma) #Kept for follow up queries, see ComaStore.py
+    return vmr
+
+#Method def for running one vmc of a batch, called in a worker process by runBatchProgram()
+#Returns the vmc and vmr, vmr is False if the vmc could not be run
+def batchRun(vmc):
+    try:
+        visualization.quantity_support()
+        with io.StringIO() as buf, threadOutput(buf): #Keeps the progress output of every worker off the terminal
+            vmr = configRun(vmc)
         return vmc, vmr
     except(ZeroDivisionError, ValueError):
+        return vmc, False
+
+#Method def for running one yaml style dict of a sweep, called in a worker process by runSweepProgram()
+#Returns the vmc, vmr, the runtime in seconds and the RunProfile, vmc and vmr are False if the dict could not be run
+def dictBatchRun(dict):
+    start = time.perf_counter()
+    runData = SimpleNamespace(Profile=None) #Used in place of the UI's CurrentUIRun
+    with io.StringIO() as buf, threadOutput(buf): #Keeps the progress output of every worker off the terminal
+        vmc, vmr = dictRun(dict, runData)
+    return vmc, vmr, time.perf_counter() - start, runData.Profile
+
+#Method def for running one job of a sweep and saving its result store, called in a worker process by runSweepProgram()
+#Returns the vmc, vmr, the runtime in seconds and the RunProfile, vmc and vmr are False if the dict could not be run
+def sweepJobRun(dict, storePath):
+    vmc, vmr, seconds, profile = dictBatchRun(dict)
+    if(vmr is not False):
+        os.makedirs(os.path.dirname(storePath), exist_ok=True)
+        with profile.stage('result store save'):
+            saveStore(vmr, storePath)
+    return vmc, vmr, seconds, profile
+
+#Method def for running one config of a batch or sweep on the job server (see JobServer.py) in place of dictBatchRun(),
+#or of sweepJobRun() if storePath is given (the result store of the server is linked there for the job queue)
+#cancelled (optional) is a threading.Event, once it is set the run stops waiting on the server at its next status line
+#(the run still finishes on the server and is cached)
+#Falls back to the shared pool of the session if the server stopped or could not run the config
+#Returns the vmc, vmr, the runtime in seconds and the RunProfile, vmc and vmr are False if the dict could not be run
+def serverJobRun(dict, storePath=None, cancelled=None):
+    start = time.perf_counter()
+    def statusCallback(text):
+        if(cancelled != None and cancelled.is_set()):
+            raise RunCancelled()
+    try:
+        path, stages = serverRun(dict, progressCallback=statusCallback)
+        profile = RunProfile()
+        profile.addStages(stages)
+        if(path == None):
+            return False, False, time.perf_counter() - start, profile
+        if(storePath != None):
+            linkStore(path, storePath)
+            path = storePath
+        visualization.quantity_support()
+        with profile.stage('result store load'):
+            vmr = loadStore(path)
+        return vmcFromDict(dict), vmr, time.perf_counter() - start, profile
+    except (ServerError, OSError, ValueError): #The store can be evicted by the server before it is opened
+        if(storePath == None):
+            return sharedPool().submit(dictBatchRun, dict).result()
+        return sharedPool().submit(sweepJobRun, dict, storePath).result()
+
+#Method def for loading a finished job of the job queue (see JobQueue.py)
+#Returns (vmc, vmr), or None if the result store of a done job is missing and the job has to run again
+def finishedJob(job):
+    if(job['state'] == 'failed'):
         return False, False
+    if(job['result_path'] == None or storeTest(job['result_path']) == False):
+        return None
+    visualization.quantity_support()
+    return vmcFromDict(job['config']), loadStore(job['result_path'])
+
+#Method def for running the unfinished jobs of a sweep in the job queue in parallel (see JobQueue.py)
+#Finished jobs are loaded from their result stores, jobs left running by a stopped process are run again
+#jobCallback (optional) is called with the job index, its state ('queued', 'running', 'done' or 'failed') and its runtime
+#resultCallback (optional) is called with the job index, vmc, vmr and RunProfile of every finished job
+#(the profile is None for jobs finished before the sweep was resumed)
+#executor (optional) runs the jobs in another process pool instead of the shared pool of the session (see WorkerPool.py)
+#useServer sends the jobs to the job server if one is running (see JobServer.py), a job is 'running' once it is sent
+#The sweep is claimed by this process and kept alive by a heartbeat while it runs, a cancelled or failed sweep is given up
+#Returns a list of (vmc, vmr) in the order of the jobs, raises SweepOwned if another process is running the sweep
+def runSweepProgram(sweepId, workers=None, jobCallback=None, progressCallback=None, resultCallback=None, executor=None, useServer=False):
+    claimSweep(sweepId) #Raises SweepOwned if another process is running the sweep
+    stopHeartbeat = threading.Event()
+    threading.Thread(target=keepSweep, args=(sweepId, stopHeartbeat), daemon=True).start()
+    cancelled = threading.Event() #Stops the jobs waiting on the job server
+    onServer = executor == None and useServer and serverAvailable()
+    if(onServer):
+        executor = ThreadPoolExecutor(max_workers=ServerConnections)
+        jobRun = lambda dict, storePath : executor.submit(serverJobRun, dict, storePath, cancelled)
+    else:
+        executor = sharedPool(workers) if executor == None else executor
+        jobRun = lambda dict, storePath : executor.submit(sweepJobRun, dict, storePath)
+    pending = set()
+    try:
+        jobs = sweepJobs(sweepId)
+        results = [None] * len(jobs)
+        futures = {}
+        for i, job in enumerate(jobs):
+            if(job['state'] == 'done' or job['state'] == 'failed'):
+                results[i] = finishedJob(job)
+            if(results[i] is None):
+                futures[jobRun(job['config'], jobStorePath(sweepId, job['position']))] = i
+                if(jobCallback != None):
+                    jobCallback(i, 'queued', 0.0)
+            else:
+                if(jobCallback != None):
+                    jobCallback(i, job['state'], job['seconds'] or 0.0)
+                if(resultCallback != None):
+                    resultCallback(i, *results[i], None)
+        pending = set(futures)
+        running = set()
+        while(len(pending) > 0):
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = futures[future]
+                vmc, vmr, seconds, profile = future.result()
+                results[i] = (vmc, vmr)
+                state = 'failed' if vmc is False else 'done'
+                markJob(jobs[i]['id'], state, jobStorePath(sweepId, jobs[i]['position']) if state == 'done' else None, seconds)
+                if(jobCallback != None):
+                    jobCallback(i, state, seconds)
+                if(resultCallback != None):
+                    resultCallback(i, vmc, vmr, profile)
+            for future in pending:
+                if(future not in running and future.running()): #Sent to a worker process
+                    running.add(future)
+                    markJob(jobs[futures[future]]['id'], 'running')
+                    if(jobCallback != None):
+                        jobCallback(futures[future], 'running', 0.0)
+            if(progressCallback != None):
+                progressCallback(f'Sweep {len(jobs) - len(pending)}/{len(jobs)} finished')
+    except RunCancelled:
+        cancelJobs(pending) #Drops the queued jobs, running ones are let finish and run again when the sweep is resumed
+        cancelled.set()
+        releaseSweep(sweepId)
+        raise
+    except Exception:
+        releaseSweep(sweepId) #The unfinished jobs can be resumed by any process
+        raise
+    finally:
+        stopHeartbeat.set()
+        if(onServer):
+            executor.shutdown(wait=False)
+    return results
+
+#Method def for getting every vmc a yaml file expands to (multiple yaml documents and parameter sweeps)
+def batchConfigs(fileName):
+    with open(f"{fileName}", 'r') as file:
+        documents = [document for document in yaml.safe_load_all(file) if document != None]
+    if(len(documents) <= 1):
+        return pyv.vm_configs_from_yaml(fileName) #pyvectorial expands the sweep of a single document itself
+    vmcs = []
+    with tempfile.TemporaryDirectory() as tempDir: #pyvectorial reads one document per file, so each document gets its own file
+        for i, document in enumerate(documents):
+            tempFile = os.path.join(tempDir, f'pyvectorial_{i}.yaml')
+            newFileInputs(tempFile, document)
+            vmcs += pyv.vm_configs_from_yaml(tempFile)
+    return vmcs
+
+#Method def for running every config of a yaml file in parallel on the shared pool of the session (see WorkerPool.py)
+#workers is the number of worker processes (None uses every core)
+#useServer sends the configs to the job server if one is running (see JobServer.py)
+#Returns a list of (vmc, vmr) in the order of the configs, or False if the file could not be read
+def runBatchProgram(fileName, workers=None, useServer=False, progressCallback=None):
+    try:
+        visualization.quantity_support()
+        vmcs = batchConfigs(fileName)
+    except(ZeroDivisionError, ValueError, KeyError, TypeError, yaml.YAMLError):
+        return False
+    dicts = None
+    if(useServer and serverAvailable()):
+        try:
+            dicts = [dictFromVmc(vmc) for vmc in vmcs]
+        except (KeyError, AttributeError, TypeError, ValueError): #A config the server can not be sent is run here
+            dicts = None
+    results = [None] * len(vmcs)
+    cancelled = threading.Event() #Stops the configs waiting on the job server
+    if(dicts != None): #Every config waits on its own connection, the server schedules them
+        executor = ThreadPoolExecutor(max_workers=ServerConnections)
+        futures = {executor.submit(serverJobRun, dict, None, cancelled) : i for i, dict in enumerate(dicts)}
+    else:
+        executor = sharedPool(workers)
+        futures = {executor.submit(batchRun, vmc) : i for i, vmc in enumerate(vmcs)}
+    try:
+        for done, future in enumerate(as_completed(futures)):
+            i = futures[future]
+            results[i] = future.result() if dicts == None else (vmcs[i], future.result()[1])
+            if(progressCallback != None):
+                progressCallback(f'Batch run {done + 1}/{len(vmcs)} finished')
+    except RunCancelled:
+        cancelJobs(futures) #Drops the queued configs, running ones are let finish
+        cancelled.set()
+        raise
+    finally:
+        if(dicts != None):
+            executor.shutdown(wait=False)
+    return results
+
+#Method def for running a yaml style dict on the job server (see JobServer.py) in place of dictRun()
+#The vmr is opened from the result store the server saved, the coma stays in a worker of the server so it is not kept
+#for follow up queries (see ComaStore.py)
+def serverDictRun(dict, CurrentUIRun, progressCallback=None, profile=None):
+    CurrentUIRun.Profile = RunProfile() if profile == None else profile
+    CurrentUIRun.ComaKey = None
+    path, stages = serverRun(dict, progressCallback=progressCallback)
+    CurrentUIRun.Profile.addStages(stages)
+    if(path == None):
+        return False, False
+    visualization.quantity_support()
+    with CurrentUIRun.Profile.stage('result store load'):
+        vmr = loadStore(path)
+    return vmcFromDict(dict), vmr
+
+#Method def for running a yaml style dict from the UI, on the job server if CurrentUIRun.UseJobServer is set and one is running,
+#otherwise in this process
+def uiRun(dict, CurrentUIRun, progressCallback=None, profile=None):
+    if(CurrentUIRun.UseJobServer and serverAvailable()):
+        try:
+            return serverDictRun(dict, CurrentUIRun, progressCallback, profile)
+        except (ServerError, OSError, ValueError): #The store can be evicted by the server before it is opened
+            if(progressCallback != None):
+                progressCallback('The job server could not run the config, running it here instead.')
+    return dictRun(dict, CurrentUIRun, progressCallback, profile, keepLive=True)
 
 #Method def for running the program manually
-def runManualProgram(CurrentUIRun):
-    newFileManual(CurrentUIRun) #Creates a new yaml file
-    return fileRun('pyvectorial.yaml', CurrentUIRun) #Runs the program, returning a vmc and vmr
+def runManualProgram(CurrentUIRun, progressCallback=None):
+    return uiRun(createDictionary(CurrentUIRun), CurrentUIRun, progressCallback) #Runs the program from the UI inputs in memory, returning a vmc and vmr
 
 #Method def for running the program with file input (yaml)
-def runFileYamlProgram(fileName, CurrentUIRun):
-    return fileRun(fileName, CurrentUIRun)
+def runFileYamlProgram(fileName, CurrentUIRun, progressCallback=None):
+    profile = RunProfile()
+    with profile.stage('yaml parsing'):
+        dict = fileConfig(fileName, CurrentUIRun)
+    return uiRun(dict, CurrentUIRun, progressCallback, profile)
     
-#Method def for running the program with file input (pickle)
-def runFilePickleProgram(fileName):
-    quantity_support()
-    vmc = pyv.VectorialModelConfig(production=None, parent=None, #Creates a default vmc
+#Method def for creating the default vmc used with a vmr that was not run from a config (pickle or result store)
+def defaultConfig():
+    return pyv.VectorialModelConfig(production=None, parent=None,
             fragment=pyv.Fragment(name='unknown', v_photo=None, tau_T=None), 
             comet=None, grid=None, etc=None) 
-    vmr = pyv.read_results(fileName) #Creates a vmr from the pickle
+
+#Method def for running the program with file input (pickle)
+#The pickle is only read once, returns False, False if pyvectorial can not read it
+def runFilePickleProgram(fileName, progressCallback=None):
+    if(progressCallback != None):
+        progressCallback(f'Reading pickle file: {fileName}')
+    visualization.quantity_support()
+    vmc = defaultConfig() #Creates a default vmc
+    try:
+        vmr = pyv.read_results(fileName) #Creates a vmr from the pickle
+    except (ModuleNotFoundError, EOFError, pickle.UnpicklingError):
+        return False, False
     return vmc, vmr
 
+#Method def for running the program with file input (result store, see ResultStore.py)
+#Only the header is read here, the arrays are paged in when a plot or table uses them
+def runFileStoreProgram(fileName, progressCallback=None):
+    if(progressCallback != None):
+        progressCallback(f'Opening result store: {fileName}')
+    visualization.quantity_support()
+    return defaultConfig(), loadStore(fileName)
+
 #Plot methods from pyvectioral
 
 #Gets the radial plot
@@ -64,75 +489,123 @@ def getFragSputter(vmc, vmr):
 def getColumnDensity(vmc, vmr):
     return pyv.column_density_plots(vmc, vmr, u.km, 1/u.cm**2, show_plots=False)[1]
 
-#Gets the 3d column density plot
-def get3DColumnDensity(vmc, vmr):
-    return pyv.column_density_plot_3d(vmc, vmr, x_min=-100000*u.km,
-            x_max=10000*u.km, y_min=-100000*u.km, y_max=10000*u.km,
-            grid_step_x=1000, grid_step_y=1000, r_units=u.km,
-            cd_units=1/u.cm**2, show_plots=False)[1]
+#Gets the 3d column density plot (off centered), sliced from the shared centered surface
+def get3DColumnDensity(vmc, vmr, surface=None):
+    if(surface == None):
+        surface = getColumnDensitySurface(vmr)
+    x, y, columnDensity = surface
+    rows = y[:, 0] <= 10000 #Off centered grid is the part of the centered grid with x and y <= 10000 km
+    cols = x[0, :] <= 10000
+    return plotColumnDensitySurface(vmc, x[rows][:, cols], y[rows][:, cols], columnDensity[rows][:, cols])
 
 #Gets the 3d colum density plot centered
-def get3DColumnDensityCentered(vmc, vmr):
-    return pyv.column_density_plot_3d(vmc, vmr, x_min=-100000*u.km,
-            x_max=100000*u.km, y_min=-100000*u.km, y_max=100000*u.km,
-            grid_step_x=1000, grid_step_y=1000, r_units=u.km,
-            cd_units=1/u.cm**2, show_plots=False)[1]
+def get3DColumnDensityCentered(vmc, vmr, surface=None):
+    if(surface == None):
+        surface = getColumnDensitySurface(vmr)
+    x, y, columnDensity = surface
+    return plotColumnDensitySurface(vmc, x, y, columnDensity)
+
+#Method def for evaluating the column density over the centered 3d grid once, shared by both 3d plots
+#gridRadius is half the width of the grid (km) and gridPoints the number of points on each axis (odd to include the center)
+#The column density only depends on the radius, so it is only evaluated once per distinct radius of the grid
+#Returns the x and y grid (km) and the column density on it (1/cm^2)
+def getColumnDensitySurface(vmr, gridRadius=100000, gridPoints=1001):
+    gridStep = 2 * gridRadius / (gridPoints - 1)
+    steps = np.arange(gridPoints) - (gridPoints - 1) // 2 #Integer steps from the center
+    i, j = np.meshgrid(steps, steps)
+    radiusSquared, inverse = np.unique(i**2 + j**2, return_inverse=True) #Exact integers, so every symmetric point shares a radius
+    radii = (np.sqrt(radiusSquared) * gridStep * u.km).to_value(u.m)
+    columnDensity = vmr.column_density_interpolation(radii) * (u.m**-2).to(u.cm**-2) #Interpolation is in 1/m^2
+    return i * gridStep, j * gridStep, np.reshape(columnDensity[inverse], i.shape)
+
+#Method def for creating a 3d surface figure of the column density
+def plotColumnDensitySurface(vmc, x, y, columnDensity):
+    figure = Figure(figsize=(10, 10))
+    axes = figure.add_subplot(111, projection='3d')
+    axes.plot_surface(x, y, columnDensity, cmap='viridis', edgecolor='none')
+    axes.set_xlabel('Distance (km)')
+    axes.set_ylabel('Distance (km)')
+    axes.set_zlabel('Column density (1/cm^2)')
+    axes.set_title(f'{vmc.fragment.name} column density')
+    return figure
+
+#Gets the curve of growth plot, the number of fragments inside circular apertures of every radius (see ApertureChecks.py)
+def getCurveOfGrowth(vmc, vmr):
+    rs, counts = curveOfGrowth(vmr)
+    figure = Figure(figsize=(10, 10))
+    axes = figure.add_subplot(111)
+    axes.plot((rs * u.m).to_value(u.km), counts, label='Fragments in aperture')
+    axes.axhline(float(vmr.num_fragments_theory), linestyle='--', color='gray', label='Theoretical total')
+    axes.set_xscale('log')
+    axes.set_xlabel('Aperture radius (km)')
+    axes.set_ylabel('Number of fragments')
+    axes.set_title(f'{vmc.fragment.name} curve of growth')
+    axes.legend()
+    return figure
+
+#Method def for getting the profiles of a vmr used by the comparison plot, converted to the comparison units once
+#Returns the radial density (km, 1/cm3) and column density (km, 1/cm2) as float64 arrays
+def getComparisonProfiles(vmr):
+    return getRadialDensityTable(vmr), getColumnDensityTable(vmr)
+
+#Method def for overlaying the profiles of many runs on shared axes, profiles is a list from getComparisonProfiles()
+#Every run gets its own color from the viridis colormap and only precomputed arrays are plotted (no pyvectorial plots)
+#Returns the figure and a (radial line, column density line) for every run
+def getComparisonPlot(profiles, labels):
+    figure = Figure(figsize=(10, 10))
+    radialAxes = figure.add_subplot(211)
+    columnAxes = figure.add_subplot(212)
+    colors = colormaps['viridis'](np.linspace(0, 1, max(len(profiles), 1)))
+    lines = []
+    for (radial, column), label, color in zip(profiles, labels, colors):
+        radialLine, = radialAxes.plot(*radial, color=color, linewidth=1, label=label)
+        columnLine, = columnAxes.plot(*column, color=color, linewidth=1, label=label)
+        lines.append((radialLine, columnLine))
+    for axes, ylabel, title in [(radialAxes, 'Fragment density (1/cm3)', 'Radial density'), (columnAxes, 'Column density (1/cm2)', 'Column density')]:
+        axes.set_xscale('log')
+        axes.set_yscale('log')
+        axes.set_xlabel('Radius (km)')
+        axes.set_ylabel(ylabel)
+        axes.set_title(title)
+    figure.tight_layout()
+    return figure, lines
 
 #Additional methods that reference pyvectioral
 
-#Gets the radial density from a given vmr
+#Gets the radial density table from a given vmr as arrays, radius (km) and fragment density (1/cm3)
+#The units are converted once on the whole array
+def getRadialDensityTable(vmr):
+    return vmr.volume_density_grid.to_value(u.km), vmr.volume_density.to_value(1/u.cm**3)
+
+#Gets the column density table from a given vmr as arrays, radius (km) and column density (1/cm2)
+def getColumnDensityTable(vmr):
+    return vmr.column_density_grid.to_value(u.km), vmr.column_density.to_value(1/u.cm**2)
+
+#Gets the radial density from a given vmr as text
 def getPrintRadialDensity(vmr):
-    with io.StringIO() as buf, redirect_stdout(buf):
-        PrintRadialDensity(vmr)
-        result = buf.getvalue()
-    return result
+    radii, densities = getRadialDensityTable(vmr)
+    rows = [f"{r:10.1f} km : {n_r:8.4f} 1 / cm3" for r, n_r in zip(radii.tolist(), densities.tolist())]
+    return "\nRadius (km) vs Fragment density (1/cm3)\n---------------------------------------\n" + "\n".join(rows) + "\n"
     
-#Gets the column density from a given vmr
+#Gets the column density from a given vmr as text
 def getPrintColumnDensity(vmr):
-    with io.StringIO() as buf, redirect_stdout(buf):
-        PrintColumnDensity(vmr)
-        result = buf.getvalue()
-    return result
+    radii, densities = getColumnDensityTable(vmr)
+    rows = [f'{r:7.0f} km :\t{cd:5.3e} 1 / cm2' for r, cd in zip(radii.tolist(), densities.tolist())]
+    return "\nRadius (km) vs Column density (1/cm2)\n-------------------------------------\n" + "\n".join(rows) + "\n"
 
 #Gets the agreement check from a given vmr
 def getAgreementCheck(vmr):
-    with io.StringIO() as buf, redirect_stdout(buf):
+    with io.StringIO() as buf, threadOutput(buf):
         AgreementCheck(vmr)
         result = buf.getvalue()
     return result
 
-#Copy of a method in pyvectorial, fixed a formatting issue
-def PrintRadialDensity(vmr):
-    print("\nRadius (km) vs Fragment density (1/cm3)\n---------------------------------------")
-    rgrid = vmr.volume_density_grid
-    dens = vmr.volume_density
-    for r, n_r in zip(rgrid, dens):
-        print(f"{r.to(u.km):10.1f} : {n_r.to(1/(u.cm**3)):8.4f}")
-
-#Copy of a method in pyvectorial, fixed a formatting issue
-def PrintColumnDensity(vmr):
-    print("\nRadius (km) vs Column density (1/cm2)\n-------------------------------------")
-    cds = list(zip(vmr.column_density_grid, vmr.column_density))
-    for pair in cds:
-        print(f'{pair[0].to(u.km):7.0f} :\t{pair[1].to(1/(u.cm*u.cm)):5.3e}')
-
 #Copy of a method in pyvectorial, fixed a formatting issue
 def AgreementCheck(vmr):
     print("\nFragment agreement check:")
     print(f"\tTheoretical total number of fragments in coma:\t {vmr.num_fragments_theory:.7e}")
     print(f"\tTotal number of fragments from density grid integration:\t {vmr.num_fragments_grid:.7e}")
 
-#Copy of a method in pyvectorial, fixed a formatting issue
-def ApertureCheck(coma):
-    f_theory = coma.vmr.num_fragments_theory
-    ap2 = sba.CircularAperture((coma.vmr.max_grid_radius.value) * u.m)
-    ap3 = sba.AnnularAperture([500000, coma.vmr.max_grid_radius.value] * u.m)
-    circular_result = coma.total_number(ap2)*100/f_theory
-    annular_result = coma.total_number(ap3)*100/f_theory
-    print("\nPercent of fragments recovered by integrating column density over")
-    print(f"\tLarge circular aperture:\t{circular_result:2.2f}%")
-    print(f"\tAnnular aperture, inner radius 500000 km, outer radius of entire grid:\t{annular_result:2.2f}%")
-
 #Test methods
 
 #Method def for testing if a data value is a float or int and if val >= 0 or if a val is a bool
@@ -166,26 +639,6 @@ def valueTest(input, type):
     else:
         return False
 
-#Method def for testing a 2/3 level deep dict value for it being either float/int/bool/any data type
-def dictTest(dict, parent, child, type, grandchild=None):
-    try:
-        if(grandchild == None): #Creates a "2 deep level" dict test 
-            test = dict[f'{parent}'][f'{child}']
-        else: #Creates a "3 deep level" dict test
-            test = dict[f'{parent}'][f'{child}'][f'{grandchild}']
-        if (type == 'float' and valueTest(test, 'float')): #Test if the dict value is a float
-            return True
-        elif (type == 'int' and valueTest(test, 'int')): #Test if the dict value is an int
-            return True
-        elif (type == 'bool' and valueTest(test, 'bool')): #Test if the dict value is a bool
-            return True
-        elif(type == 'any'): #Test if the dict value exist, regardless of its data type
-            return True
-        else:
-            return False
-    except KeyError:
-        return False
-
 #Method def for testing if the program can read a given pickle file
 def pickleTest(filePath):
     try:
@@ -195,90 +648,10 @@ def pickleTest(filePath):
         return False
 
 #Method def for testing the input yaml file with the correct results
+#The file is only read, the etc section is set in memory by fileConfig() when the file is run
+#Every missing or incorrect entry is tested in a single pass by validateFile() in ConfigValidator.py
 def fileTest(filePath, CurrentUIRun):
-    with open(f"{filePath}", 'r') as file: #Opens the user yaml file
-        dict = yaml.safe_load(file) #Loads the file
-
-        #Checks all comet variables
-        if(dictTest(dict, 'comet', 'rh', 'float') == False): #Test and sees if the dict value is a correct data type
-            return False, '[\"comet\"][\"rh\"]' #Returns the bool for the failed test and the dict entry that caused the fail
-        if(dictTest(dict, 'comet', 'transform_method', 'any') == False): #Sees if dict['comet']['transform_method'] is real in the file
-            return False, '[\"comet\"][\"transform_method\"]'
-        if((dict['comet']['transform_method'] != 'cochran_schleicher_93') and #Sees if the transform_method is assigned properly
-            (dict['comet']['transform_method'] != 'festou_fortran') and
-            (dict['comet']['transform_method'] != None)):
-            return False, '[\"comet\"][\"transform_method\"]'
-        if(dictTest(dict, 'comet', 'transform_applied', 'bool') == False):
-            return False, '[\"comet\"][\"transform_applied\"]'
-        if(dictTest(dict, 'fragment', 'v_photo', 'float') == False):
-            return False, '[\"fragment\"][\"v_photo\"]'
-        
-        #Checks all grid variables
-        if(dictTest(dict, 'grid', 'angular_points', 'int') == False):
-            return False, '[\"grid\"][\"angular_points\"]'
-        if(dictTest(dict, 'grid', 'radial_points', 'int') == False):
-            return False, '[\"grid\"][\"radial_points\"]'
-        if(dictTest(dict, 'grid', 'radial_substeps', 'int') == False):
-            return False, '[\"grid\"][\"radial_substeps\"]'
-        
-        #Checks all parent variables
-        if(dictTest(dict, 'parent', 'T_to_d_ratio', 'float') == False):
-            return False, '[\"parent\"][\"T_to_d_ratio\"]'
-        if(dictTest(dict, 'parent', 'sigma', 'float') == False):
-            return False, '[\"parent\"][\"sigma\"]'
-        if(dictTest(dict, 'parent', 'tau_d', 'float') == False):
-           return False, '[\"parent\"][\"tau_d\"]'
-        if(dictTest(dict, 'parent', 'v_outflow', 'float') == False):
-            return False, '[\"parent\"][\"v_outflow\"]'
-
-        #Checks all production variables
-        if(dictTest(dict, 'production', 'base_q', 'float') == False):
-            return False, '[\"production\"][\"base_q\"]'
-        if(dictTest(dict, 'production', 'time_variation_type', 'any') == False):
-            return False, '[\"production\"][\"time_variation_type\"]'
-        #Sees if the time variation is a sine and checks all the params
-        if(dict['production']['time_variation_type'] == 'sine wave'):
-            if(dictTest(dict, 'production', 'params', 'float', 'amplitude') == False):
-                return False, '[\"production\"][\"params\"][\"amplitude\"]'
-            if(dictTest(dict, 'production', 'params', 'float', 'delta') == False):
-                return False, '[\"production\"][\"params\"][\"delta\"]'
-            if(dictTest(dict, 'production', 'params', 'float', 'period') == False):
-                return False, '[\"production\"][\"params\"][\"period\"]'
-        #Sees if the time variation is a gaussian and checks all the params
-        elif(dict['production']['time_variation_type'] == 'gaussian'): 
-            if(dictTest(dict, 'production', 'params', 'float', 'amplitude') == False):
-                return False, '[\"production\"][\"params\"][\"amplitude\"]'
-            if(dictTest(dict, 'production', 'params', 'float', 'std_dev') == False):
-                return False, '[\"production\"][\"params\"][\"std_dev\"]'
-            if(dictTest(dict, 'production', 'params', 'float', 't_max') == False):
-                return False, '[\"production\"][\"params\"][\"t_max\"]'
-        #Sees if the time variation is a square and checks all the params
-        elif(dict['production']['time_variation_type'] == 'square pulse'):
-            if(dictTest(dict, 'production', 'params', 'float', 'amplitude') == False):
-                return False, '[\"production\"][\"params\"][\"amplitude\"]'
-            if(dictTest(dict, 'production', 'params', 'float', 'duration') == False):
-                return False, '[\"production\"][\"params\"][\"duration\"]'
-            if(dictTest(dict, 'production', 'params', 'float', 't_start') == False):
-                return False, '[\"production\"][\"params\"][\"t_start\"]'
-        #Sees if the time variation is null
-        elif(dict['production']['time_variation_type'] != None):
-            return False, '[\"production\"][\"time_variation_type\"]'
-        
-        #Creates the etc section
-        dict['etc'] = {} #Clears the etc section on the file, if any is present
-        dict['etc']['print_binned_times'] = True #Sets all etc variabled to the correct value
-        dict['etc']['print_column_density'] = True
-        dict['etc']['print_progress'] = True
-        dict['etc']['print_radial_density'] = True
-        dict['etc']['pyv_coma_pickle'] = CurrentUIRun.PyvComaPickle
-        dict['etc']['pyv_date_of_run'] = datetime.now()
-        dict['etc']['show_3d_column_density_centered'] = True
-        dict['etc']['show_3d_column_density_off_center'] = True
-        dict['etc']['show_agreement_check'] = True
-        dict['etc']['show_aperture_checks'] = True
-        dict['etc']['show_column_density_plots'] = True
-        dict['etc']['show_fragment_sputter'] = True
-        dict['etc']['show_radial_plots'] = True
-
-        newFileInputs(filePath, dict) #Creates a new yaml file with the new dict with the etc section
-    return True, None #Returns no messgae as the test passed, no dict value caused an error throw
\ No newline at end of file
+    errors = validateFile(filePath)
+    if(len(errors) > 0):
+        return False, ', '.join(errors) #Returns the bool for the failed test and the dict entries that caused the fail
+    return True, None #Returns no messgae as the test passed, no dict value caused an error throw
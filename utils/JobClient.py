@@ -0,0 +1,103 @@
+#Program to send runs to a local job server (see JobServer.py) shared by the UI and command line clients of every user of a group.
+#Every message is json in both directions (nothing received from a connection is ever unpickled): a request is a yaml style dict,
+#the server answers with status lines while the run waits or runs and then with the path of the result store (see ResultStore.py)
+#it saved the vmr as, which the client opens from the disk.
+#The server address is a Unix socket in a shared folder (VECTORIAL_SERVER_DIR) that the group can open on Linux and MacOS,
+#and a localhost port on Windows.
+#The server and every client need the same key in VECTORIAL_SERVER_KEY, without it no connection is made.
+#
+#Version: 10/18/2026
+
+import os
+import json
+import getpass
+import tempfile
+from contextlib import closing
+from multiprocessing.connection import Client, AuthenticationError
+
+ServerDirectoryVariable = 'VECTORIAL_SERVER_DIR' #Environment variable holding the shared folder of the server
+ServerDirectory = os.environ.get(ServerDirectoryVariable) or os.path.join(tempfile.gettempdir(), 'vectorial_ui_server') #Folder of the socket and the result stores, open to the group
+ServerAddress = os.path.join(ServerDirectory, 'jobs.sock') if os.name == 'posix' else ('localhost', 48613)
+ServerKeyVariable = 'VECTORIAL_SERVER_KEY' #Environment variable holding the key every connection is authenticated with
+
+#Exception raised when the job server could not run a request
+class ServerError(Exception):
+    pass
+
+#Method def for getting the key of the job server, None if VECTORIAL_SERVER_KEY is not set (there is no default key)
+def serverKey():
+    key = os.environ.get(ServerKeyVariable, '')
+    return None if key == '' else key.encode()
+
+#Method def for getting the name of a client (user:process id), runs are shared fairly between the users of the clients
+def clientName():
+    return f'{getpass.getuser()}:{os.getpid()}'
+
+#Method def for getting the user of a client name given by clientName()
+def clientUser(client):
+    return client.rpartition(':')[0] or client
+
+#Method def for reading an address given as text, a Unix socket path or host:port
+def parseAddress(text):
+    if(text == None):
+        return ServerAddress
+    host, colon, port = text.rpartition(':')
+    if(colon == '' or port.isdigit() == False):
+        return text
+    return (host, int(port))
+
+#Method def for sending a message (any json value) on a connection
+def sendMessage(connection, message):
+    connection.send_bytes(json.dumps(message, default=str).encode())
+
+#Method def for reading a message sent by sendMessage()
+def receiveMessage(connection):
+    return json.loads(connection.recv_bytes())
+
+#Method def for opening a connection to the job server, raises ServerError if there is no key
+def connectServer(address=ServerAddress):
+    if(serverKey() == None):
+        raise ServerError(f'{ServerKeyVariable} is not set')
+    return Client(address, authkey=serverKey())
+
+#Method def for testing if a job server is running at address, always False without a key
+def serverAvailable(address=ServerAddress):
+    if(serverKey() == None):
+        return False
+    if(isinstance(address, str) and os.path.exists(address) == False): #No socket, no server
+        return False
+    try:
+        with closing(connectServer(address)) as connection:
+            sendMessage(connection, {'op' : 'ping'})
+            return receiveMessage(connection).get('type') == 'pong'
+    except (OSError, EOFError, AuthenticationError, ValueError, AttributeError):
+        return False
+
+#Method def for getting the state of the job server: the number of queued jobs of every user and the number of running jobs
+def serverStatus(address=ServerAddress):
+    with closing(connectServer(address)) as connection:
+        sendMessage(connection, {'op' : 'status'})
+        return receiveMessage(connection)
+
+#Method def for running a yaml style dict on the job server
+#progressCallback (optional) is called with every status line of the server (queued, running), raising from it stops waiting
+#(the run still finishes on the server and its result is cached)
+#Returns the path of the result store of the run and its profile stages, the path is None if the dict could not be run
+def serverRun(dict, client=None, progressCallback=None, address=ServerAddress):
+    request = {'op' : 'run', 'client' : clientName() if client == None else client, 'config' : dict}
+    with closing(connectServer(address)) as connection:
+        sendMessage(connection, request)
+        while(True):
+            try:
+                message = receiveMessage(connection)
+            except EOFError:
+                raise ServerError('the job server closed the connection')
+            except ValueError:
+                raise ServerError('the job server sent a message that is not json')
+            if(message.get('type') == 'status'):
+                if(progressCallback != None):
+                    progressCallback(message['text'])
+            elif(message.get('type') == 'done'):
+                return message['store'], message['stages']
+            else:
+                raise ServerError(message.get('message', 'unknown answer from the job server'))
@@ -0,0 +1,179 @@
+#Program to keep the jobs of a sweep in a local SQLite queue so a sweep survives the UI or CLI being closed or crashing.
+#Every job records its yaml style dict, its state and the path of its result store (see ResultStore.py).
+#Resuming a sweep only runs the jobs that are not finished, finished jobs are loaded from their result stores.
+#Every sweep records its owner (host:process id) and a heartbeat the owner updates while it runs the sweep. Only sweeps whose owner
+#stopped (the process is gone, its heartbeat is stale or it gave the sweep up) are offered to resume or discard, and a sweep is only
+#run by the process that claimed it, so a sweep still running in another UI window or command line run is never run twice or removed.
+#Jobs left 'running' by a crash are put back to 'queued' when the sweep is claimed by the process resuming it.
+#A sweep is removed once its results are loaded (UI) or written (CLI), removeFinishedSweeps() removes any finished sweep
+#left behind (a session closed before its results were loaded, or result stores that could not be deleted while open).
+#
+#Version: 10/18/2026
+
+import os
+import json
+import time
+import shutil
+import socket
+import sqlite3
+from contextlib import closing
+
+QueueDirectory = os.path.join(os.path.expanduser('~'), '.vectorial_ui') #Folder holding the queue database
+QueuePath = os.path.join(QueueDirectory, 'jobs.sqlite') #Queue database
+JobDirectory = os.path.join(QueueDirectory, 'jobs') #Folder holding the result stores of every sweep
+JobStates = ['queued', 'running', 'done', 'failed'] #States of a job, 'done' and 'failed' jobs are finished
+HeartbeatSeconds = 10 #Seconds between the heartbeats of a running sweep
+StaleSeconds = 120 #Seconds without a heartbeat after which the owner of a sweep is taken to have stopped
+
+QueueTables = '''
+CREATE TABLE IF NOT EXISTS sweeps (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, output TEXT, created REAL, owner TEXT, heartbeat REAL);
+CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, sweep INTEGER, position INTEGER, config TEXT,
+    label TEXT, state TEXT, result_path TEXT, seconds REAL, updated REAL);
+CREATE INDEX IF NOT EXISTS jobs_sweep ON jobs (sweep, position);
+'''
+SweepColumns = {'owner' : 'TEXT', 'heartbeat' : 'REAL'} #Columns added to the sweeps of a queue made before sweeps had owners
+
+#Exception raised when a sweep is claimed by a process that is still running it
+class SweepOwned(Exception):
+    pass
+
+#Method def for opening the queue database, creating it if needed
+#A new connection is opened for every call so the queue can be used from any thread or process
+def connectQueue():
+    os.makedirs(QueueDirectory, exist_ok=True)
+    connection = sqlite3.connect(QueuePath, timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.execute('PRAGMA journal_mode=WAL') #Readers are not blocked while a job is written
+    connection.executescript(QueueTables)
+    columns = [row['name'] for row in connection.execute('PRAGMA table_info(sweeps)')]
+    for column, columnType in SweepColumns.items():
+        if(column not in columns):
+            try:
+                connection.execute(f'ALTER TABLE sweeps ADD COLUMN {column} {columnType}')
+            except sqlite3.OperationalError: #Added by another process since the columns were read
+                pass
+    return connection
+
+#Owner methods
+
+#Method def for getting the owner name of this process (host:process id)
+def ownerName():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+#Method def for testing if a process is running, only used for owners on this host
+#Windows has no safe way to test a process id, there the heartbeat decides
+def processAlive(pid):
+    if(os.name != 'posix'):
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError: #Running as another user
+        return True
+    return True
+
+#Method def for testing if the owner of a sweep stopped (gave it up, its process is gone or its heartbeat is stale)
+def ownerStopped(owner, heartbeat):
+    if(owner == None or heartbeat == None or time.time() - heartbeat > StaleSeconds):
+        return True
+    host, colon, pid = owner.rpartition(':')
+    if(host == socket.gethostname() and pid.isdigit() and int(pid) != os.getpid()):
+        return processAlive(int(pid)) == False
+    return False
+
+#Method def for making this process the owner of a sweep, only if it already owns it or the owner stopped
+#Jobs left 'running' by a stopped owner are put back in the queue, raises SweepOwned if another process is running the sweep
+def claimSweep(sweepId):
+    with closing(connectQueue()) as connection:
+        connection.execute('BEGIN IMMEDIATE') #No other process can claim the sweep between the test and the update
+        row = connection.execute('SELECT owner, heartbeat FROM sweeps WHERE id = ?', (sweepId,)).fetchone()
+        if(row == None or (row['owner'] != ownerName() and ownerStopped(row['owner'], row['heartbeat']) == False)):
+            connection.rollback()
+            raise SweepOwned(f'sweep {sweepId} is not in the job queue' if row == None else f"sweep {sweepId} is running in {row['owner']}")
+        if(row['owner'] != ownerName()):
+            connection.execute("UPDATE jobs SET state = 'queued', updated = ? WHERE sweep = ? AND state = 'running'", (time.time(), sweepId))
+        connection.execute('UPDATE sweeps SET owner = ?, heartbeat = ? WHERE id = ?', (ownerName(), time.time(), sweepId))
+        connection.commit()
+
+#Method def for updating the heartbeat of a sweep owned by this process every HeartbeatSeconds until stop (threading.Event) is set
+def keepSweep(sweepId, stop):
+    while(stop.wait(HeartbeatSeconds) == False):
+        with closing(connectQueue()) as connection, connection:
+            connection.execute('UPDATE sweeps SET heartbeat = ? WHERE id = ? AND owner = ?', (time.time(), sweepId, ownerName()))
+
+#Method def for giving up a sweep owned by this process (cancelled or failed), it can then be resumed by any process
+def releaseSweep(sweepId):
+    with closing(connectQueue()) as connection, connection:
+        connection.execute('UPDATE sweeps SET owner = NULL WHERE id = ? AND owner = ?', (sweepId, ownerName()))
+
+#Queue methods
+
+#Method def for getting the result store path of a job
+def jobStorePath(sweepId, position):
+    return os.path.join(JobDirectory, f'sweep_{sweepId}', f'job_{position}.vms')
+
+#Method def for adding a sweep to the queue, every dict becomes a queued job, the sweep is owned by this process
+#output is the output folder of a command line sweep (None for the UI)
+#Returns the id of the sweep
+def addSweep(dicts, labels, name, output=None):
+    with closing(connectQueue()) as connection, connection:
+        sweepId = connection.execute('INSERT INTO sweeps (name, output, created, owner, heartbeat) VALUES (?, ?, ?, ?, ?)',
+                (name, output, time.time(), ownerName(), time.time())).lastrowid
+        connection.executemany('INSERT INTO jobs (sweep, position, config, label, state, updated) VALUES (?, ?, ?, ?, ?, ?)',
+                [(sweepId, i, json.dumps(dict, default=str), label, 'queued', time.time()) for i, (dict, label) in enumerate(zip(dicts, labels))])
+    return sweepId
+
+#Method def for getting the jobs of a sweep in order
+#Returns a list of dicts with the job id, position, config (yaml style dict), label, state, result_path and seconds
+def sweepJobs(sweepId):
+    with closing(connectQueue()) as connection:
+        rows = connection.execute('SELECT * FROM jobs WHERE sweep = ? ORDER BY position', (sweepId,)).fetchall()
+    jobs = []
+    for row in rows:
+        job = {key : row[key] for key in row.keys()}
+        job['config'] = json.loads(job['config'])
+        jobs.append(job)
+    return jobs
+
+#Method def for setting the state of a job, resultPath and seconds are only set when given
+def markJob(jobId, state, resultPath=None, seconds=None):
+    with closing(connectQueue()) as connection, connection:
+        connection.execute('UPDATE jobs SET state = ?, result_path = COALESCE(?, result_path), '
+                'seconds = COALESCE(?, seconds), updated = ? WHERE id = ?', (state, resultPath, seconds, time.time(), jobId))
+
+#Method def for getting every sweep with queued or running jobs whose owner stopped, oldest first
+#Sweeps still run by another process (another UI window or command line run) are left out
+#Returns a list of dicts with the sweep id, name, output, finished (number of finished jobs) and total (number of jobs)
+def unfinishedSweeps():
+    with closing(connectQueue()) as connection:
+        rows = connection.execute("SELECT sweeps.id, sweeps.name, sweeps.output, sweeps.owner, sweeps.heartbeat, "
+                "SUM(jobs.state IN ('done', 'failed')) AS finished, COUNT(jobs.id) AS total FROM sweeps JOIN jobs ON jobs.sweep = sweeps.id "
+                "GROUP BY sweeps.id HAVING finished < total ORDER BY sweeps.id").fetchall()
+    return [{key : row[key] for key in ['id', 'name', 'output', 'finished', 'total']} for row in rows if ownerStopped(row['owner'], row['heartbeat'])]
+
+#Method def for removing a sweep, its jobs and its result stores from the queue
+def removeSweep(sweepId):
+    with closing(connectQueue()) as connection, connection:
+        connection.execute('DELETE FROM jobs WHERE sweep = ?', (sweepId,))
+        connection.execute('DELETE FROM sweeps WHERE id = ?', (sweepId,))
+    shutil.rmtree(os.path.join(JobDirectory, f'sweep_{sweepId}'), ignore_errors=True)
+
+#Method def for removing every sweep whose jobs are all finished and whose owner stopped, and the result stores of sweeps no longer in the queue
+#Finished sweeps of a running process are left for it to load (UI) or write (CLI) and remove
+#Returns the ids of the removed sweeps
+def removeFinishedSweeps():
+    with closing(connectQueue()) as connection:
+        rows = connection.execute("SELECT sweeps.id, sweeps.owner, sweeps.heartbeat, SUM(jobs.state IN ('done', 'failed')) AS finished, "
+                "COUNT(jobs.id) AS total FROM sweeps LEFT JOIN jobs ON jobs.sweep = sweeps.id GROUP BY sweeps.id").fetchall()
+        lastId = connection.execute("SELECT MAX(seq) FROM sqlite_sequence WHERE name = 'sweeps'").fetchone()[0] or 0 #Last id ever given to a sweep
+    finished = [row['id'] for row in rows if (row['finished'] or 0) >= row['total'] and ownerStopped(row['owner'], row['heartbeat'])]
+    for sweepId in finished:
+        removeSweep(sweepId)
+    queued = set(row['id'] for row in rows) - set(finished)
+    if(os.path.isdir(JobDirectory)):
+        for name in os.listdir(JobDirectory):
+            #Sweeps added by another process since the query have higher ids and are left alone
+            if(name.startswith('sweep_') and name[6:].isdigit() and int(name[6:]) <= lastId and int(name[6:]) not in queued):
+                shutil.rmtree(os.path.join(JobDirectory, name), ignore_errors=True)
+    return finished
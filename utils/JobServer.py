@@ -0,0 +1,252 @@
+#Program to run one job server for a group of users that owns the worker pool (see WorkerPool.py) and the result cache (see ResultCache.py),
+#so every UI and command line client of every user shares the cores and the results instead of each starting its own runs.
+#Identical requests (the same cache key) that are queued or running are only run once, every client waiting on them gets the result.
+#Queued runs are handed to the pool one at a time per free worker, taking turns between users (round robin, the user is taken
+#from the client name), so a user with a large batch or many windows does not hold up the single runs of other users.
+#Clients connect with JobClient.py. Every message is json, the vmr of a run is saved as a result store (see ResultStore.py) in the
+#shared folder (VECTORIAL_SERVER_DIR) and the client is sent its path. The folder, the socket and the stores are open to the group
+#of the folder (set with --group) and the server does not start without a key in VECTORIAL_SERVER_KEY.
+#
+#Usage: VECTORIAL_SERVER_KEY=key VECTORIAL_SERVER_DIR=folder vectorial-server -j workers -g group
+#       VECTORIAL_SERVER_KEY=key vectorial-server --status
+#
+#Version: 10/18/2026
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, wait
+from multiprocessing.connection import Listener, AuthenticationError
+from .FileRunner import sweepJobRun
+from .ResultCache import cacheKey, loadResult
+from .ResultStore import saveStore
+from .WorkerPool import sharedPool, setPoolSize, poolWorkers, warmPool
+from .JobClient import ServerDirectory, ServerDirectoryVariable, ServerAddress, ServerKeyVariable, serverKey, parseAddress, serverAvailable
+from .JobClient import serverStatus, clientUser, sendMessage, receiveMessage
+
+StatusSeconds = 5 #Seconds between status lines sent to a waiting client
+StoreDirectory = os.path.join(ServerDirectory, 'results') #Result stores of the runs, read by the clients
+StoreMaxBytes = 2 * 1024**3 #Max size of the result stores, the least recently used are removed first
+SharedUmask = 0o007 #Files made by the server and its workers can be read and written by the group, not by others
+
+#Method def for getting the result store path of a cache key
+def storePath(key):
+    return os.path.join(StoreDirectory, f'{key}.vms')
+
+#Method def for running a dict in a worker of the pool, the worker saves the result store itself so the vmr is not sent back
+#Returns the path of the result store (None if the dict could not be run) and the profile stages of the run
+def serverJob(dict, path):
+    vmc, vmr, seconds, profile = sweepJobRun(dict, path)
+    return (None if vmr is False else path), ([] if profile == None else profile.stages)
+
+#Method def for creating a folder the group can open, files made in it get the group of the folder (setgid)
+#group (optional) is the name of the group given the folder, otherwise it keeps its group
+def sharedDirectory(path, group=None):
+    os.makedirs(path, mode=0o2770, exist_ok=True)
+    if(group != None):
+        shutil.chown(path, group=group)
+    os.chmod(path, 0o2770) #makedirs does not change a folder that already exists
+
+#Method def for removing the least recently used result stores until they are under maxBytes
+#Stores removed by hand (or another server) while they are listed are skipped
+def evictStores(maxBytes=StoreMaxBytes):
+    stores = []
+    for name in os.listdir(StoreDirectory):
+        if(name.endswith('.vms')):
+            path = os.path.join(StoreDirectory, name)
+            try:
+                stores.append((os.path.getmtime(path), os.path.getsize(path), path))
+            except OSError:
+                continue
+    total = sum(size for mtime, size, path in stores)
+    for mtime, size, path in sorted(stores): #Oldest use first
+        if(total <= maxBytes):
+            break
+        try:
+            os.remove(path) #A client that already opened the store keeps reading it
+        except OSError:
+            pass
+        total -= size
+
+#Class to queue, deduplicate and schedule the runs of every client
+class JobServer:
+    #Intial Config
+    def __init__(self, workers=None):
+        setPoolSize(workers)
+        sharedPool()
+        self.workers = poolWorkers()
+        self.queues = OrderedDict() #User : deque of queued cache keys, the next user to run is first
+        self.configs = {} #Cache key : yaml style dict of every queued run
+        self.inflight = {} #Cache key : Future of every queued or running run, shared by every client that asked for it
+        self.started = {} #Cache key : start time of every running run
+        self.condition = threading.Condition()
+
+    #Queues a run for a user, or joins the identical run already queued or running
+    #Returns the cache key of the run and the Future of its (result store path, profile stages)
+    def request(self, user, dict):
+        key = cacheKey(dict)
+        with self.condition:
+            if(key in self.inflight):
+                return key, self.inflight[key]
+        future = Future()
+        if(os.path.isfile(storePath(key))): #Run before, the store is still there
+            os.utime(storePath(key)) #Marks the store as recently used for the eviction
+            future.set_result((storePath(key), []))
+            return key, future
+        cached = loadResult(key)
+        if(cached != None): #Answered from the cache without a worker
+            saveStore(cached, storePath(key))
+            future.set_result((storePath(key), []))
+            return key, future
+        with self.condition:
+            if(key in self.inflight): #Queued by another client while the cache was read
+                return key, self.inflight[key]
+            self.inflight[key] = future
+            self.configs[key] = dict
+            self.queues.setdefault(user, deque()).append(key)
+            self.condition.notify_all()
+        return key, future
+
+    #Hands queued runs to the pool while it has free workers, taking one run from each user in turn, runs on its own thread
+    #Every client of a user (UI windows, command line runs) shares the turn of the user
+    def schedule(self):
+        while(True):
+            with self.condition:
+                while(len(self.queues) == 0 or len(self.started) >= self.workers):
+                    self.condition.wait()
+                user, queue = next(iter(self.queues.items()))
+                key = queue.popleft()
+                del self.queues[user]
+                if(len(queue) > 0): #The user goes to the back of the turn order
+                    self.queues[user] = queue
+                self.started[key] = time.perf_counter()
+                dict = self.configs.pop(key)
+            try:
+                job = sharedPool().submit(serverJob, dict, storePath(key)) #A new pool replaces a broken one
+            except RuntimeError as error: #The pool was shut down
+                job = Future()
+                job.set_exception(error)
+            job.add_done_callback(lambda job, key=key: self.finish(key, job))
+
+    #Called when a run of the pool finishes, passes its result to every client waiting on it
+    def finish(self, key, job):
+        with self.condition:
+            self.started.pop(key, None)
+            future = self.inflight.pop(key)
+            self.condition.notify_all()
+        if(job.exception() != None):
+            future.set_exception(job.exception())
+        else:
+            future.set_result(job.result())
+            evictStores()
+
+    #Gets the status line of a run sent to the clients waiting on it
+    def runStatus(self, key):
+        with self.condition:
+            if(key in self.started):
+                return f'Running on the job server ({time.perf_counter() - self.started[key]:.0f} s)'
+            queued = sum(len(queue) for queue in self.queues.values())
+            return f'Queued on the job server ({queued} queued, {len(self.started)}/{self.workers} workers busy)'
+
+    #Gets the number of queued runs of every user and the number of running runs
+    def status(self):
+        with self.condition:
+            return {'users' : {user : len(queue) for user, queue in self.queues.items()}, 'running' : len(self.started),
+                    'workers' : self.workers}
+
+    #Answers the requests of a single connection, runs on its own thread
+    #A client that disconnects stops waiting, its run still finishes and is cached
+    def handle(self, connection):
+        try:
+            request = receiveMessage(connection)
+            if(request.get('op') == 'ping'):
+                sendMessage(connection, {'type' : 'pong'})
+            elif(request.get('op') == 'status'):
+                sendMessage(connection, self.status())
+            elif(request.get('op') == 'run'):
+                key, future = self.request(clientUser(str(request.get('client'))), request['config'])
+                while(future.done() == False):
+                    sendMessage(connection, {'type' : 'status', 'text' : self.runStatus(key)})
+                    wait([future], timeout=StatusSeconds)
+                path, stages = future.result()
+                sendMessage(connection, {'type' : 'done', 'store' : path, 'stages' : stages})
+            else:
+                sendMessage(connection, {'type' : 'error', 'message' : f"unknown request: {request.get('op')}"})
+        except (EOFError, OSError): #The client disconnected
+            pass
+        except Exception as error: #The run failed in the pool (a worker died) or the request could not be read
+            try:
+                sendMessage(connection, {'type' : 'error', 'message' : f'{type(error).__name__}: {error}'})
+            except (EOFError, OSError):
+                pass
+        finally:
+            connection.close()
+
+    #Accepts connections until the program is stopped, every connection is answered on its own thread
+    #A Unix socket is open to the group of the shared folder, the key guards every connection (and the localhost port on Windows)
+    def serve(self, address=ServerAddress, group=None):
+        sharedDirectory(ServerDirectory, group)
+        sharedDirectory(StoreDirectory, group)
+        if(isinstance(address, str) and os.path.exists(address)): #Socket left by a server that stopped
+            os.remove(address)
+        with Listener(address, authkey=serverKey()) as listener:
+            if(isinstance(address, str)):
+                if(group != None):
+                    shutil.chown(address, group=group)
+                os.chmod(address, 0o660)
+            threading.Thread(target=self.schedule, daemon=True).start()
+            while(True):
+                try:
+                    connection = listener.accept()
+                except (AuthenticationError, OSError, EOFError): #Wrong key or a client that disconnected during the handshake
+                    continue
+                threading.Thread(target=self.handle, args=(connection,), daemon=True).start()
+
+#Method def for reading the command line arguments
+def parseArguments(argv):
+    parser = argparse.ArgumentParser(prog='vectorial-server', description=f'Run a job server shared by the vectorial model UI and command line clients of a group of users ({ServerKeyVariable} must be set).')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (default: every core)')
+    parser.add_argument('-a', '--address', default=None, help=f'Unix socket path or host:port to listen on (default: {ServerAddress})')
+    parser.add_argument('-g', '--group', default=None, help=f'group given the shared folder and the socket (default: the group of the folder, {ServerDirectory}, set with {ServerDirectoryVariable})')
+    parser.add_argument('-s', '--status', action='store_true', help='print the queued and running jobs of a running server and exit')
+    return parser.parse_args(argv)
+
+#Runs the job server (or prints the status of a running one), returns the exit code
+def main(argv=None):
+    arguments = parseArguments(argv)
+    address = parseAddress(arguments.address)
+    if(serverKey() == None): #There is no default key, anyone could connect with it
+        print(f'Set {ServerKeyVariable} to a secret key (the same one for the server and its clients)', file=sys.stderr)
+        return 1
+    if(arguments.status):
+        if(serverAvailable(address) == False):
+            print('No job server is running', file=sys.stderr)
+            return 1
+        print(json.dumps(serverStatus(address), indent=2))
+        return 0
+    if(serverAvailable(address)):
+        print(f'A job server is already running on {address}', file=sys.stderr)
+        return 1
+    os.umask(SharedUmask) #Set before the workers start so the result stores they save are open to the group
+    server = JobServer(arguments.workers)
+    warmPool()
+    print(f'Job server with {server.workers} workers listening on {address}')
+    try:
+        server.serve(address, arguments.group)
+    except KeyboardInterrupt:
+        pass
+    except (LookupError, PermissionError) as error: #Unknown group, or a group the user is not in
+        print(f'Could not share {ServerDirectory} with the group: {error}', file=sys.stderr)
+        return 1
+    finally:
+        if(isinstance(address, str) and os.path.exists(address)):
+            os.remove(address)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
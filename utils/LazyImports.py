@@ -0,0 +1,52 @@
+#Program to defer the imports of the heavy scientific packages (pyvectorial, sbpy, astropy, scipy) until they are first used,
+#so importing utils (and showing the main window) does not wait for them.
+#A lazy module is imported the first time one of its attributes is used, from any thread.
+#warmImports() imports every heavy package ahead of time, the UI calls it on a background thread once the window is shown.
+#
+#Version: 10/18/2026
+
+import time
+import importlib
+
+HeavyModules = ['astropy.units', 'astropy.visualization', 'scipy.integrate', 'scipy.interpolate', 'sbpy.activity', 'pyvectorial'] #In import order
+
+#Class to stand in for a module until one of its attributes is used
+class LazyModule:
+    #Intial Config
+    def __init__(self, name):
+        self.__dict__['lazyName'] = name
+        self.__dict__['lazyModule'] = None
+
+    #Imports the module, the import lock makes a module imported by two threads at once only run once
+    def load(self):
+        if(self.lazyModule == None):
+            self.__dict__['lazyModule'] = importlib.import_module(self.lazyName)
+        return self.lazyModule
+
+    #Only called for attributes not found on the LazyModule itself, so every module attribute imports the module
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        return f"<lazy module '{self.lazyName}'{' (imported)' if self.lazyModule != None else ''}>"
+
+#Method def for getting a module that is only imported when first used (pyv = lazyImport('pyvectorial'))
+def lazyImport(name):
+    return LazyModule(name)
+
+#Method def for importing every heavy module ahead of their first use
+#progressCallback (optional) is called with the name of every module as it is imported, so it can be run by a RunWorker()
+#Returns the seconds spent importing each module (0 for modules already imported, None for modules that could not be imported,
+#their error is raised again at their first use)
+def warmImports(progressCallback=None):
+    seconds = {}
+    for name in HeavyModules:
+        if(progressCallback != None):
+            progressCallback(f'Importing {name}')
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            seconds[name] = time.perf_counter() - start
+        except ImportError:
+            seconds[name] = None
+    return seconds
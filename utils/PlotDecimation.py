@@ -0,0 +1,85 @@
+#Program to keep interactive plots of very fine radial grids fast by only drawing a decimated copy of every long line.
+#The visible part of a line is split into one bucket per pixel column of its axes and only the first, last, min and max
+#point of every bucket are drawn (min/max decimation), so the line looks the same but at most 4 points per pixel are drawn
+#however large radial_points * radial_substeps is.
+#Every pan or zoom decimates the line again from the full arrays, zooming in far enough draws the full resolution.
+#Exported plots (see PlotExporter.py) are not decimated.
+#
+#Version: 10/18/2026
+
+import numpy as np
+
+DecimateMinPoints = 4000 #Lines with fewer points are drawn as they are
+
+#Method def for getting the position of x values along an axes as a fraction of its width (0 at the left edge, 1 at the right)
+def axesFraction(axes, x):
+    left, right = axes.get_xlim()
+    if(axes.get_xscale() == 'log'):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (np.log10(x) - np.log10(left)) / (np.log10(right) - np.log10(left))
+    return (x - left) / (right - left)
+
+#Method def for getting the indices of the points kept by min/max decimation of y into buckets
+#buckets is a sorted (non decreasing) bucket number for every point, so every bucket is a contiguous run of points
+#Returns the sorted indices of the first, last, min and max point of every bucket
+def minMaxIndices(y, buckets):
+    starts = np.flatnonzero(np.diff(buckets)) + 1
+    starts = np.concatenate(([0], starts))
+    ends = np.concatenate((starts[1:], [len(y)])) - 1
+    bucketIds = np.repeat(np.arange(len(starts)), np.diff(np.concatenate((starts, [len(y)]))))
+    low = np.nan_to_num(y, nan=np.inf) #NaN points are never the min or the max
+    high = np.nan_to_num(y, nan=-np.inf)
+    isMin = low == np.minimum.reduceat(low, starts)[bucketIds]
+    isMax = high == np.maximum.reduceat(high, starts)[bucketIds]
+    kept = [starts, ends]
+    for isExtreme in [isMin, isMax]:
+        candidates = np.flatnonzero(isExtreme)
+        firsts = np.unique(bucketIds[candidates], return_index=True)[1] #First point of every bucket at its extreme
+        kept.append(candidates[firsts])
+    return np.unique(np.concatenate(kept))
+
+#Method def for decimating x, y to the visible range of axes, one bucket per pixel column
+#One point past each edge of the visible range is kept so the line runs to the edges of the axes
+#Returns the decimated x and y
+def decimate(axes, x, y):
+    left, right = sorted(axes.get_xlim())
+    start = max(np.searchsorted(x, left, side='left') - 1, 0)
+    stop = min(np.searchsorted(x, right, side='right') + 1, len(x))
+    x, y = x[start:stop], y[start:stop]
+    pixels = max(int(axes.bbox.width), 1)
+    if(len(x) <= 4 * pixels): #Zoomed in far enough for the full resolution
+        return x, y
+    buckets = np.clip(np.floor(axesFraction(axes, x) * pixels), -1, pixels)
+    buckets = np.maximum.accumulate(np.nan_to_num(buckets, nan=-1)) #Non decreasing, points left of a log axis go to the first bucket
+    indices = minMaxIndices(y, buckets)
+    return x[indices], y[indices]
+
+#Class to keep the full arrays of a line and draw a decimated copy of them
+class DecimatedLine:
+    #Intial Config
+    def __init__(self, line):
+        self.line = line
+        #Full resolution arrays in the units of the axes, under quantity_support() the original data is a quantity in its own unit
+        self.x = np.asarray(line.get_xdata(orig=False), dtype=float)
+        self.y = np.asarray(line.get_ydata(orig=False), dtype=float)
+        self.line.axes.callbacks.connect('xlim_changed', self.update) #Pans and zooms change the x limits
+
+    #Sets the data of the line to the decimated visible part of the full arrays
+    def update(self, axes=None):
+        x, y = decimate(self.line.axes, self.x, self.y)
+        self.line.set_data(x, y)
+
+#Method def for decimating every long line of a figure, the lines are decimated again on every pan or zoom
+#Lines are only decimated if their x values are sorted (radial grids), other lines are drawn as they are
+#Returns the DecimatedLine of every decimated line, which must be kept with the figure
+def decimateFigure(figure, minPoints=DecimateMinPoints):
+    lines = []
+    for axes in figure.axes:
+        for line in axes.get_lines():
+            x = np.asarray(line.get_xdata(orig=False), dtype=float)
+            if(len(x) < minPoints or np.any(np.diff(x) < 0)):
+                continue
+            lines.append(DecimatedLine(line))
+    for line in lines:
+        line.update()
+    return lines
@@ -0,0 +1,80 @@
+#Program to save every result plot of one or many runs to disk (png, svg or pdf).
+#The plots are rendered concurrently by the shared worker pool (see WorkerPool.py) on the Agg backend, so exporting does not need a display.
+#Both 3d plots are rendered by the same worker so their column density surface is only computed once.
+#
+#Version: 10/17/2026
+
+import os
+from concurrent.futures import as_completed
+from .FileRunner import getFragSputter, getRadialPlots, getColumnDensity, get3DColumnDensity, get3DColumnDensityCentered
+from .FileRunner import getColumnDensitySurface, getCurveOfGrowth, RunCancelled
+from .RunProfiler import RunProfile
+from .WorkerPool import sharedPool, cancelJobs
+
+ExportFormats = ['png', 'svg', 'pdf'] #Formats the plots can be saved as
+PlotGroups = [['fragment_sputter'], ['radial'], ['column_density'], ['column_density_3d', 'column_density_3d_centered'], ['curve_of_growth']] #Plots rendered by one worker task
+
+#Method def for creating the figure of a plot by its file name
+def getPlot(vmc, vmr, plotName, surface=None):
+    if(plotName == 'fragment_sputter'):
+        return getFragSputter(vmc, vmr)
+    if(plotName == 'radial'):
+        return getRadialPlots(vmc, vmr)
+    if(plotName == 'column_density'):
+        return getColumnDensity(vmc, vmr)
+    if(plotName == 'column_density_3d'):
+        return get3DColumnDensity(vmc, vmr, surface)
+    if(plotName == 'column_density_3d_centered'):
+        return get3DColumnDensityCentered(vmc, vmr, surface)
+    if(plotName == 'curve_of_growth'):
+        return getCurveOfGrowth(vmc, vmr)
+    raise ValueError(f'Unknown plot: {plotName}')
+
+#Method def for rendering a group of plots and saving them in every format, called in a worker process
+#Returns the paths of the saved files and the profile stages of every plot (see RunProfiler.py)
+def renderPlots(vmc, vmr, plotNames, outputDir, formats):
+    import matplotlib.pyplot as plt
+    os.makedirs(outputDir, exist_ok=True)
+    surface = None
+    paths = []
+    profile = RunProfile()
+    for plotName in plotNames:
+        if(plotName.startswith('column_density_3d') and surface == None): #Shared by both 3d plots
+            with profile.stage('column density surface'):
+                surface = getColumnDensitySurface(vmr)
+        with profile.stage(f'plot {plotName}'):
+            figure = getPlot(vmc, vmr, plotName, surface)
+        for format in formats:
+            path = os.path.join(outputDir, f'{plotName}.{format}')
+            figure.savefig(path, format=format)
+            paths.append(path)
+        plt.close(figure)
+    return paths, profile.stages
+
+#Method def for submitting the render tasks of a single run to an executor whose workers use the Agg backend
+#Returns the futures of the tasks, each gives the paths of its files and its profile stages
+def submitExport(executor, vmc, vmr, outputDir, formats=('png',)):
+    return [executor.submit(renderPlots, vmc, vmr, plotNames, outputDir, formats) for plotNames in PlotGroups]
+
+#Method def for exporting the plots of many runs in parallel
+#runs is a list of (vmc, vmr, folder name), the plots of each run are saved to outputDir/folder name
+#Returns the paths of every saved file
+def exportResults(runs, outputDir, formats=('png',), workers=None, progressCallback=None):
+    paths = []
+    executor = sharedPool(workers)
+    futures = []
+    for vmc, vmr, folderName in runs:
+        futures += submitExport(executor, vmc, vmr, os.path.join(outputDir, folderName), formats)
+    try:
+        for done, future in enumerate(as_completed(futures)):
+            paths += future.result()[0]
+            if(progressCallback != None):
+                progressCallback(f'Export {done + 1}/{len(futures)} finished')
+    except RunCancelled:
+        cancelJobs(futures)
+        raise
+    return paths
+
+#Method def for exporting the plots of a single run in parallel to outputDir
+def exportPlots(vmc, vmr, outputDir, formats=('png',), workers=None, progressCallback=None):
+    return exportResults([(vmc, vmr, '')], outputDir, formats, workers, progressCallback)
@@ -0,0 +1,115 @@
+#Program to keep the results of previous runs on disk so identical inputs do not rerun the vectorial model.
+#Results are stored as pickle files named by a hash of the production/parent/fragment/comet/grid sections of a yaml dict.
+#The etc section (and pyv_date_of_run in it) is ignored, so only inputs that change the results change the hash.
+#The installed pyvectorial version is part of the hash, so results of another pyvectorial version are never reused.
+#The cache is bounded in size, the least recently used results are removed first.
+#Several processes can share the cache, a result removed by another process while it is read counts as not cached.
+#
+#Version: 10/17/2026
+
+import os
+import json
+import pickle
+import hashlib
+from .RunProfiler import packageVersion
+
+CacheDirectory = os.path.join(os.path.expanduser('~'), '.vectorial_ui', 'cache') #Folder holding the cached results
+CacheMaxBytes = 2 * 1024**3 #Max size of the cache folder, 2 GB
+CacheSections = ['production', 'parent', 'fragment', 'comet', 'grid'] #Dict sections that go into the hash
+CacheVersion = 2 #Format of the cached results (2: the vmr only), old results get other keys and are evicted as unused
+PyvectorialVersion = packageVersion('pyvectorial') #Results of other pyvectorial versions get other keys and are evicted as unused
+
+#Method def for making a dict value canonical so equal inputs always hash the same (1, 1.0 and '1.0' all become 1.0)
+def canonicalValue(value):
+    if(isinstance(value, dict)):
+        return {str(key) : canonicalValue(val) for key, val in value.items()}
+    if(isinstance(value, (list, tuple))):
+        return [canonicalValue(val) for val in value]
+    if(isinstance(value, bool) or value == None):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+#Method def for getting the cache key of a yaml dict
+def cacheKey(dict):
+    sections = {section : canonicalValue(dict.get(section)) for section in CacheSections}
+    sections['cache_version'] = CacheVersion
+    sections['pyvectorial_version'] = PyvectorialVersion
+    text = json.dumps(sections, sort_keys=True) #Sorted keys make the text independent of the dict order
+    return hashlib.sha256(text.encode()).hexdigest()
+
+#Method def for getting the file path of a cache key
+def cachePath(key):
+    return os.path.join(CacheDirectory, f'{key}.pickle')
+
+#Method def for removing a cache file that another process may already have removed
+def removeFile(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+#Method def for loading a cached result, returns None if the key is not in the cache
+def loadResult(key):
+    path = cachePath(key)
+    if(os.path.isfile(path) == False):
+        return None
+    try:
+        with open(path, 'rb') as file:
+            result = pickle.load(file)
+    except OSError: #Evicted by another process since the test above
+        return None
+    except (EOFError, pickle.UnpicklingError, ModuleNotFoundError, AttributeError):
+        removeFile(path) #Removes an unreadable result (old pyvectorial version or a partial write)
+        return None
+    try:
+        os.utime(path) #Marks the result as recently used for the eviction
+    except OSError: #Evicted by another process after it was read, the result read is still good
+        pass
+    return result
+
+#Method def for saving a result to the cache, then removing old results if the cache is too big
+def saveResult(key, result):
+    os.makedirs(CacheDirectory, exist_ok=True)
+    path = cachePath(key)
+    tempPath = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tempPath, 'wb') as file:
+            pickle.dump(result, file)
+        os.replace(tempPath, path) #Only a complete pickle is ever seen under the key
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        removeFile(tempPath)
+        return
+    evictResults()
+
+#Method def for removing the least recently used results until the cache is under maxBytes
+def evictResults(maxBytes=CacheMaxBytes):
+    if(os.path.isdir(CacheDirectory) == False):
+        return
+    files = []
+    for name in os.listdir(CacheDirectory):
+        if(name.endswith('.pickle')):
+            path = os.path.join(CacheDirectory, name)
+            try:
+                files.append((os.path.getmtime(path), os.path.getsize(path), path))
+            except OSError: #Evicted by another process since it was listed
+                continue
+    total = sum(size for mtime, size, path in files)
+    for mtime, size, path in sorted(files): #Oldest use first
+        if(total <= maxBytes):
+            break
+        removeFile(path)
+        total -= size
+
+#Method def for moving the cache to another folder for the rest of the process (used by Benchmark.py to start from an empty cache)
+def setCacheDirectory(path):
+    global CacheDirectory
+    CacheDirectory = path
+
+#Method def for removing every cached result
+def clearCache():
+    if(os.path.isdir(CacheDirectory)):
+        for name in os.listdir(CacheDirectory):
+            removeFile(os.path.join(CacheDirectory, name))
@@ -0,0 +1,115 @@
+#Program to save the arrays of a vmr as typed columnar data (csv, hdf5 or parquet) instead of a pickle.
+#The units of every array are kept as metadata so the data can be read without pyvectorial or astropy.
+#hdf5 datasets are stored contiguous and uncompressed so they can be memory mapped by downstream analysis.
+#h5py (hdf5) and pyarrow (parquet) are optional, they are only imported when that format is used.
+#
+#Version: 10/17/2026
+
+import os
+import importlib.util
+import numpy as np
+
+ResultFormats = ['csv', 'hdf5', 'parquet'] #Formats a result can be saved as
+FormatPackages = {'hdf5' : 'h5py', 'parquet' : 'pyarrow'} #Optional package each format needs
+
+#Method def for getting the formats whose package is not installed as format : package, tested before an export starts
+#(the package is only looked up, not imported)
+def missingFormats(formats):
+    return {format : FormatPackages[format] for format in formats
+            if format in FormatPackages and importlib.util.find_spec(FormatPackages[format]) == None}
+
+#Tables of arrays with the same length, saved as one file each for csv and parquet (one group each for hdf5)
+ResultTables = {'volume_density' : ['volume_density_grid', 'volume_density'],
+                'column_density' : ['column_density_grid', 'column_density'],
+                'fragment_sputter' : ['fragment_sputter_rs', 'fragment_sputter_thetas', 'fragment_sputter_density']}
+
+#Method def for splitting a value into a float NumPy array and its unit text ('' if it has no units)
+def arrayWithUnit(value):
+    unit = getattr(value, 'unit', None)
+    if(unit is None):
+        return np.ascontiguousarray(value, dtype=np.float64), ''
+    return np.ascontiguousarray(value.value, dtype=np.float64), str(unit)
+
+#Method def for getting every array of a vmr as a dict of name : (array, unit text)
+def resultArrays(vmr):
+    sputter = vmr.fragment_sputter
+    arrays = {'volume_density_grid' : vmr.volume_density_grid, 'volume_density' : vmr.volume_density,
+              'column_density_grid' : vmr.column_density_grid, 'column_density' : vmr.column_density,
+              'fragment_sputter_rs' : sputter.rs, 'fragment_sputter_thetas' : sputter.thetas,
+              'fragment_sputter_density' : sputter.fragment_density}
+    return {name : arrayWithUnit(value) for name, value in arrays.items()}
+
+#Method def for getting the scalar results of a vmr as a dict of name : (value, unit text)
+def resultScalars(vmr):
+    scalars = {'num_fragments_theory' : vmr.num_fragments_theory, 'num_fragments_grid' : vmr.num_fragments_grid,
+               'max_grid_radius' : vmr.max_grid_radius, 'coma_radius' : vmr.coma_radius,
+               'collision_sphere_radius' : vmr.collision_sphere_radius}
+    result = {}
+    for name, value in scalars.items():
+        unit = getattr(value, 'unit', None)
+        if(unit is None):
+            result[name] = (float(value), '')
+        else:
+            result[name] = (float(value.value), str(unit))
+    return result
+
+#Method def for saving each table as a csv file in outputDir, the units are in the column headers
+def writeCsv(vmr, outputDir):
+    arrays = resultArrays(vmr)
+    paths = []
+    for table, names in ResultTables.items():
+        path = os.path.join(outputDir, f'{table}.csv')
+        header = ','.join(f'{name} ({arrays[name][1]})' if arrays[name][1] != '' else name for name in names)
+        np.savetxt(path, np.column_stack([arrays[name][0] for name in names]), delimiter=',', header=header, comments='')
+        paths.append(path)
+    return paths
+
+#Method def for saving every table as a group of a single hdf5 file, the units are in the dataset attributes
+def writeHdf5(vmr, outputDir):
+    import h5py
+    arrays = resultArrays(vmr)
+    path = os.path.join(outputDir, 'result.h5')
+    with h5py.File(path, 'w') as file:
+        for table, names in ResultTables.items():
+            group = file.create_group(table)
+            for name in names:
+                dataset = group.create_dataset(name, data=arrays[name][0]) #Contiguous and uncompressed, can be memory mapped
+                dataset.attrs['unit'] = arrays[name][1]
+        for name, (value, unit) in resultScalars(vmr).items():
+            file.attrs[name] = value
+            file.attrs[f'{name}_unit'] = unit
+    return [path]
+
+#Method def for saving each table as a parquet file in outputDir, the units are in the field metadata
+def writeParquet(vmr, outputDir):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    arrays = resultArrays(vmr)
+    scalars = {name : f'{value} {unit}'.strip() for name, (value, unit) in resultScalars(vmr).items()}
+    paths = []
+    for table, names in ResultTables.items():
+        fields = [pa.field(name, pa.float64(), metadata={'unit' : arrays[name][1]}) for name in names]
+        data = pa.Table.from_arrays([pa.array(arrays[name][0]) for name in names], schema=pa.schema(fields, metadata=scalars))
+        path = os.path.join(outputDir, f'{table}.parquet')
+        pq.write_table(data, path)
+        paths.append(path)
+    return paths
+
+#Method def for saving the arrays of a vmr to outputDir in every format, returns the paths of the saved files
+def exportResult(vmr, outputDir, formats=('hdf5',)):
+    os.makedirs(outputDir, exist_ok=True)
+    writers = {'csv' : writeCsv, 'hdf5' : writeHdf5, 'parquet' : writeParquet}
+    paths = []
+    for format in formats:
+        paths += writers[format](vmr, outputDir)
+    return paths
+
+#Method def for saving the arrays of many runs, runs is a list of (vmc, vmr, folder name)
+#The arrays of each run are saved to outputDir/folder name, returns the paths of the saved files
+def exportData(runs, outputDir, formats=('hdf5',), progressCallback=None):
+    paths = []
+    for i, (vmc, vmr, folderName) in enumerate(runs):
+        paths += exportResult(vmr, os.path.join(outputDir, folderName), formats)
+        if(progressCallback != None):
+            progressCallback(f'Data export {i + 1}/{len(runs)} finished')
+    return paths
@@ -0,0 +1,160 @@
+#Program to save a vmr in a result store file (.vms) that can be opened without unpickling the whole result.
+#The file starts with a small json header describing every field of the vmr, followed by the raw arrays.
+#Opening a store only reads the header, the arrays are memory mapped and only paged in when a plot or table uses them.
+#Existing .vmr pickles can be converted with: python -m utils.ResultStore file1.vmr file2.vmr ...
+#
+#File layout: StoreMagic (8 bytes), header length (8 bytes, little endian), json header, arrays (each aligned to 64 bytes)
+#
+#Version: 10/17/2026
+
+import os
+import sys
+import json
+import pickle
+import shutil
+import importlib
+import threading
+import numpy as np
+from .LazyImports import lazyImport
+
+u = lazyImport('astropy.units')
+interpolate = lazyImport('scipy.interpolate')
+
+StoreMagic = b'VMSTORE1' #Marks the file as a result store, the last character is the format version
+StoreAlignment = 64 #Byte alignment of every array
+
+#Method def for getting the (module, name) of an object's class so it can be rebuilt when the store is opened
+def classPath(value):
+    return [type(value).__module__, type(value).__qualname__]
+
+#Method def for getting a class from its (module, name)
+def classFromPath(path):
+    return getattr(importlib.import_module(path[0]), path[1])
+
+#Writing methods
+
+#Method def for describing an array in the header, the array itself is added to arrays to be written after the header
+def arrayEntry(values, unit, arrays, dataSize):
+    values = np.ascontiguousarray(values)
+    offset = -(-dataSize[0] // StoreAlignment) * StoreAlignment #Rounds up to the alignment
+    arrays.append((offset, values))
+    dataSize[0] = offset + values.nbytes
+    return {'type' : 'array', 'offset' : offset, 'shape' : list(values.shape), 'dtype' : values.dtype.str,
+            'unit' : None if unit is None else unit.to_string()}
+
+#Method def for describing any field of a vmr in the header
+def valueEntry(value, arrays, dataSize):
+    if(isinstance(value, u.Quantity)):
+        if(value.isscalar):
+            return {'type' : 'scalar', 'value' : float(value.value), 'unit' : value.unit.to_string()}
+        return arrayEntry(value.value, value.unit, arrays, dataSize)
+    if(isinstance(value, np.ndarray) and value.dtype != object):
+        return arrayEntry(value, None, arrays, dataSize)
+    if(isinstance(value, (bool, int, float, str, np.generic)) or value is None):
+        return {'type' : 'scalar', 'value' : value.item() if isinstance(value, np.generic) else value, 'unit' : None}
+    if(isinstance(value, interpolate.PPoly)): #Interpolations (CubicSpline) are rebuilt from their coefficients
+        return {'type' : 'spline', 'class' : classPath(value), 'x' : arrayEntry(value.x, None, arrays, dataSize),
+                'c' : arrayEntry(value.c, None, arrays, dataSize), 'extrapolate' : value.extrapolate if isinstance(value.extrapolate, str) else bool(value.extrapolate),
+                'axis' : int(value.axis)}
+    if(type(value).__module__.startswith('pyvectorial') and hasattr(value, '__dict__')): #pyvectorial objects (the vmr, fragment sputter) are stored field by field
+        return {'type' : 'object', 'class' : classPath(value),
+                'fields' : {name : valueEntry(field, arrays, dataSize) for name, field in vars(value).items()}}
+    data = np.frombuffer(pickle.dumps(value), dtype=np.uint8) #Anything else is kept as a small pickle
+    return {'type' : 'pickle', 'data' : arrayEntry(data, None, arrays, dataSize)}
+
+#Method def for saving a vmr as a result store file
+def saveStore(vmr, storePath):
+    arrays = [] #(offset, array) of every array, written after the header
+    dataSize = [0]
+    header = json.dumps({'result' : valueEntry(vmr, arrays, dataSize), 'data_size' : dataSize[0]}).encode()
+    dataStart = -(-(16 + len(header)) // StoreAlignment) * StoreAlignment
+    tempPath = f'{storePath}.{os.getpid()}.{threading.get_ident()}.tmp' #Two writers of the same store never share a temp file
+    with open(tempPath, 'wb') as file:
+        file.write(StoreMagic)
+        file.write(len(header).to_bytes(8, 'little'))
+        file.write(header)
+        for offset, values in arrays:
+            file.seek(dataStart + offset)
+            file.write(values.tobytes())
+        file.truncate(dataStart + dataSize[0])
+    os.replace(tempPath, storePath) #Only a complete store is ever seen at storePath
+
+#Method def for giving a result store a second path (a hard link, or a copy if the paths are on different drives)
+#The store stays readable at targetPath when it is removed from storePath
+def linkStore(storePath, targetPath):
+    os.makedirs(os.path.dirname(targetPath), exist_ok=True)
+    tempPath = f'{targetPath}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.link(storePath, tempPath)
+    except OSError:
+        shutil.copyfile(storePath, tempPath)
+    os.replace(tempPath, targetPath)
+
+#Method def for converting a .vmr pickle into a result store, returns the path of the store
+def convertPickle(picklePath, storePath=None):
+    if(storePath == None):
+        storePath = os.path.splitext(picklePath)[0] + '.vms'
+    with open(picklePath, 'rb') as file:
+        vmr = pickle.load(file)
+    saveStore(vmr, storePath)
+    return storePath
+
+#Reading methods
+
+#Method def for reading the header of a result store, returns the header dict and the position of the arrays
+#Raises ValueError if the file is not a complete result store
+def readHeader(storePath):
+    with open(storePath, 'rb') as file:
+        if(file.read(8) != StoreMagic):
+            raise ValueError(f'{storePath} is not a result store')
+        headerSize = int.from_bytes(file.read(8), 'little')
+        header = json.loads(file.read(headerSize).decode())
+    dataStart = -(-(16 + headerSize) // StoreAlignment) * StoreAlignment
+    if(os.path.getsize(storePath) < dataStart + header['data_size']): #Partial copy or download
+        raise ValueError(f'{storePath} is incomplete')
+    return header, dataStart
+
+#Method def for testing if a result store can be opened, only the header is read
+def storeTest(storePath):
+    try:
+        readHeader(storePath)
+        return True
+    except (OSError, ValueError, KeyError, UnicodeDecodeError):
+        return False
+
+#Method def for memory mapping an array of the store, nothing is read until the array is used
+def arrayValue(storePath, entry, dataStart):
+    shape = tuple(entry['shape'])
+    if(int(np.prod(shape)) == 0):
+        values = np.empty(shape, dtype=np.dtype(entry['dtype']))
+    else:
+        values = np.memmap(storePath, dtype=np.dtype(entry['dtype']), mode='r', offset=dataStart + entry['offset'], shape=shape)
+    if(entry['unit'] == None):
+        return values
+    return u.Quantity(values, entry['unit'], copy=False)
+
+#Method def for rebuilding a field of a vmr from its header entry
+def buildValue(storePath, entry, dataStart):
+    if(entry['type'] == 'array'):
+        return arrayValue(storePath, entry, dataStart)
+    if(entry['type'] == 'scalar'):
+        return entry['value'] if entry['unit'] == None else entry['value'] * u.Unit(entry['unit'])
+    if(entry['type'] == 'spline'):
+        return classFromPath(entry['class']).construct_fast(arrayValue(storePath, entry['c'], dataStart),
+                arrayValue(storePath, entry['x'], dataStart), entry['extrapolate'], entry['axis'])
+    if(entry['type'] == 'object'):
+        cls = classFromPath(entry['class'])
+        value = cls.__new__(cls) #Rebuilt the same way pickle rebuilds it, without calling __init__
+        value.__dict__.update({name : buildValue(storePath, field, dataStart) for name, field in entry['fields'].items()})
+        return value
+    return pickle.loads(arrayValue(storePath, entry['data'], dataStart).tobytes())
+
+#Method def for opening a result store as a vmr whose arrays are memory mapped
+def loadStore(storePath):
+    header, dataStart = readHeader(storePath)
+    return buildValue(storePath, header['result'], dataStart)
+
+#Converts every .vmr pickle given on the command line
+if __name__ == '__main__':
+    for picklePath in sys.argv[1:]:
+        print(f'{picklePath} -> {convertPickle(picklePath)}')
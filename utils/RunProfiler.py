@@ -0,0 +1,78 @@
+#Program to record where the time of a run goes, stage by stage (yaml parsing, run_vmodel, get_result_from_coma,
+#the aperture check integrations and each plot).
+#Every stage records its wall time, CPU time (of the whole process, so numpy threads are counted) and peak memory.
+#The peak memory is the traced peak of the stage if tracemalloc is tracing (python -X tracemalloc or PYTHONTRACEMALLOC=1),
+#otherwise it is the peak resident memory of the whole process so far (not of the stage), with how much the stage raised it.
+#A profile can be saved as json to track regressions across pyvectorial versions.
+#
+#Version: 10/18/2026
+
+import sys
+import time
+import json
+import platform
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from importlib import metadata
+try:
+    import resource #Not available on Windows
+except ImportError:
+    resource = None
+
+#Method def for getting the peak resident memory of the process in MB, None if it can not be read
+def peakRss():
+    if(resource == None):
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == 'darwin' else peak / 1024 #Bytes on MacOS, kB on Linux
+
+#Method def for getting the installed version of a package, None if it is not installed
+def packageVersion(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+#Class to record the stages of a single run
+class RunProfile:
+    #Intial Config
+    def __init__(self):
+        self.stages = [] #Dict of every recorded stage, in the order they finished
+
+    #Records the block of a with statement as a stage
+    @contextmanager
+    def stage(self, name):
+        tracing = tracemalloc.is_tracing()
+        if(tracing):
+            tracemalloc.reset_peak()
+        rssStart = None if tracing else peakRss()
+        wallStart = time.perf_counter()
+        cpuStart = time.process_time()
+        try:
+            yield
+        finally:
+            rssEnd = None if tracing else peakRss()
+            self.stages.append({'stage' : name, 'wall_seconds' : time.perf_counter() - wallStart,
+                                'cpu_seconds' : time.process_time() - cpuStart,
+                                'peak_memory_mb' : tracemalloc.get_traced_memory()[1] / 1024**2 if tracing else rssEnd,
+                                'peak_growth_mb' : None if rssEnd == None else rssEnd - rssStart, #How much the stage raised the process peak
+                                'memory' : 'traced' if tracing else 'process peak rss'})
+
+    #Adds stages recorded in another process (plots rendered by an export worker)
+    def addStages(self, stages):
+        self.stages += stages
+
+    #Gets the profile as a dict, with the versions needed to compare profiles
+    def toDict(self):
+        return {'pyvectorial_version' : packageVersion('pyvectorial'), 'python_version' : platform.python_version(),
+                'platform' : platform.platform(), 'total_wall_seconds' : sum(stage['wall_seconds'] for stage in self.stages),
+                'stages' : self.stages}
+
+    #Saves the profile as a json file
+    def save(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.toDict(), file, indent=2)
+
+#Method def for recording a stage in a profile, does nothing if there is no profile
+def profileStage(profile, name):
+    return nullcontext() if profile == None else profile.stage(name)
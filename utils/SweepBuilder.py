@@ -0,0 +1,54 @@
+#Program to expand manual inputs given as ranges or lists into a parameter sweep.
+#A sweep input is either a list ("1e28, 2e28, 5e28") or a range ("start:stop:count", count evenly spaced values).
+#The sweep is either the full grid of every combination or a Latin hypercube with a set number of samples.
+#Each point of a sweep is a dict of UIInputData field names to values.
+#
+#Version: 10/17/2026
+
+import random
+import itertools
+
+#Method def for testing if a manual input is a sweep (list or range) instead of a single value
+def isSweepText(text):
+    return ',' in text or ':' in text
+
+#Method def for getting the values of a sweep input, returns None if the text can not be read
+def parseSweep(text):
+    try:
+        if(':' in text): #Range, start:stop:count
+            start, stop, count = text.split(':')
+            start, stop, count = float(start), float(stop), float(count)
+            if(count < 1 or count.is_integer() == False):
+                return None
+            count = int(count)
+            if(count == 1):
+                return [start]
+            return [start + (stop - start) * i / (count - 1) for i in range(count)]
+        values = [float(val) for val in text.split(',') if val.strip() != ''] #List, val1, val2, ...
+        return values if len(values) > 0 else None
+    except ValueError:
+        return None
+
+#Method def for getting every combination of the sweep values (full grid)
+#sweepValues is a dict of field name : list of values, returns a list of dicts of field name : value
+def gridSweep(sweepValues):
+    fields = list(sweepValues.keys())
+    return [dict(zip(fields, values)) for values in itertools.product(*[sweepValues[field] for field in fields])]
+
+#Method def for getting a Latin hypercube sample of the sweep, each field is sampled between the min and max of its values
+#Every field is split into samples equal strata and every stratum is used exactly once
+#Returns a list of samples dicts of field name : value
+def latinHypercube(sweepValues, samples, seed=None):
+    generator = random.Random(seed)
+    points = [{} for i in range(samples)]
+    for field, values in sweepValues.items():
+        low, high = min(values), max(values)
+        strata = list(range(samples))
+        generator.shuffle(strata) #Random pairing of the strata between the fields
+        for point, stratum in zip(points, strata):
+            point[field] = low + (high - low) * (stratum + generator.random()) / samples
+    return points
+
+#Method def for describing a sweep point, used in the job table
+def sweepLabel(point):
+    return ', '.join(f'{field} = {value:.4g}' for field, value in point.items())
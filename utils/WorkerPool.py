@@ -0,0 +1,139 @@
+#Program to keep one long lived pool of worker processes for the whole session, shared by batch runs, sweeps, aperture checks,
+#plot exports and the command line, so a job does not pay for starting a process and importing pyvectorial, sbpy and astropy.
+#Every worker is set up once by workerInit(): the heavy imports (see LazyImports.py), quantity_support() and the Agg backend.
+#The pool is created by its first use (the UI does not start it when it opens, a single run does not need it) with the number of
+#workers set by setPoolSize() (every core by default) and is only replaced if a worker died (broken pool).
+#A call that asks for fewer workers (the Workers field of the UI, an aperture check) gets a LimitedPool that runs at most that many
+#of its jobs at once on the shared pool, so the warmed workers are never thrown away and other jobs on the pool are not cancelled.
+#Cancelling a run cancels its queued jobs, it never shuts the shared pool down.
+#
+#Version: 10/18/2026
+
+import os
+import atexit
+import threading
+import matplotlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from .LazyImports import lazyImport, warmImports
+
+visualization = lazyImport('astropy.visualization')
+
+SharedPool = None #Pool of the session, created on first use
+PoolWorkers = None #Number of worker processes of the shared pool
+PoolSize = None #Number of worker processes the shared pool is created with, None uses every core
+PoolLock = threading.Lock() #The pool is used from RunWorker() threads
+
+#Method def for setting up a worker process once, before its first job
+def workerInit():
+    matplotlib.use('Agg') #Workers only plot to files
+    warmImports()
+    visualization.quantity_support()
+
+#Method def for a job that does nothing, used to start every worker ahead of the first real job
+def workerReady():
+    return os.getpid()
+
+#Class to run the jobs of one call on the shared pool with at most workers of them running at once
+#Jobs past the limit wait here (they can still be cancelled) and are handed to the pool as the jobs of the call finish
+class LimitedPool:
+    #Intial Config
+    def __init__(self, pool, workers):
+        self.pool = pool
+        self.workers = workers
+        self.waiting = deque() #(Future given to the caller, function, arguments) of every job not yet handed to the pool
+        self.running = 0 #Number of jobs of the call handed to the pool
+        self.lock = threading.Lock()
+
+    #Queues a job, returns its Future
+    def submit(self, function, *args):
+        future = Future()
+        with self.lock:
+            self.waiting.append((future, function, args))
+        self.start()
+        return future
+
+    #Runs function on every set of arguments, returns the results in order
+    def map(self, function, *iterables):
+        futures = [self.submit(function, *args) for args in zip(*iterables)]
+        return (future.result() for future in futures)
+
+    #Hands waiting jobs to the pool while the call has fewer than workers jobs running, cancelled jobs are dropped
+    def start(self):
+        while(True):
+            with self.lock:
+                if(self.running >= self.workers or len(self.waiting) == 0):
+                    return
+                future, function, args = self.waiting.popleft()
+                if(future.set_running_or_notify_cancel() == False): #Cancelled while waiting
+                    continue
+                self.running += 1
+            try:
+                job = self.pool.submit(function, *args)
+            except Exception as error: #The pool was shut down or is broken
+                self.finish(future, None, error)
+                continue
+            job.add_done_callback(lambda job, future=future: self.finish(future, job))
+
+    #Called when a job of the call finishes, passes its result on and starts the next waiting job
+    def finish(self, future, job, error=None):
+        if(job != None):
+            error = job.exception() if job.cancelled() == False else RuntimeError('the shared pool was shut down')
+        if(error != None):
+            future.set_exception(error)
+        else:
+            future.set_result(job.result())
+        with self.lock:
+            self.running -= 1
+        self.start()
+
+#Method def for setting the number of worker processes the shared pool is created with (None uses every core)
+#Only a pool created after the call uses it, the pool of the session is never rebuilt to change its size
+def setPoolSize(workers):
+    global PoolSize
+    PoolSize = workers
+
+#Method def for getting the shared pool of the session, created with the size set by setPoolSize() on first use
+#workers (optional) limits the number of jobs of the call running at once (a LimitedPool) without replacing the pool,
+#asking for as many workers as the pool has or more uses the pool itself
+def sharedPool(workers=None):
+    global SharedPool, PoolWorkers
+    with PoolLock:
+        broken = SharedPool != None and getattr(SharedPool, '_broken', False) #A worker was killed, the pool takes no new jobs
+        if(SharedPool == None or broken):
+            if(SharedPool != None):
+                SharedPool.shutdown(wait=False)
+            PoolWorkers = os.cpu_count() if PoolSize == None else PoolSize
+            SharedPool = ProcessPoolExecutor(max_workers=PoolWorkers, initializer=workerInit)
+        if(workers == None or workers >= PoolWorkers):
+            return SharedPool
+        return LimitedPool(SharedPool, workers)
+
+#Method def for getting the number of worker processes of the shared pool, None if there is no pool
+def poolWorkers():
+    return PoolWorkers
+
+#Method def for starting every worker of the shared pool ahead of the first job, the heavy modules are imported here first
+#so forked workers start with them already imported
+#Returns the process ids of the workers that ran a ready job
+def warmPool(progressCallback=None):
+    warmImports(progressCallback)
+    pool = sharedPool()
+    if(progressCallback != None):
+        progressCallback(f'Starting {PoolWorkers} workers')
+    return sorted(set(future.result() for future in [pool.submit(workerReady) for i in range(PoolWorkers)]))
+
+#Method def for cancelling the queued jobs of a run, jobs already running are let finish
+def cancelJobs(futures):
+    for future in futures:
+        future.cancel()
+
+#Method def for shutting the shared pool down, called when the program exits
+def shutdownPool():
+    global SharedPool, PoolWorkers
+    with PoolLock:
+        if(SharedPool != None):
+            SharedPool.shutdown(wait=True, cancel_futures=True)
+        SharedPool, PoolWorkers = None, None
+
+atexit.register(shutdownPool)
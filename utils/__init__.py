@@ -1,2 +1,16 @@
-from .FileCreator import newFileManual, newFileInputs, removeFile
-from .FileRunner import getFragSputter, getRadialPlots, getColumnDensity, get3DColumnDensity, get3DColumnDensityCentered, getPrintRadialDensity, getPrintColumnDensity, getAgreementCheck, valueTest, runManualProgram, runFileYamlProgram, runFilePickleProgram, pickleTest, fileTest
\ No newline at end of file
+from .FileCreator import createDictionary, newFileManual, newFileInputs, removeFile
+from .FileRunner import getFragSputter, getRadialPlots, getColumnDensity, get3DColumnDensity, get3DColumnDensityCentered, getColumnDensitySurface, getCurveOfGrowth, getComparisonProfiles, getComparisonPlot, getPrintRadialDensity, getPrintColumnDensity, getRadialDensityTable, getColumnDensityTable, getAgreementCheck, valueTest, runManualProgram, dictRun, vmcFromDict, runFileYamlProgram, runFilePickleProgram, runFileStoreProgram, runBatchProgram, runSweepProgram, pickleTest, fileTest, RunCancelled
+from .ResultCache import cacheKey, loadResult, saveResult, clearCache
+from .PlotExporter import ExportFormats, exportPlots, exportResults
+from .ConfigValidator import validateConfig, validateFile
+from .ResultExporter import ResultFormats, exportResult, exportData, missingFormats
+from .ResultStore import saveStore, loadStore, storeTest, convertPickle
+from .RunProfiler import RunProfile
+from .ApertureChecks import parseApertures, apertureCheckText, curveOfGrowth, apertureCounts
+from .ComaStore import getComa, clearComas, setComaLimits, comaApertureText, columnDensityAt
+from .LazyImports import lazyImport, warmImports
+from .WorkerPool import sharedPool, setPoolSize, warmPool, shutdownPool
+from .JobClient import serverAvailable, serverStatus, serverRun
+from .PlotDecimation import decimateFigure
+from .JobQueue import addSweep, sweepJobs, unfinishedSweeps, removeSweep, removeFinishedSweeps, claimSweep, SweepOwned
+from .SweepBuilder import isSweepText, parseSweep, gridSweep, latinHypercube, sweepLabel
\ No newline at end of file